@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Measure import time and first-call latency in fresh interpreters.
+
+For short-lived processes, importing protocards and scoring the first
+hand (which loads the cribbage rank table) is a large part of the run.
+Each measurement starts a new Python process, so nothing is cached in
+memory; the median of `--runs` runs is reported.
+
+Usage: python -m benchmarks.bench_import [--runs N]
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = ("protocards.base", "protocards.standard", "protocards.cribbage",
+           "protocards.simulate")
+
+_FIRST_CALL = """
+import time
+start = time.perf_counter()
+from protocards import cribbage, standard
+imported = time.perf_counter()
+deck = standard.make_deck()
+cribbage.score_hand(deck[:4], deck[4])
+print(imported - start, time.perf_counter() - imported)
+"""
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module):
+    """Return the seconds `python -X importtime` reports for `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=_ROOT, stderr=subprocess.PIPE, universal_newlines=True,
+        check=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError("No import time reported for " + module)
+
+
+def first_call():
+    """Return (import seconds, first score_hand seconds) in a new process."""
+    output = subprocess.check_output([sys.executable, "-c", _FIRST_CALL],
+                                     cwd=_ROOT, universal_newlines=True)
+    return tuple(float(field) for field in output.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        median = statistics.median(import_time(module)
+                                   for _ in range(args.runs))
+        print("import {:<22} {:7.1f} ms".format(module, median * 1000))
+    calls = [first_call() for _ in range(args.runs)]
+    print("{:<29} {:7.1f} ms".format(
+        "import cribbage, standard", statistics.median(c[0] for c in calls)
+        * 1000))
+    print("{:<29} {:7.1f} ms".format(
+        "first score_hand()", statistics.median(c[1] for c in calls) * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""Measure how fast `standard.parse_lines()` reads hands from text.
+
+Formats random hands with `str()` (and, with --commas, as comma-separated
+short names, like `repr()` does), then times parsing them back, once
+with the token table cold and once warm.
+
+Usage: python -m benchmarks.bench_parse [--lines N] [--size K] [--commas]
+
+"""
+
+import argparse
+import random
+import time
+
+from protocards import standard
+
+
+def make_lines(count, size, commas=False, seed=0):
+    """Return `count` lines, each a random hand of `size` cards."""
+    rng = random.Random(seed)
+    deck = list(standard.make_deck())
+    lines = []
+    for _ in range(count):
+        hand = standard.StandardHand(rng.sample(deck, size))
+        if commas:
+            lines.append(",".join(card.short for card in hand) + "\n")
+        else:
+            lines.append(str(hand) + "\n")
+    return lines
+
+
+def time_parse(lines):
+    """Parse every line; returns elapsed seconds."""
+    start = time.perf_counter()
+    for _ in standard.parse_lines(lines):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--size", type=int, default=5)
+    parser.add_argument("--commas", action="store_true")
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines, args.size, args.commas)
+    print("parsing {:,} lines of {} cards".format(args.lines, args.size))
+    for label in ("cold", "warm"):
+        elapsed = time_parse(lines)
+        print("{}: {:.2f}s ({:,.0f} lines/s)".format(
+            label, elapsed, args.lines / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""Measure cribbage simulation throughput against a target rate.
+
+Plays random-strategy games with `protocards.simulate` and reports
+games per second. Exits with status 1 if the rate is below `--target`,
+so it can guard against slowdowns in the simulation's inner loop.
+
+Usage: python -m benchmarks.bench_simulate [--games N] [--workers N]
+                                           [--target GAMES_PER_SECOND]
+
+"""
+
+import argparse
+import sys
+import time
+
+from protocards import simulate
+
+
+# Single-process games per second on a modest machine; leave some room.
+TARGET = 500
+
+
+def measure(games, workers=1):
+    """Play `games` random games; returns games per second."""
+    strategies = (simulate.RandomStrategy(), simulate.RandomStrategy())
+    start = time.perf_counter()
+    simulate.simulate(strategies, games, workers=workers)
+    return games / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--target", type=float, default=TARGET)
+    args = parser.parse_args()
+
+    rate = measure(args.games, args.workers)
+    print("{:,} games with {} worker(s): {:,.0f} games/s (target {:,.0f})"
+          .format(args.games, args.workers, rate, args.target))
+    if rate < args.target:
+        print("below target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
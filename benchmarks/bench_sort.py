@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Compare sorting hands by `standard.sort_key` with the old comparisons.
+
+The "before" numbers reproduce how `StandardCard.__lt__` used to work:
+looking up each card's rank and suit with a linear, `__dict__`-comparing
+search of `RANKS` and `SUITS` on every comparison.
+
+Usage: python -m benchmarks.bench_sort [--hands N] [--size K]
+
+"""
+
+import argparse
+import functools
+import random
+import time
+
+from protocards import standard
+
+
+def _legacy_index(properties, prop):
+    for i, p in enumerate(properties):
+        if p.__dict__ == prop.__dict__:
+            return i
+    raise ValueError(prop)
+
+
+def _legacy_cmp(a, b):
+    if a.rank.__dict__ == b.rank.__dict__:
+        diff = (_legacy_index(standard.SUITS, a.suit) -
+                _legacy_index(standard.SUITS, b.suit))
+    else:
+        diff = (_legacy_index(standard.RANKS, a.rank) -
+                _legacy_index(standard.RANKS, b.rank))
+    return (diff > 0) - (diff < 0)
+
+
+def make_hands(count, size, seed=0):
+    """Return `count` random hands of `size` cards each, as lists."""
+    rng = random.Random(seed)
+    deck = list(standard.make_deck())
+    return [rng.sample(deck, size) for _ in range(count)]
+
+
+def time_sort(hands, key):
+    """Sort a copy of every hand with `key`; returns elapsed seconds."""
+    start = time.perf_counter()
+    for hand in hands:
+        sorted(hand, key=key)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hands", type=int, default=1000000)
+    parser.add_argument("--size", type=int, default=5)
+    args = parser.parse_args()
+
+    hands = make_hands(args.hands, args.size)
+    before = time_sort(hands, functools.cmp_to_key(_legacy_cmp))
+    after = time_sort(hands, standard.sort_key)
+    print("sorting {:,} hands of {} cards".format(args.hands, args.size))
+    print("before: {:.2f}s ({:,.0f} hands/s)".format(
+        before, args.hands / before))
+    print("after:  {:.2f}s ({:,.0f} hands/s)".format(
+        after, args.hands / after))
+    print("speedup: {:.1f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
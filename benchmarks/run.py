@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""Run the protocards benchmark suite and compare against a baseline.
+
+Each benchmark times one hot path over a realistic workload and reports
+operations per second (the best of `--repeat` runs) and the peak memory
+allocated while it runs, measured separately with `tracemalloc`. At the
+default scale the workloads are 100,000 full-deck deals, sorts and
+lookups and 1,000,000 scored hands; `--scale` multiplies them all.
+
+Results can be saved as JSON with `--save`, and compared with a saved
+baseline with `--compare`: any benchmark whose throughput drops by more
+than `--threshold` (a fraction) is flagged, and the script exits with
+status 1. `BASELINE` is the committed baseline, recorded at the default
+scale; record a new one on the machine you compare on.
+
+Usage: python -m benchmarks.run [--scale X] [--repeat N] [--only NAME ...]
+                                [--save FILE] [--compare FILE]
+                                [--threshold FRACTION]
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from protocards import cribbage, standard
+
+
+DEALS = 100000
+SCORED_HANDS = 1000000
+THRESHOLD = 0.2
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "baseline.json")
+
+
+def _count(base, scale):
+    """Return `base` scaled, but at least 1 so there's something to time."""
+    return max(1, int(base * scale))
+
+
+def _random_hands(count, size, seed=0):
+    rng = random.Random(seed)
+    deck = list(standard.make_deck())
+    return [standard.StandardHand(rng.sample(deck, size))
+            for _ in range(count)]
+
+
+def bench_make_deck(scale):
+    count = _count(DEALS, scale)
+
+    def run():
+        for _ in range(count):
+            standard.make_deck()
+    return run, count
+
+
+def bench_deal(scale):
+    count = _count(DEALS, scale)
+    rng = random.Random(0)
+
+    def run():
+        # Shuffle a fresh deck and deal all of it as four hands.
+        for _ in range(count):
+            deck = standard.make_deck(shuffle=True, rng=rng)
+            for _ in range(4):
+                deck.deal(13)
+    return run, count
+
+
+def bench_deck_deal(scale):
+    count = _count(DEALS, scale)
+    deck = standard.StandardDeck(random.Random(0))
+
+    def run():
+        # The same deals from a StandardDeck's cursor.
+        for _ in range(count):
+            deck.reset()
+            for _ in range(4):
+                deck.deal(13)
+    return run, count
+
+
+def bench_by_rank(scale):
+    hands = _random_hands(_count(DEALS, scale), 13)
+
+    def run():
+        for hand in hands:
+            for rank in standard.RANKS:
+                hand.by_rank(rank)
+    return run, len(hands) * len(standard.RANKS)
+
+
+def bench_by_suit(scale):
+    hands = _random_hands(_count(DEALS, scale), 13)
+
+    def run():
+        for hand in hands:
+            for suit in standard.SUITS:
+                hand.by_suit(suit)
+    return run, len(hands) * len(standard.SUITS)
+
+
+def bench_card_lt(scale):
+    hands = [list(hand)
+             for hand in _random_hands(_count(DEALS, scale), 13)]
+
+    def run():
+        # Sorting without a key uses StandardCard.__lt__.
+        for hand in hands:
+            sorted(hand)
+    return run, len(hands)
+
+
+def bench_score_hand(scale):
+    rng = random.Random(0)
+    deck = list(standard.make_deck())
+    count = _count(SCORED_HANDS, scale)
+    # Deal from a pool of distinct hands so building the workload is
+    # cheap; the scoring itself doesn't cache anything.
+    pool = []
+    for _ in range(min(count, 10000)):
+        cards = rng.sample(deck, 5)
+        pool.append((standard.StandardHand(cards[:4]), cards[4],
+                     rng.random() < 0.5, rng.random() < 0.5))
+
+    def run():
+        score = cribbage.score_hand
+        for i in range(count):
+            hand, turned, crib, dealer = pool[i % len(pool)]
+            score(hand, turned, crib, dealer)
+    return run, count
+
+
+BENCHMARKS = {
+    "make_deck": bench_make_deck,
+    "deal": bench_deal,
+    "deck_deal": bench_deck_deal,
+    "by_rank": bench_by_rank,
+    "by_suit": bench_by_suit,
+    "card_lt": bench_card_lt,
+    "score_hand": bench_score_hand,
+}
+
+
+def measure(name, scale=1.0, repeat=3):
+    """Run one benchmark; returns a dictionary of its results."""
+    run, ops = BENCHMARKS[name](scale)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"ops": ops, "seconds": best, "ops_per_sec": ops / best,
+            "peak_bytes": peak}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Return a list of (name, ratio) for benchmarks slower than baseline.
+
+    `ratio` is the new throughput over the baseline's; anything below
+    1 - `threshold` is a regression. Benchmarks missing from either set
+    of results are ignored.
+
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = result["ops_per_sec"] / before["ops_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        default=list(BENCHMARKS))
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)["benchmarks"]
+
+    results = {}
+    print("{:<12} {:>12} {:>14} {:>12}  {}".format(
+        "benchmark", "ops", "ops/s", "peak KiB", "vs baseline"))
+    for name in args.only:
+        result = results[name] = measure(name, args.scale, args.repeat)
+        change = ""
+        if name in baseline:
+            change = "{:+.1%}".format(
+                result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1)
+        print("{:<12} {:>12,} {:>14,.0f} {:>12,.0f}  {}".format(
+            name, result["ops"], result["ops_per_sec"],
+            result["peak_bytes"] / 1024.0, change))
+
+    if args.save:
+        with open(args.save, "w") as stream:
+            json.dump({"python": platform.python_version(),
+                       "scale": args.scale, "benchmarks": results},
+                      stream, indent=2, sort_keys=True)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, ratio in regressions:
+        print("REGRESSION: {} runs at {:.0%} of baseline".format(name, ratio))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,14 @@
 """Simple tools for building card games."""
 
+import os
+
 __title__ = "protocards"
 __version__ = "0.1.2"
 __author__ = "Finn Ellis"
+
+# The same variable as `instrument.ENV_VAR`, spelled out here so that
+# instrument (which imports cribbage) is only imported when it's set.
+if os.environ.get("PROTOCARDS_INSTRUMENT", "").lower() not in (
+        "", "0", "false", "no", "off"):
+    from . import instrument
+    instrument.enable()
@@ -0,0 +1,271 @@
+"""NumPy tools for working with many hands at once.
+
+Requires NumPy, which is an optional dependency of protocards; install
+it with the "numpy" extra. Hands are represented as integer arrays of
+card codes (see `protocards.standard.StandardCard.code`), one row per
+hand.
+
+"""
+
+import itertools
+
+import numpy as np
+
+from . import codec, masks, poker, standard
+
+
+# Cribbage point values by standard rank ordinal; the ace counts one.
+_VALUES = np.array([min(r + 2, 10) for r in range(len(standard.RANKS) - 1)]
+                   + [1])
+_JACK = standard.JACK.ordinal
+_LANE = len(standard.RANKS)
+_DECK_SIZE = len(standard._CARDS)
+
+# Card code for each bit of a `protocards.masks` mask.
+_BIT_CODES = np.array([card.code for card in masks._BIT_CARDS],
+                      dtype=np.intp)
+
+SCORE_TYPES = ("fifteens", "pairs", "runs", "flush", "heels", "nobs")
+
+
+def to_codes(hands):
+    """Return a 2D int array of the card codes in a sequence of hands.
+
+    All the hands must be the same length. An empty sequence gives a
+    (0, 0) array.
+
+    """
+    if not len(hands):
+        return np.empty((0, 0), dtype=np.intp)
+    return np.array([[card.code for card in hand] for hand in hands],
+                    dtype=np.intp).reshape(len(hands), -1)
+
+
+def _check_codes(codes, name):
+    """Raise ValueError if an array holds anything but card codes."""
+    if codes.size and (codes.min() < 0 or codes.max() >= _DECK_SIZE):
+        raise ValueError("{} must hold card codes from 0 to {}".format(
+            name, _DECK_SIZE - 1))
+
+
+def _subsets(size):
+    """Return a (2**size - 1, size) 0/1 array of the nonempty subsets."""
+    return np.array(list(itertools.product((0, 1), repeat=size))[1:],
+                    dtype=np.intp)
+
+
+def _score_runs(ranks):
+    """Score runs for an (N, k) array of standard rank ordinals."""
+    # Count ranks in cribbage order, with the ace at the bottom, and pad
+    # with an empty rank on either side so every run has two ends.
+    low_ranks = (ranks + 1) % _LANE
+    counts = np.zeros((len(ranks), _LANE + 2), dtype=np.intp)
+    for column in low_ranks.T:
+        counts[np.arange(len(ranks)), column + 1] += 1
+    present = counts > 0
+    runs = np.zeros(len(ranks), dtype=np.intp)
+    for length in range(3, min(ranks.shape[1], _LANE) + 1):
+        for start in range(1, _LANE - length + 2):
+            end = start + length
+            maximal = (present[:, start:end].all(axis=1) &
+                       ~present[:, start - 1] & ~present[:, end])
+            runs += np.where(maximal,
+                             length * counts[:, start:end].prod(axis=1), 0)
+    return runs
+
+
+def score_hands(cards, turned=None, crib=False, dealer=False):
+    """Calculate the cribbage scores of many hands at once.
+
+    Arguments are the same as for `protocards.cribbage.score_hand()`,
+    but in array form:
+
+    cards  - (N, k) int array of card codes, one hand per row.
+    turned - Optional (N,) int array of the turned card for each hand.
+    crib   - Boolean, or (N,) boolean array.
+    dealer - Boolean, or (N,) boolean array.
+
+    Returns a dictionary with the same keys as `score_hand()`, whose
+    values are (N,) int arrays of points. Raises ValueError if the
+    arrays don't have matching shapes or hold anything but card codes.
+    An empty batch (no rows) gets empty arrays.
+
+    """
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.ndim != 2:
+        raise ValueError("cards must be a 2D array")
+    count, size = cards.shape
+    if count == 0:
+        return {name: np.zeros(0, dtype=np.intp) for name in SCORE_TYPES}
+    if size == 0:
+        raise ValueError("cards must have at least one column")
+    _check_codes(cards, "cards")
+    crib = np.broadcast_to(np.asarray(crib, dtype=bool), (count,))
+    dealer = np.broadcast_to(np.asarray(dealer, dtype=bool), (count,))
+    if turned is None:
+        full = cards
+    else:
+        turned = np.asarray(turned, dtype=np.intp)
+        if turned.shape != (count,):
+            raise ValueError("turned must have one card per hand")
+        _check_codes(turned, "turned")
+        full = np.column_stack([cards, turned])
+
+    ranks = full >> 2
+    left, right = np.triu_indices(full.shape[1], 1)
+    sums = _VALUES[ranks] @ _subsets(full.shape[1]).T
+    score = {
+        "fifteens": 2 * (sums == 15).sum(axis=1),
+        "pairs": 2 * (ranks[:, left] == ranks[:, right]).sum(axis=1),
+        "runs": _score_runs(ranks),
+    }
+
+    suits = cards & 3
+    flush = (suits == suits[:, :1]).all(axis=1)
+    if turned is None:
+        score["flush"] = np.where(flush, size, 0)
+        score["heels"] = np.zeros(count, dtype=np.intp)
+        score["nobs"] = np.zeros(count, dtype=np.intp)
+        return score
+
+    turned_suit = turned & 3
+    with_turned = flush & (suits[:, 0] == turned_suit)
+    score["flush"] = np.where(with_turned, size + 1,
+                              np.where(flush & ~crib, size, 0))
+    heels = ~crib & dealer & ((turned >> 2) == _JACK)
+    nobs = ((cards >> 2 == _JACK) &
+            (suits == turned_suit[:, np.newaxis])).any(axis=1)
+    score["heels"] = np.where(heels, 2, 0)
+    score["nobs"] = np.where(~heels & nobs, 1, 0)
+    return score
+
+
+def spawn_generators(seed, count):
+    """Return `count` independent NumPy `Generator`s derived from `seed`.
+
+    Each uses the counter-based Philox bit generator, keyed from a
+    `SeedSequence` spawned from `seed`, so parallel workers can each
+    take one and get reproducible, non-overlapping streams.
+
+    """
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [np.random.Generator(np.random.Philox(child))
+            for child in children]
+
+
+def deal_array(deals, count, rng=None):
+    """Return a (deals, count) int array of random deals of card codes.
+
+    Each row is `count` distinct cards from a full deck, in random
+    order. `rng` is a NumPy `Generator`, and defaults to a fresh one.
+
+    """
+    size = len(standard.RANKS) * len(standard.SUITS)
+    if count > size:
+        raise IndexError("Not enough cards in a deck")
+    if rng is None:
+        rng = np.random.default_rng()
+    keys = rng.random((deals, size))
+    if count < size:
+        picked = np.argpartition(keys, count - 1, axis=1)[:, :count]
+    else:
+        picked = np.broadcast_to(np.arange(size), (deals, size))
+    order = np.argsort(np.take_along_axis(keys, picked, axis=1), axis=1)
+    return np.take_along_axis(picked, order, axis=1)
+
+
+def deal_batches(deals, count, rng=None, batch=100000):
+    """Yield `deal_array()`s of up to `batch` rows, `deals` rows in total.
+
+    For streaming more deals than fit in memory at once.
+
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    while deals > 0:
+        rows = min(batch, deals)
+        yield deal_array(rows, count, rng)
+        deals -= rows
+
+
+_poker_tables = None
+
+
+def _get_poker_tables():
+    """Return poker's tables as arrays: sorted products, strengths, flushes."""
+    global _poker_tables
+    if _poker_tables is None:
+        table = poker.rank_table()
+        products = np.array(sorted(table), dtype=np.int64)
+        strengths = np.array([table[p] for p in products.tolist()],
+                             dtype=np.int64)
+        flushes = np.array(poker.flush_table(), dtype=np.int64)
+        _poker_tables = products, strengths, flushes
+    return _poker_tables
+
+
+def evaluate_hands(cards):
+    """Return the poker strengths of many hands at once.
+
+    `cards` is an (N, k) int array of card codes, with k from 5 to 7.
+    Returns an (N,) int64 array of the same strengths as
+    `protocards.poker.evaluate()`.
+
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    if cards.ndim != 2 or not poker.MIN_CARDS <= cards.shape[1] <= \
+            poker.MAX_CARDS:
+        raise ValueError("cards must be an (N, 5 to 7) array")
+    products, strengths, flushes = _get_poker_tables()
+    ranks = cards >> 2
+    suits = cards & 3
+    primes = np.array(poker.PRIMES, dtype=np.int64)
+    found = strengths[np.searchsorted(products, primes[ranks].prod(axis=1))]
+    bits = np.int64(1) << ranks
+    for suit in range(len(standard.SUITS)):
+        lane = np.where(suits == suit, bits, 0).sum(axis=1)
+        found = np.maximum(found, flushes[lane])
+    return found
+
+
+def load_masks(path, mode="r"):
+    """Return a MASKS file (see `protocards.codec`) as a memory-mapped array.
+
+    The result is an (N,) uint64 array of masks backed by the file
+    itself, so nothing is read until it's used. `mode` is passed to
+    `numpy.memmap`; use "r+" to change the file in place. Raises
+    ValueError if the file isn't a MASKS file.
+
+    """
+    with open(path, "rb") as stream:
+        kind = codec.HandReader(stream).kind
+    if kind != codec.MASKS:
+        raise ValueError("{} doesn't hold mask records".format(path))
+    return np.memmap(path, dtype="<u8", mode=mode, offset=codec.HEADER_SIZE)
+
+
+def save_masks(path, hand_masks):
+    """Write an array of masks to `path` as a MASKS file."""
+    with open(path, "wb") as stream:
+        codec.HandWriter(stream, codec.MASKS)
+        np.asarray(hand_masks, dtype="<u8").tofile(stream)
+
+
+def mask_codes(hand_masks):
+    """Return an (N, k) array of the card codes in N masks of k cards each.
+
+    Codes in each row are in `protocards.masks` bit order. Raises
+    ValueError if the masks don't all have the same number of cards. An
+    empty sequence gives a (0, 0) array.
+
+    """
+    hand_masks = np.asarray(hand_masks, dtype=np.uint64)
+    if not len(hand_masks):
+        return np.empty((0, 0), dtype=np.intp)
+    shifts = np.arange(len(_BIT_CODES), dtype=np.uint64)
+    bits = (hand_masks[:, None] >> shifts) & np.uint64(1)
+    rows, columns = np.nonzero(bits)
+    counts = np.bincount(rows, minlength=len(hand_masks))
+    if len(counts) and (counts != counts[0]).any():
+        raise ValueError("Masks must all have the same number of cards")
+    return _BIT_CODES[columns].reshape(len(hand_masks), -1)
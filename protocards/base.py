@@ -1,13 +1,26 @@
 """Provides abstract tools for building card, hand, and game types."""
 
-import random
 import collections
+import collections.abc
+import itertools
+import random
+import sys
+
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(n):
+        """Return the number of set bits in `n`."""
+        return bin(n).count("1")
 
 
 class EqualityMixin(object):
 
     """Provide equality tests based on `__dict__`."""
 
+    __slots__ = ()
+
     def __eq__(self, other):
         try:
             return self.__dict__ == other.__dict__
@@ -61,7 +74,154 @@ class Card(EqualityMixin):
 
     """Placeholder to provide equality tests to subclasses."""
 
-    pass
+    __slots__ = ()
+
+
+class CompactCard(Card):
+
+    """Base class for card types made by `make_card_type()`.
+
+    Each card has one value on each of the type's axes, available as an
+    attribute named after the axis, and an integer `.code`: its axis
+    value indexes read as a mixed-radix number, first axis most
+    significant. There's only one instance of each card, all made along
+    with the type; cards can't be modified, and they compare and hash by
+    code.
+
+    Initialize with one value per axis, in order or by axis name.
+    Raises ValueError for values which aren't on their axis, and
+    TypeError for the wrong number of values.
+
+    """
+
+    __slots__ = ("code",)
+
+    # Set on each generated type: ((axis name, values), ...), the size
+    # of each axis, the code stride of each axis, the number of cards,
+    # each axis's {id(value): index}, every card by code, and the matching
+    # `CompactHand` class.
+    axes = ()
+    _sizes = ()
+    _strides = ()
+    size = 0
+    _lookups = ()
+    _cards = None
+    hand_class = None
+
+    def __new__(cls, *values, **named):
+        return cls.from_code(cls.encode(*values, **named))
+
+    @classmethod
+    def encode(cls, *values, **named):
+        """Return the code of the card with these axis values."""
+        if named:
+            values = list(values)
+            for axis, _ in cls.axes[len(values):]:
+                if axis not in named:
+                    raise TypeError("No value given for {}".format(axis))
+                values.append(named.pop(axis))
+            if named:
+                raise TypeError("Unexpected axes: {}".format(
+                    ", ".join(sorted(named))))
+        if len(values) != len(cls.axes):
+            raise TypeError("{} takes {} values, not {}".format(
+                cls.__name__, len(cls.axes), len(values)))
+        code = 0
+        for position, (value, stride) in enumerate(zip(values, cls._strides)):
+            code += cls._index(position, value) * stride
+        return code
+
+    @classmethod
+    def _index(cls, position, value):
+        """Return the index of `value` on the axis at `position`."""
+        index = cls._lookups[position].get(id(value))
+        if index is not None:
+            return index
+        # Not the same object, but maybe an equal one.
+        axis, values = cls.axes[position]
+        for index, candidate in enumerate(values):
+            if candidate == value:
+                return index
+        raise ValueError("Not a {} of {}: {!r}".format(
+            axis, cls.__name__, value))
+
+    @classmethod
+    def from_code(cls, code):
+        """Return the card with integer code `code`.
+
+        Raises ValueError if `code` isn't between 0 and `size` - 1.
+
+        """
+        if not 0 <= code < cls.size:
+            raise ValueError("Not a {} code: {!r}".format(cls.__name__,
+                                                          code))
+        return cls._cards[code]
+
+    @classmethod
+    def _make(cls, code):
+        """Build the single instance of a card; used only to fill `_cards`."""
+        card = object.__new__(cls)
+        object.__setattr__(card, "code", code)
+        for (axis, values), size, stride in zip(cls.axes, cls._sizes,
+                                                cls._strides):
+            object.__setattr__(card, axis, values[code // stride % size])
+        return card
+
+    @classmethod
+    def make_deck(cls):
+        """Return a `Hand` of one of every card, in code order."""
+        return Hand([cls.from_code(code) for code in range(cls.size)])
+
+    def values(self):
+        """Return a tuple of the card's value on each axis."""
+        return tuple(getattr(self, axis) for axis, _ in self.axes)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{}s are immutable".format(
+            self.__class__.__name__))
+
+    def __reduce__(self):
+        return (self.__class__.from_code, (self.code,))
+
+    def __str__(self):
+        return " ".join(str(value) for value in self.values())
+
+    def __repr__(self):
+        return "<{}:{}>".format(self.__class__.__name__, "/".join(
+            getattr(value, "short", str(value)) for value in self.values()))
+
+    def __hash__(self):
+        return self.code
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self.code == other.code
+        return NotImplemented
+
+    def __ne__(self, other):
+        if other.__class__ is self.__class__:
+            return self.code != other.code
+        return NotImplemented
+
+    def __lt__(self, other):
+        if other.__class__ is self.__class__:
+            return self.code < other.code
+        return NotImplemented
+
+    def __le__(self, other):
+        if other.__class__ is self.__class__:
+            return self.code <= other.code
+        return NotImplemented
+
+    def __gt__(self, other):
+        if other.__class__ is self.__class__:
+            return self.code > other.code
+        return NotImplemented
+
+    def __ge__(self, other):
+        if other.__class__ is self.__class__:
+            return self.code >= other.code
+        return NotImplemented
 
 
 class Hand(collections.UserList):
@@ -78,18 +238,420 @@ class Hand(collections.UserList):
         return "<{}({}):{}>".format(self.__class__.__name__,
                                     len(self), ",".join(map(str, self)))
 
-    def shuffle(self):
-        """Shuffle the contents of the hand."""
-        random.shuffle(self)
+    def shuffle(self, rng=None):
+        """Shuffle the contents of the hand.
 
-    def deal(self, count):
+        `rng` is the random number generator to use: anything with a
+        `shuffle()` method, like a `random.Random` or a NumPy
+        `Generator`. Defaults to the `random` module.
+
+        """
+        (random if rng is None else rng).shuffle(self.data)
+
+    def deal(self, count, rng=None):
         """Remove `count` items from the hand and return them.
 
+        Deals from the end of the hand, unless `rng` is given (see
+        `randbelow()`), in which case the items are drawn at random,
+        shuffling only the ones dealt.
+
         Raises IndexError if there are not enough items to remove.
 
         """
         if count > len(self):
             raise IndexError("Not enough cards in Hand")
+        if rng is not None:
+            partial_shuffle(self.data, count, rng)
         dealt = self.__class__(self[-count:])
         del self[-count:]
         return dealt
+
+
+class HandView(collections.abc.Sequence):
+
+    """A read-only window onto part of a `Deck`, as returned by dealing.
+
+    Supports `len()`, indexing, slicing (which returns a list),
+    iteration, `in`, `.index()` and `.count()`, and compares equal to
+    any sequence with the same items, without copying anything. Views
+    belong to one deal: once their deck is `reset()`, using them raises
+    RuntimeError. Call `to_hand()` to keep the cards for longer.
+
+    """
+
+    __slots__ = ("_deck", "_generation", "_start", "_stop")
+
+    def __init__(self, deck, start, stop):
+        self._deck = deck
+        self._generation = deck._generation
+        self._start = start
+        self._stop = stop
+
+    def _items(self):
+        if self._generation != self._deck._generation:
+            raise RuntimeError("The deck has been reset since this deal")
+        return self._deck._cards
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        items = self._items()
+        if isinstance(index, slice):
+            return [items[self._start + i]
+                    for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("HandView index out of range")
+        return items[self._start + index]
+
+    def __iter__(self):
+        return itertools.islice(self._items(), self._start, self._stop)
+
+    def __eq__(self, other):
+        if isinstance(other, collections.abc.Sequence) and \
+                not isinstance(other, str):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<{}({}):{}>".format(self.__class__.__name__,
+                                    len(self), ",".join(map(str, self)))
+
+    def to_hand(self):
+        """Return a copy of the cards as the deck's `hand_class`."""
+        return self._deck.hand_class(self[:])
+
+
+class Deck(object):
+
+    """A deck which deals by moving a cursor along a shuffled list.
+
+    Dealing doesn't copy or remove anything: it returns a `HandView` of
+    the next cards and moves past them. `reset()` shuffles every card
+    back in, in place, ready to deal again.
+
+    Required Argument:
+    cards   - Iterable of the cards in the deck.
+
+    Optional Arguments:
+    shuffle - Boolean; whether to shuffle the deck to begin with.
+              Defaults to True.
+    rng     - Random number generator for shuffling, as for
+              `Hand.shuffle()`. Defaults to the `random` module.
+
+    """
+
+    # Class of hand made by `HandView.to_hand()`.
+    hand_class = Hand
+
+    def __init__(self, cards, shuffle=True, rng=None):
+        self._cards = list(cards)
+        self._cursor = 0
+        self._generation = 0
+        self.rng = rng
+        if shuffle:
+            (random if rng is None else rng).shuffle(self._cards)
+
+    def __len__(self):
+        """Return the number of cards left to deal."""
+        return len(self._cards) - self._cursor
+
+    def __repr__(self):
+        return "<{}:{}/{} left>".format(self.__class__.__name__, len(self),
+                                        len(self._cards))
+
+    def deal(self, count):
+        """Deal the next `count` cards; returns a `HandView` of them.
+
+        Raises IndexError if there are not enough cards left, or
+        ValueError if `count` is negative.
+
+        """
+        if count < 0:
+            raise ValueError("Can't deal a negative number of cards")
+        start = self._cursor
+        if count > len(self._cards) - start:
+            raise IndexError("Not enough cards in Deck")
+        self._cursor = start + count
+        return HandView(self, start, start + count)
+
+    def deal_one(self):
+        """Deal and return the next card.
+
+        Raises IndexError if the deck is empty.
+
+        """
+        if self._cursor >= len(self._cards):
+            raise IndexError("Not enough cards in Deck")
+        self._cursor += 1
+        return self._cards[self._cursor - 1]
+
+    def remaining(self):
+        """Return a `HandView` of the cards not yet dealt, in order."""
+        return HandView(self, self._cursor, len(self._cards))
+
+    def reset(self, rng=None):
+        """Shuffle all the cards back in, in place, and start dealing again.
+
+        Views from earlier deals stop working. `rng` defaults to the one
+        the deck was made with.
+
+        """
+        rng = self.rng if rng is None else rng
+        (random if rng is None else rng).shuffle(self._cards)
+        self._cursor = 0
+        self._generation += 1
+
+
+class CompactHand(object):
+
+    """A set of cards of one `make_card_type()` type, stored as a bitmask.
+
+    Bit `code` is set for each card held, and for each value of each
+    axis the type keeps a mask of the cards with that value, so finding
+    or counting the cards with a value is a single bit operation however
+    big the hand. Use the hand class made along with a card type (its
+    `hand_class`), initialized optionally with an iterable of its cards;
+    duplicates are only counted once. Raises TypeError for other cards.
+
+    Supports `len()`, `in`, iteration (in code order), equality and
+    hashing, and the set operators `|`, `&`, `-` and `^`.
+
+    Attributes:
+        mask - The integer backing the hand. Read-only.
+
+    """
+
+    __slots__ = ("mask",)
+
+    # Set on each generated class: the card type, the position of each
+    # axis by name, and for each axis a list of masks by value index.
+    card_type = None
+    _positions = None
+    _axis_masks = None
+
+    def __init__(self, cards=()):
+        mask = 0
+        card_type = self.card_type
+        for card in cards:
+            if card.__class__ is not card_type:
+                raise TypeError("Not a {}: {!r}".format(card_type.__name__,
+                                                        card))
+            mask |= 1 << card.code
+        object.__setattr__(self, "mask", mask)
+
+    @classmethod
+    def from_mask(cls, mask):
+        """Return a hand of the cards set in the integer `mask`.
+
+        Raises ValueError if `mask` has bits above the type's cards.
+
+        """
+        if mask >> cls.card_type.size:
+            raise ValueError("Not a {} mask: {!r}".format(cls.__name__,
+                                                          mask))
+        hand = cls.__new__(cls)
+        object.__setattr__(hand, "mask", mask)
+        return hand
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{}s are immutable".format(
+            self.__class__.__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError("{}s are immutable".format(
+            self.__class__.__name__))
+
+    def to_hand(self):
+        """Return a list-like `Hand` of the same cards."""
+        return Hand(list(self))
+
+    def _value_mask(self, axis, value):
+        try:
+            position = self._positions[axis]
+        except KeyError:
+            raise ValueError("{} has no axis {!r}".format(
+                self.card_type.__name__, axis))
+        index = self.card_type._index(position, value)
+        return self._axis_masks[position][index]
+
+    def by(self, axis, value):
+        """Return the cards whose `axis` is `value`, as a new hand."""
+        return self.from_mask(self.mask & self._value_mask(axis, value))
+
+    def count(self, axis, value):
+        """Return the number of cards whose `axis` is `value`."""
+        return popcount(self.mask & self._value_mask(axis, value))
+
+    def counts(self, axis):
+        """Return a list of the number of cards with each value of `axis`."""
+        if axis not in self._positions:
+            raise ValueError("{} has no axis {!r}".format(
+                self.card_type.__name__, axis))
+        return [popcount(self.mask & m)
+                for m in self._axis_masks[self._positions[axis]]]
+
+    def __repr__(self):
+        return "<{}:{}>".format(self.__class__.__name__,
+                                ",".join(repr(card) for card in self))
+
+    def __len__(self):
+        return popcount(self.mask)
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __iter__(self):
+        from_code = self.card_type.from_code
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield from_code(low.bit_length() - 1)
+            mask ^= low
+
+    def __contains__(self, card):
+        if card.__class__ is not self.card_type:
+            return False
+        return bool(self.mask >> card.code & 1)
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __ne__(self, other):
+        if other.__class__ is self.__class__:
+            return self.mask != other.mask
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __or__(self, other):
+        if other.__class__ is self.__class__:
+            return self.from_mask(self.mask | other.mask)
+        return NotImplemented
+
+    def __and__(self, other):
+        if other.__class__ is self.__class__:
+            return self.from_mask(self.mask & other.mask)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if other.__class__ is self.__class__:
+            return self.from_mask(self.mask & ~other.mask)
+        return NotImplemented
+
+    def __xor__(self, other):
+        if other.__class__ is self.__class__:
+            return self.from_mask(self.mask ^ other.mask)
+        return NotImplemented
+
+
+def make_card_type(name, axes, module=None):
+    """Make a compact card class, and a matching hand class, for a deck.
+
+    Required Arguments:
+    name   - String; the name of the card class. The hand class is
+             named `name` + "Hand".
+    axes   - Sequence of (axis name, values) pairs, one for each property
+             a card has, like `[("color", COLORS), ("number", range(1,
+             4))]`. Values can be `CardProperty`s or anything else that
+             compares with `==`. There's one card for each combination
+             of values, and cards are ordered by their first axis, then
+             their second, and so on.
+
+    Optional Argument:
+    module - String; the `__module__` to give the classes, so their cards
+             can be pickled. Defaults to the caller's module.
+
+    Returns the card class, a subclass of `CompactCard`. Its
+    `hand_class` attribute is the hand class, a subclass of
+    `CompactHand`. Raises ValueError if an axis name is repeated, isn't
+    an identifier, or has no values.
+
+    """
+    axes = tuple((axis, tuple(values)) for axis, values in axes)
+    names = [axis for axis, _ in axes]
+    if len(set(names)) != len(names):
+        raise ValueError("Axis names must be unique")
+    for axis, values in axes:
+        if not axis.isidentifier() or axis in dir(CompactCard):
+            raise ValueError("Not a usable axis name: {!r}".format(axis))
+        if not values:
+            raise ValueError("Axis {} has no values".format(axis))
+    sizes = tuple(len(values) for _, values in axes)
+    strides = []
+    stride = 1
+    for size in reversed(sizes):
+        strides.append(stride)
+        stride *= size
+    strides = tuple(reversed(strides))
+    if module is None:
+        module = sys._getframe(1).f_globals.get("__name__", "__main__")
+
+    card_type = type(name, (CompactCard,), {
+        "__slots__": tuple(names),
+        "__module__": module,
+        "axes": axes,
+        "_sizes": sizes,
+        "_strides": strides,
+        "size": stride,
+        "_lookups": tuple({id(value): i for i, value in enumerate(values)}
+                          for _, values in axes),
+    })
+    # Every card is made now, so there's only ever one of each.
+    card_type._cards = tuple(card_type._make(code) for code in range(stride))
+    axis_masks = []
+    for size, axis_stride in zip(sizes, strides):
+        masks = [0] * size
+        for code in range(stride):
+            masks[code // axis_stride % size] |= 1 << code
+        axis_masks.append(masks)
+    card_type.hand_class = type(name + "Hand", (CompactHand,), {
+        "__slots__": (),
+        "__module__": module,
+        "card_type": card_type,
+        "_positions": {axis: i for i, axis in enumerate(names)},
+        "_axis_masks": tuple(axis_masks),
+    })
+    return card_type
+
+
+def randbelow(rng):
+    """Return a function which picks a random int from 0 up to its argument.
+
+    `rng` can be anything with a `randrange()` method, like the `random`
+    module or a `random.Random`, or with an `integers()` method, like a
+    NumPy `Generator`.
+
+    """
+    if hasattr(rng, "randrange"):
+        return rng.randrange
+    integers = rng.integers
+    return lambda n: int(integers(n))
+
+
+def partial_shuffle(items, count, rng=None):
+    """Move `count` randomly chosen items to the end of a list, in place.
+
+    Runs the last `count` steps of a Fisher-Yates shuffle, so the end of
+    the list is a uniformly random selection in random order, while only
+    `count` random numbers are drawn. `rng` is as for `randbelow()`, and
+    defaults to the `random` module. Returns `items`.
+
+    """
+    below = randbelow(random if rng is None else rng)
+    last = len(items) - 1
+    for i in range(last, last - count, -1):
+        j = below(i + 1)
+        items[i], items[j] = items[j], items[i]
+    return items
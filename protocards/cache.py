@@ -0,0 +1,191 @@
+"""A thread-safe memoizing cache for evaluators like `score_hand()`.
+
+Hands are lists, so they can't be dictionary keys, and two hands with
+the same cards in a different order score the same. `hand_key()` turns
+a hand into a hashable key that ignores order. `Cache` is a mapping
+with a maximum size which evicts either the least recently used or the
+least frequently used entry when full, and counts its hits and misses.
+`memoize()` wraps a function so its results are kept in a `Cache`.
+
+For example, `cribbage.cached_score_hand()` is built like this:
+
+    score = memoize(Cache(10000, policy=LFU), key=..., copy=dict)(
+        cribbage.score_hand)
+
+"""
+
+import collections
+import functools
+import threading
+
+from . import standard
+
+
+LRU = "lru"
+LFU = "lfu"
+POLICIES = (LRU, LFU)
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "size"])
+CacheInfo.__doc__ = """Statistics for a `Cache`, from `Cache.info()`.
+
+hits      - Int; lookups which found a value.
+misses    - Int; lookups which didn't.
+evictions - Int; entries removed to make room for new ones.
+maxsize   - Int; the most entries the cache will hold.
+size      - Int; the number of entries it holds now.
+"""
+
+_MISSING = object()
+
+
+# Keys for hands of StandardCards; see `protocards.standard.hand_key()`.
+hand_key = standard.hand_key
+
+
+class Cache(object):
+
+    """A bounded mapping which evicts entries by LRU or LFU policy.
+
+    Optional Arguments:
+    maxsize - Int; the most entries to keep. Must be at least 1.
+    policy  - `LRU` to evict the entry used longest ago, or `LFU` to
+              evict the one used least often (the oldest of those, if
+              there's a tie).
+
+    Every method takes a lock, so one cache can be shared by threads.
+    Lookups, insertions and evictions are all O(1).
+
+    Raises ValueError for an unknown policy or a maxsize below 1.
+
+    """
+
+    def __init__(self, maxsize=1024, policy=LRU):
+        if policy not in POLICIES:
+            raise ValueError("Unknown cache policy: {!r}".format(policy))
+        if maxsize < 1:
+            raise ValueError("A cache needs a maxsize of at least 1")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            # LRU keeps entries oldest first; LFU keeps a use count per
+            # key, and the keys with each count oldest first.
+            self._data = collections.OrderedDict()
+            self._uses = {}
+            self._by_uses = {}
+            self._least = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        """Whether `key` is cached; doesn't count as a use."""
+        return key in self._data
+
+    def __repr__(self):
+        return "<{}:{} {}/{}>".format(self.__class__.__name__, self.policy,
+                                      len(self._data), self.maxsize)
+
+    def _touch(self, key):
+        if self.policy == LRU:
+            self._data.move_to_end(key)
+            return
+        uses = self._uses[key]
+        bucket = self._by_uses[uses]
+        del bucket[key]
+        if not bucket:
+            del self._by_uses[uses]
+            if self._least == uses:
+                self._least = uses + 1
+        self._uses[key] = uses + 1
+        self._by_uses.setdefault(uses + 1, collections.OrderedDict())[key] = \
+            None
+
+    def _evict(self):
+        if self.policy == LRU:
+            self._data.popitem(last=False)
+        else:
+            bucket = self._by_uses[self._least]
+            key = bucket.popitem(last=False)[0]
+            if not bucket:
+                del self._by_uses[self._least]
+            del self._uses[key]
+            del self._data[key]
+        self.evictions += 1
+
+    def get(self, key, default=None):
+        """Return the value for `key`, or `default`, counting a hit or miss."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._touch(key)
+            return value
+
+    def put(self, key, value):
+        """Store `value` for `key`, evicting an entry if the cache is full."""
+        with self._lock:
+            if key in self._data:
+                self._data[key] = value
+                self._touch(key)
+                return
+            if len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = value
+            if self.policy == LFU:
+                self._uses[key] = 1
+                self._by_uses.setdefault(1, collections.OrderedDict())[key] = \
+                    None
+                self._least = 1
+
+    def info(self):
+        """Return a `CacheInfo` of the cache's statistics."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._data))
+
+
+def memoize(cache, key=None, copy=None):
+    """Return a decorator which caches a function's results in `cache`.
+
+    Required Argument:
+    cache - `Cache` to keep results in. One cache can serve several
+            functions if their keys can't collide.
+
+    Optional Arguments:
+    key   - Function taking the same arguments as the decorated function
+            and returning a hashable key. Defaults to a tuple of the
+            positional arguments and sorted keyword arguments.
+    copy  - Function applied to results on the way out of the cache,
+            like `dict`, so callers can't change the cached value.
+
+    The decorated function runs outside the cache's lock, so two threads
+    missing on the same key at once may both compute it. The wrapper has
+    a `.cache` attribute.
+
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if key is None:
+                k = (args, tuple(sorted(kwargs.items())))
+            else:
+                k = key(*args, **kwargs)
+            value = cache.get(k, _MISSING)
+            if value is _MISSING:
+                value = function(*args, **kwargs)
+                cache.put(k, value)
+            return value if copy is None else copy(value)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
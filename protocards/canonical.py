@@ -0,0 +1,174 @@
+"""Canonical forms of standard hands, up to relabelling the suits.
+
+Swapping the suits of a hand around (say, every heart for a spade and
+every spade for a heart) doesn't change anything that only looks at
+whether cards share a suit, like cribbage scoring. So hands can be
+collapsed into classes which are the same up to suit, by up to 24x.
+
+A hand's class is identified by its *suit pattern*: a tuple with one
+`(lane, turned)` pair per suit, where `lane` is the bitmask of ranks
+held in that suit (by rank ordinal, as in `protocards.masks`) and
+`turned` is the ordinal of the turned card's rank if it's of that suit
+and -1 otherwise. The pairs are sorted in descending order, so the
+suits of the canonical hand are assigned by how many and which cards
+they hold, not which suit they originally were.
+
+"""
+
+import bisect
+import collections
+import math
+
+from . import standard
+from .masks import LANE, popcount
+
+
+NO_TURNED = -1
+_NSUITS = len(standard.SUITS)
+_PERMUTATIONS = math.factorial(_NSUITS)
+
+Canonical = collections.namedtuple(
+    "Canonical", ["hand", "turned", "multiplicity", "pattern"])
+Canonical.__doc__ = """A hand in canonical form; see `canonicalize()`.
+
+hand         - StandardHand of the canonical cards, in `make_deck()` order.
+turned       - The canonical turned card, or None.
+multiplicity - Int; how many distinct hands (with turned cards) share
+               this canonical form.
+pattern      - The suit pattern of the canonical form.
+"""
+
+
+def suit_pattern(cards, turned=None):
+    """Return the suit pattern of `cards` and a turned card, if any.
+
+    Returns a tuple of the pattern and a list mapping each canonical suit
+    ordinal to the actual suit ordinal it was relabelled from.
+
+    """
+    lanes = [0] * _NSUITS
+    for card in cards:
+        lanes[card.suit.ordinal] |= 1 << card.rank.ordinal
+    turns = [NO_TURNED] * _NSUITS
+    if turned is not None:
+        turns[turned.suit.ordinal] = turned.rank.ordinal
+    states = [(lanes[s], turns[s]) for s in range(_NSUITS)]
+    order = sorted(range(_NSUITS), key=lambda s: (states[s], -s),
+                   reverse=True)
+    return tuple(states[s] for s in order), order
+
+
+def multiplicity(pattern):
+    """Return how many distinct hands have the suit pattern `pattern`."""
+    duplicates = 1
+    for count in collections.Counter(pattern).values():
+        duplicates *= math.factorial(count)
+    return _PERMUTATIONS // duplicates
+
+
+def from_pattern(pattern):
+    """Return (StandardHand, turned card or None) for a suit pattern."""
+    hand = standard.StandardHand()
+    turned = None
+    for suit, (lane, rank) in enumerate(pattern):
+        for r in range(LANE):
+            if lane >> r & 1:
+                hand.append(standard.StandardCard.from_code(r * 4 + suit))
+        if rank != NO_TURNED:
+            turned = standard.StandardCard.from_code(rank * 4 + suit)
+    return hand, turned
+
+
+def canonicalize(cards, turned=None):
+    """Return the `Canonical` form of some cards and optional turned card.
+
+    `cards` can be any iterable of distinct StandardCards, like a
+    StandardHand. The canonical form is the same for every hand that
+    differs from this one only by which suit is which.
+
+    """
+    pattern, _ = suit_pattern(cards, turned)
+    hand, canonical_turned = from_pattern(pattern)
+    return Canonical(hand, canonical_turned, multiplicity(pattern), pattern)
+
+
+class CanonicalIndex(object):
+
+    """A dense numbering of every suit pattern of a given size.
+
+    Initialize with the number of cards in a hand and whether there's a
+    turned card as well. Every canonical form of that size gets an index
+    from 0 to `len(index) - 1`, so results for each can be stored in a
+    flat list or array.
+
+    The patterns are enumerated when the index is created, which takes
+    time and memory proportional to their number: 16,432 for four-card
+    hands (a fraction of a second), and 652,353 for four cards and a
+    turned card (a few seconds).
+
+    Attributes:
+        size, turned - As provided.
+        patterns     - List of every suit pattern, in index order.
+
+    """
+
+    def __init__(self, size, turned=False):
+        self.size = size
+        self.turned = turned
+        self.patterns = list(self._enumerate())
+        self._indices = {p: i for i, p in enumerate(self.patterns)}
+
+    def _enumerate(self):
+        """Yield every suit pattern of this size, in a fixed order."""
+        states = []
+        for lane in range(1 << LANE):
+            if popcount(lane) <= self.size:
+                states.append((lane, NO_TURNED))
+                if self.turned:
+                    states.extend((lane, r) for r in range(LANE)
+                                  if not lane >> r & 1)
+        states.sort(reverse=True)
+        # Positions in `states` by (cards including turned, turned cards).
+        buckets = collections.defaultdict(list)
+        for i, (lane, rank) in enumerate(states):
+            turns = int(rank != NO_TURNED)
+            buckets[popcount(lane) + turns, turns].append(i)
+
+        def fill(suits, start, cards, turns):
+            # Patterns are non-increasing, so each state is chosen from
+            # `start` on, and the last suit takes whatever is left.
+            if suits == 1:
+                positions = buckets.get((cards, turns), [])
+                for i in positions[bisect.bisect_left(positions, start):]:
+                    yield (states[i],)
+                return
+            for (more, turn), positions in sorted(buckets.items()):
+                if more > cards or turn > turns:
+                    continue
+                for i in positions[bisect.bisect_left(positions, start):]:
+                    for rest in fill(suits - 1, i, cards - more,
+                                     turns - turn):
+                        yield (states[i],) + rest
+
+        return fill(_NSUITS, 0, self.size + int(self.turned),
+                    int(self.turned))
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def index(self, cards, turned=None):
+        """Return the index of the canonical form of `cards` and `turned`.
+
+        Raises ValueError if they aren't the size this index covers.
+
+        """
+        if (len(cards) != self.size or
+                (turned is not None) != bool(self.turned)):
+            raise ValueError("Cards don't match the size of this index")
+        return self._indices[suit_pattern(cards, turned)[0]]
+
+    def canonical(self, index):
+        """Return the `Canonical` form with index `index`."""
+        pattern = self.patterns[index]
+        hand, turned = from_pattern(pattern)
+        return Canonical(hand, turned, multiplicity(pattern), pattern)
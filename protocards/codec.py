@@ -0,0 +1,239 @@
+"""A compact binary format for storing many hands or deals.
+
+A file starts with an 8-byte header: the magic bytes b"PCRD", a format
+version, the kind of records that follow, and two reserved zero bytes.
+There are three kinds:
+
+HANDS - Each record is one hand: a byte giving its number of cards,
+        then the card codes (see `protocards.standard.StandardCard`)
+        packed six bits each, little-endian, padded to a whole byte.
+        Hands keep their order and can have up to 255 cards.
+DEALS - Each record is one deal: a byte giving its number of hands,
+        then that many HANDS records.
+MASKS - Each record is one hand as an 8-byte little-endian mask, laid
+        out as in `protocards.masks`. Hands lose their order, but the
+        records have a fixed size, so a file of them can be read as an
+        array; see `protocards.arrays.load_masks()`.
+
+`HandWriter` and `HandReader` write and read these files one record at
+a time, so they never need to hold the whole file in memory.
+
+"""
+
+import struct
+
+from . import masks, standard
+
+
+MAGIC = b"PCRD"
+VERSION = 1
+HANDS, DEALS, MASKS = range(3)
+KINDS = (HANDS, DEALS, MASKS)
+HEADER_SIZE = 8
+MASK_SIZE = 8
+MAX_CARDS = 255
+
+_HEADER = struct.Struct("<4sBBxx")
+_MASK = struct.Struct("<Q")
+_CODE_BITS = 6
+_CODE_MASK = (1 << _CODE_BITS) - 1
+_DECK_SIZE = len(standard._CARDS)
+
+
+def _as_codes(cards):
+    codes = [standard.card_code(card) for card in cards]
+    if len(codes) > MAX_CARDS:
+        raise ValueError("Can't encode more than {} cards".format(MAX_CARDS))
+    return codes
+
+
+def _packed_size(count):
+    return (count * _CODE_BITS + 7) // 8
+
+
+def encode_hand(cards):
+    """Return the HANDS record for `cards` (StandardCards or codes)."""
+    codes = _as_codes(cards)
+    packed = 0
+    for i, code in enumerate(codes):
+        packed |= code << (i * _CODE_BITS)
+    return bytes((len(codes),)) + packed.to_bytes(_packed_size(len(codes)),
+                                                  "little")
+
+
+def decode_hand(data, offset=0):
+    """Decode the HANDS record at `offset` in `data`.
+
+    Returns a tuple of the hand's card codes and the offset just past
+    the record. Raises ValueError if the record is cut short or holds a
+    code which isn't a card.
+
+    """
+    if offset >= len(data):
+        raise ValueError("Truncated hand record")
+    count = data[offset]
+    end = offset + 1 + _packed_size(count)
+    if end > len(data):
+        raise ValueError("Truncated hand record")
+    packed = int.from_bytes(data[offset + 1:end], "little")
+    codes = tuple((packed >> (i * _CODE_BITS)) & _CODE_MASK
+                  for i in range(count))
+    for code in codes:
+        if code >= _DECK_SIZE:
+            raise ValueError("Not a card code: {}".format(code))
+    return codes, end
+
+
+def encode_mask(cards):
+    """Return the MASKS record for `cards` (StandardCards, codes, or a
+    `protocards.masks.MaskHand`)."""
+    if isinstance(cards, masks.MaskHand):
+        mask = cards.mask
+    else:
+        mask = 0
+        for code in _as_codes(cards):
+            mask |= masks.BITS[code]
+    return _MASK.pack(mask)
+
+
+def decode_mask(data, offset=0):
+    """Decode the MASKS record at `offset` in `data`.
+
+    Returns the mask and the offset just past the record.
+
+    """
+    if offset + MASK_SIZE > len(data):
+        raise ValueError("Truncated mask record")
+    return _MASK.unpack_from(data, offset)[0], offset + MASK_SIZE
+
+
+class HandWriter(object):
+
+    """Writes records of one kind to a binary file object.
+
+    The header is written straight away. Use as a context manager, or
+    call `flush()` when done; the file itself is left open.
+
+    """
+
+    def __init__(self, stream, kind=HANDS):
+        if kind not in KINDS:
+            raise ValueError("Unknown record kind: {!r}".format(kind))
+        self.stream = stream
+        self.kind = kind
+        self.count = 0
+        stream.write(_HEADER.pack(MAGIC, VERSION, kind))
+
+    def write(self, record):
+        """Write one record.
+
+        For HANDS and MASKS files, `record` is a hand: StandardCards,
+        card codes, or (for MASKS) a MaskHand. For DEALS files, it's a
+        sequence of hands.
+
+        """
+        if self.kind == HANDS:
+            data = encode_hand(record)
+        elif self.kind == MASKS:
+            data = encode_mask(record)
+        else:
+            hands = list(record)
+            if len(hands) > MAX_CARDS:
+                raise ValueError(
+                    "Can't encode more than {} hands".format(MAX_CARDS))
+            data = bytes((len(hands),)) + b"".join(
+                encode_hand(hand) for hand in hands)
+        self.stream.write(data)
+        self.count += 1
+
+    def write_all(self, records):
+        """Write every record in an iterable."""
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+class HandReader(object):
+
+    """Reads records from a binary file object written by `HandWriter`.
+
+    Iterating yields records as plain values: tuples of card codes for
+    HANDS, tuples of those for DEALS, and int masks for MASKS.
+    `hands()` yields them as StandardHands and MaskHands instead.
+
+    Raises ValueError if the header is missing or from a newer version,
+    or the file ends partway through a record.
+
+    """
+
+    def __init__(self, stream, chunk_size=1 << 16):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        header = stream.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError("Not a protocards file: header too short")
+        magic, version, kind = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Not a protocards file: bad magic bytes")
+        if version > VERSION or kind not in KINDS:
+            raise ValueError("Unsupported protocards file version or kind")
+        self.version = version
+        self.kind = kind
+
+    def _decode(self, data, offset):
+        if self.kind == HANDS:
+            return decode_hand(data, offset)
+        if self.kind == MASKS:
+            return decode_mask(data, offset)
+        if offset >= len(data):
+            raise ValueError("Truncated deal record")
+        hands = []
+        end = offset + 1
+        for _ in range(data[offset]):
+            hand, end = decode_hand(data, end)
+            hands.append(hand)
+        return tuple(hands), end
+
+    def __iter__(self):
+        data = b""
+        offset = 0
+        while True:
+            if offset < len(data):
+                try:
+                    record, end = self._decode(data, offset)
+                except ValueError:
+                    pass
+                else:
+                    offset = end
+                    yield record
+                    continue
+            more = self.stream.read(self.chunk_size)
+            if not more:
+                if offset < len(data):
+                    raise ValueError("File ends partway through a record")
+                return
+            data = data[offset:] + more
+            offset = 0
+
+    def hands(self):
+        """Yield records as StandardHands (a list of them for DEALS) or
+        MaskHands."""
+        for record in self:
+            if self.kind == HANDS:
+                yield _to_hand(record)
+            elif self.kind == DEALS:
+                yield [_to_hand(hand) for hand in record]
+            else:
+                yield masks.MaskHand.from_mask(record)
+
+
+def _to_hand(codes):
+    return standard.StandardHand([standard._CARDS[c] for c in codes])
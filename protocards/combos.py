@@ -0,0 +1,140 @@
+"""Lazy iteration over combinations of cards, with ranking.
+
+Combinations are yielded as tuples of whatever is being combined
+(usually card codes) or as bitmasks, never as hands, so iterating over
+millions of them costs no more than it has to. They come in
+lexicographic order, the same as `itertools.combinations()`, and each
+has a rank: its position in that order. `rank()` and `unrank()` convert
+between the two using the combinatorial number system, so a range of
+combinations can be handed to a worker, or an interrupted loop resumed,
+by index.
+
+"""
+
+import itertools
+import math
+
+from . import dealing, standard
+
+
+def count(n, k):
+    """Return the number of combinations of `k` from `n` items."""
+    return math.comb(n, k)
+
+
+def rank(positions, n):
+    """Return the lexicographic rank of a combination of `n` items.
+
+    `positions` are the indices of the chosen items, in increasing order.
+
+    """
+    k = len(positions)
+    # Lexicographic order is colexicographic order of the items reversed.
+    colex = 0
+    for i, position in enumerate(reversed(positions)):
+        colex += math.comb(n - 1 - position, i + 1)
+    return math.comb(n, k) - 1 - colex
+
+
+def unrank(index, n, k):
+    """Return the positions of combination number `index` of `k` from `n`.
+
+    The inverse of `rank()`. Raises IndexError if there aren't that many
+    combinations.
+
+    """
+    total = math.comb(n, k)
+    if not 0 <= index < total:
+        raise IndexError("Combination index out of range")
+    colex = total - 1 - index
+    reversed_positions = []
+    top = n
+    for i in range(k, 0, -1):
+        # The largest c with comb(c, i) <= colex.
+        c = top - 1
+        while math.comb(c, i) > colex:
+            c -= 1
+        reversed_positions.append(c)
+        colex -= math.comb(c, i)
+        top = c
+    return [n - 1 - c for c in reversed_positions]
+
+
+def combinations(items, k, start=0, stop=None):
+    """Yield tuples of `k` of `items`, from rank `start` up to `stop`.
+
+    Without a range this is just `itertools.combinations()`; with one,
+    it starts from `unrank(start)` and steps forward, so skipping ahead
+    costs nothing.
+
+    """
+    items = list(items)
+    n = len(items)
+    total = math.comb(n, k)
+    if stop is None or stop > total:
+        stop = total
+    if start == 0 and stop == total:
+        for combo in itertools.combinations(items, k):
+            yield combo
+        return
+    if start >= stop:
+        return
+    positions = unrank(start, n, k)
+    for _ in range(stop - start):
+        yield tuple(items[p] for p in positions)
+        # Advance the rightmost position that can move, and pack the
+        # ones after it up behind it.
+        i = k - 1
+        while i >= 0 and positions[i] == n - k + i:
+            i -= 1
+        if i < 0:
+            return
+        positions[i] += 1
+        for j in range(i + 1, k):
+            positions[j] = positions[j - 1] + 1
+
+
+def split(n, k, parts):
+    """Split the combinations of `k` from `n` into `parts` rank ranges.
+
+    Returns a list of (start, stop) pairs of nearly equal sizes, covering
+    every rank once, for `combinations()`.
+
+    """
+    total = math.comb(n, k)
+    bounds = [total * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(parts)
+            if bounds[i] < bounds[i + 1]]
+
+
+def remaining(dead=()):
+    """Return the list of card codes not in `dead` (cards or codes).
+
+    Raises ValueError for a code which isn't a card.
+
+    """
+    used = 0
+    for card in dead:
+        used |= 1 << standard.card_code(card)
+    return [c for c in range(dealing.DECK_SIZE) if not used >> c & 1]
+
+
+def hands(k, dead=(), start=0, stop=None):
+    """Yield every `k`-card hand from the deck without `dead`, as codes.
+
+    Hands are tuples of card codes, in rank order; `start` and `stop`
+    select a range of ranks as for `combinations()`.
+
+    """
+    return combinations(remaining(dead), k, start, stop)
+
+
+def masks(mask, k):
+    """Yield every bitmask made of `k` of the set bits of `mask`."""
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low)
+        mask ^= low
+    for combo in itertools.combinations(bits, k):
+        yield sum(combo)
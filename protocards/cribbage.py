@@ -1,27 +1,77 @@
-"""Functions for scoring cribbage hands."""
-
+"""Functions for scoring cribbage hands and the play."""
+
+import collections
+import functools
+import itertools
+import os
+import random
+import sys
 from operator import mul
 
 from . import standard
 from functools import reduce
 
+# `protocards.cache` and `protocards.canonical` (which imports masks) are
+# each about 4.5 ms to import and only used by `cached_score_hand()` and
+# the discard analysis, so they're imported in those functions. Likewise
+# `array`, `struct` and `zlib` for reading and writing the rank table.
+
 
 RANKS = [standard.RANKS[-1]] + standard.RANKS[:-1]
 SUITS = standard.SUITS
 
+# Hands of up to this many cards (including the turned card) are scored
+# for fifteens, pairs and runs with a single lookup in `_rank_table`.
+TABLE_CARDS = 5
+
+# Three bits per rank, by standard ordinal; summing the weights of a
+# hand's cards gives a key that depends only on its multiset of ranks.
+RANK_WEIGHTS = tuple(1 << (3 * r) for r in range(len(standard.RANKS)))
+_rank_table = None
+# The rank table ships precomputed in this file; see `save_rank_table()`.
+RANK_TABLE_FILE = os.path.join(os.path.dirname(__file__), "data",
+                               "rank_table.bin")
+_TABLE_MAGIC = b"PCRT"
+# `struct` format of the header: the magic and the number of entries.
+_TABLE_HEADER = "<4sI"
+
+# Point values by standard rank ordinal; the ace, last there, counts one.
+VALUES = tuple(min(r + 2, 10)
+               for r in range(len(standard.RANKS) - 1)) + (1,)
+# And by card code.
+CARD_VALUES = tuple(VALUES[code >> 2] for code in range(len(standard._CARDS)))
+
+_JACK = standard.JACK.ordinal
+
 
 def value(card):
     """Calculate the point value of a single card; returns an int."""
-    return min(RANKS.index(card.rank) + 1, 10)
+    return CARD_VALUES[card.code]
+
+
+def rank_counts(hand):
+    """Count the cards of each rank in a hand, in the order of `RANKS`.
+
+    Works with anything that iterates over StandardCards, including a
+    `protocards.masks.MaskHand`. Returns a list of 13 ints.
+
+    """
+    if hasattr(hand, "rank_counts"):
+        counts = hand.rank_counts()
+    else:
+        counts = [0] * len(RANKS)
+        for card in hand:
+            counts[card.rank.ordinal] += 1
+    # Cribbage puts the ace, last in standard order, at the bottom.
+    return counts[-1:] + counts[:-1]
 
 
 def score_pairs(hand):
     """Calculate the points for pairs in a hand; returns an int."""
     pairs = 0
-    for r in RANKS:
-        same = float(len(hand.by_rank(r)))
-        pairs += (same * ((same - 1) / 2))
-    return int(pairs) * 2
+    for same in rank_counts(hand):
+        pairs += same * (same - 1) // 2
+    return pairs * 2
 
 
 def score_fifteens(hand):
@@ -45,19 +95,17 @@ def score_fifteens(hand):
 
 def score_runs(hand):
     """Calculate the points for runs in a hand; returns an int."""
-    rank_counts = []
-    for r in RANKS:
-        rank_counts.append(len(hand.by_rank(r)))
+    counts = rank_counts(hand)
 
     run_slices = []
     begin = 0
     for end in range(len(RANKS)):
-        if rank_counts[end] == 0:
+        if counts[end] == 0:
             if end > begin:
-                run_slices.append(rank_counts[begin:end])
+                run_slices.append(counts[begin:end])
             begin = end + 1
     if begin < len(RANKS):
-        run_slices.append(rank_counts[begin:])
+        run_slices.append(counts[begin:])
 
     run_score = 0
     for run in run_slices:
@@ -68,9 +116,157 @@ def score_runs(hand):
 
 def check_flush(hand):
     """Check whether the hand has a flush; returns a boolean."""
-    if len(hand) == len(hand.by_suit(hand[0].suit)):
-        return True
-    return False
+    suit = hand[0].suit
+    for card in hand:
+        if card.suit != suit:
+            return False
+    return True
+
+
+def rank_key(cards):
+    """Return an int identifying the multiset of ranks in `cards`.
+
+    Hands with the same ranks have the same key, whatever their suits
+    and order. Keys are unique for hands with fewer than eight cards of
+    any one rank.
+
+    """
+    key = 0
+    for card in cards:
+        key += RANK_WEIGHTS[card.rank.ordinal]
+    return key
+
+
+def _build_rank_table():
+    """Score every multiset of up to `TABLE_CARDS` ranks.
+
+    Returns a dict mapping `rank_key()`s to tuples of (fifteens, pairs,
+    runs) points, computed with the scoring functions above.
+
+    """
+    table = {}
+    clubs = [standard.StandardCard(r, standard.CLUB) for r in standard.RANKS]
+    for size in range(TABLE_CARDS + 1):
+        for combo in itertools.combinations_with_replacement(clubs, size):
+            hand = standard.StandardHand(combo)
+            table[rank_key(hand)] = (score_fifteens(hand), score_pairs(hand),
+                                     score_runs(hand))
+    return table
+
+
+def _load_rank_table(path=RANK_TABLE_FILE):
+    """Read a table written by `save_rank_table()`, or None if it can't."""
+    import array
+    import struct
+    import zlib
+    try:
+        with open(path, "rb") as stream:
+            data = zlib.decompress(stream.read())
+        magic, count = struct.unpack_from(_TABLE_HEADER, data)
+    except (OSError, zlib.error, struct.error):
+        return None
+    keys = array.array("Q")
+    start = struct.calcsize(_TABLE_HEADER)
+    middle = start + count * 8
+    if magic != _TABLE_MAGIC or keys.itemsize != 8 or \
+            len(data) != middle + count * 3:
+        return None
+    keys.frombytes(data[start:middle])
+    if sys.byteorder == "big":
+        keys.byteswap()
+    scores = data[middle:]
+    return dict(zip(keys, zip(scores[0::3], scores[1::3], scores[2::3])))
+
+
+def save_rank_table(path=RANK_TABLE_FILE):
+    """Compute the rank table and save it where `rank_table()` loads it.
+
+    The file is zlib-compressed: a header of b"PCRT" and the number of
+    entries, the keys as little-endian 64-bit ints in ascending order,
+    then each key's three scores as one byte each. Only needs running
+    if the scoring rules or key format change.
+
+    """
+    import array
+    import struct
+    import zlib
+    table = _build_rank_table()
+    keys = array.array("Q", sorted(table))
+    if sys.byteorder == "big":
+        keys.byteswap()
+    scores = bytes(points for key in sorted(table) for points in table[key])
+    with open(path, "wb") as stream:
+        stream.write(zlib.compress(
+            struct.pack(_TABLE_HEADER, _TABLE_MAGIC, len(table)) +
+            keys.tobytes() + scores, 9))
+
+
+def rank_table():
+    """Return the table of rank-only scores, loading it if necessary.
+
+    The table is a dict mapping the `rank_key()` of every multiset of up
+    to `TABLE_CARDS` ranks to a tuple of its (fifteens, pairs, runs)
+    points. It's read from `RANK_TABLE_FILE` the first time it's needed,
+    or computed if that can't be read.
+
+    """
+    global _rank_table
+    if _rank_table is None:
+        _rank_table = _load_rank_table() or _build_rank_table()
+    return _rank_table
+
+
+def score_ranks(cards):
+    """Calculate (fifteens, pairs, runs) points for a hand; returns a tuple.
+
+    Hands of up to `TABLE_CARDS` cards are looked up in `rank_table()`;
+    larger hands are scored with `score_fifteens()`, `score_pairs()` and
+    `score_runs()`.
+
+    """
+    if len(cards) > TABLE_CARDS:
+        return (score_fifteens(cards), score_pairs(cards), score_runs(cards))
+    return rank_table()[rank_key(cards)]
+
+
+def score_codes(codes, turned=None, crib=False, dealer=False):
+    """Calculate the total cribbage score of a hand of card codes.
+
+    Takes the same arguments as `score_hand()`, but with a sequence of
+    card codes for `hand` and a code (or None) for `turned`, and returns
+    the sum of its scores as an int. For simulations which keep cards as
+    codes.
+
+    """
+    if len(codes) + (turned is not None) > TABLE_CARDS:
+        cards = [standard.StandardCard.from_code(c) for c in codes]
+        if turned is not None:
+            turned = standard.StandardCard.from_code(turned)
+        return sum(score_hand(cards, turned, crib, dealer).values())
+    weights = RANK_WEIGHTS
+    suit = codes[0] & 3
+    flush = True
+    key = 0
+    jack_suits = 0
+    for code in codes:
+        key += weights[code >> 2]
+        if code & 3 != suit:
+            flush = False
+        if code >> 2 == _JACK:
+            jack_suits |= 1 << (code & 3)
+    if turned is None:
+        return sum(rank_table()[key]) + (len(codes) if flush else 0)
+
+    points = sum(rank_table()[key + weights[turned >> 2]])
+    if flush and turned & 3 == suit:
+        points += len(codes) + 1
+    elif flush and not crib:
+        points += len(codes)
+    if not crib and dealer and turned >> 2 == _JACK:
+        points += 2
+    elif jack_suits >> (turned & 3) & 1:
+        points += 1
+    return points
 
 
 def score_hand(hand, turned=None, crib=False, dealer=False):
@@ -97,13 +293,13 @@ def score_hand(hand, turned=None, crib=False, dealer=False):
     """
     score = {"fifteens": 0, "pairs": 0, "runs": 0, "flush": 0,
              "heels": 0, "nobs": 0}
-    test_hand = standard.StandardHand(hand)
     if turned:
+        test_hand = list(hand)
         test_hand.append(turned)
+    else:
+        test_hand = hand
 
-    score["fifteens"] = score_fifteens(test_hand)
-    score["pairs"] = score_pairs(test_hand)
-    score["runs"] = score_runs(test_hand)
+    score["fifteens"], score["pairs"], score["runs"] = score_ranks(test_hand)
 
     if check_flush(hand):
         if turned and hand[0].suit == turned.suit:
@@ -119,6 +315,258 @@ def score_hand(hand, turned=None, crib=False, dealer=False):
     return score
 
 
+def score_hand_key(hand, turned=None, crib=False, dealer=False):
+    """Return a hashable key for `score_hand()`'s arguments.
+
+    Hands with the same cards in any order get the same key, and `crib`
+    and `dealer` are dropped when there's no turned card, since they
+    don't change the score then.
+
+    """
+    if not turned:
+        return (standard.hand_key(hand), None, False, False)
+    return (standard.hand_key(hand), turned.code, bool(crib), bool(dealer))
+
+
+def cached_score_hand(score_cache=None):
+    """Return a version of `score_hand()` which memoizes its results.
+
+    `score_cache` is the `protocards.cache.Cache` to use, which may be
+    shared with other evaluators; by default, a new LRU cache of 1024
+    entries. The function returned has the same arguments as
+    `score_hand()`, returns a fresh dictionary each call, and has a
+    `.cache` attribute for checking statistics.
+
+    """
+    from . import cache
+    if score_cache is None:
+        score_cache = cache.Cache()
+    return cache.memoize(score_cache, key=score_hand_key,
+                         copy=dict)(score_hand)
+
+
+# Rank positions in `RANKS` (ace low), by card code.
+_LOW_RANKS = tuple((code >> 2) + 1 if code >> 2 < len(RANKS) - 1 else 0
+                   for code in range(len(RANKS) * len(SUITS)))
+
+PLAY_LIMIT = 31
+
+
+class Pegging(object):
+
+    """Scores the play (pegging) one card at a time.
+
+    Each card played is scored against the cards since the count was
+    last reset, for fifteen, thirty-one, pairs and runs. Work per card
+    doesn't depend on how many have been played: pairs only need the
+    trailing streak of one rank, and runs can only extend back as far as
+    the most recent repeated rank, so only that window (at most 13 cards)
+    is checked.
+
+    Attributes:
+        count       - Int; the current count.
+        pile        - List of the card codes played since the last reset.
+        streak      - Int; how many cards of the same rank end the pile.
+        last_player - Whatever was passed as `player` with the last card
+                      played, or None.
+
+    """
+
+    def __init__(self):
+        self.last_player = None
+        self.reset()
+
+    def reset(self):
+        """Start the count again from zero."""
+        self.count = 0
+        self.pile = []
+        self.streak = 0
+        self._window = 0
+        self._seen = {}
+
+    def can_play(self, card):
+        """Return whether `card` can be played without going over 31."""
+        return self.can_play_code(card.code)
+
+    def can_play_code(self, code):
+        """Like `can_play()`, but for a card code."""
+        return self.count + CARD_VALUES[code] <= PLAY_LIMIT
+
+    def peek(self, card):
+        """Return the points `card` would score, without playing it."""
+        return self._score(card.code)[0]
+
+    def peek_code(self, code):
+        """Like `peek()`, but for a card code."""
+        return self._score(code)[0]
+
+    def play(self, card, player=None):
+        """Play `card`, returning the points it scores.
+
+        Reaching 31 resets the count, after scoring. Raises ValueError if
+        the card would take the count over 31.
+
+        """
+        return self.play_code(card.code, player)
+
+    def play_code(self, code, player=None):
+        """Like `play()`, but for a card code."""
+        if not self.can_play_code(code):
+            raise ValueError("Card would take the count over 31")
+        points, self.streak, self._window = self._score(code)
+        self._seen[_LOW_RANKS[code]] = len(self.pile)
+        self.pile.append(code)
+        self.count += CARD_VALUES[code]
+        self.last_player = player
+        if self.count == PLAY_LIMIT:
+            self.reset()
+        return points
+
+    def go(self):
+        """End the current count because nobody can play.
+
+        Returns the point for the go (or last card) due to
+        `last_player`: 1, or 0 if the count was just reset by reaching
+        31 or nothing has been played. Resets the count.
+
+        """
+        points = 1 if self.pile else 0
+        self.reset()
+        return points
+
+    def _score(self, code):
+        """Return (points, new streak, new window start) for playing `code`."""
+        rank = _LOW_RANKS[code]
+        pile = self.pile
+        count = self.count + CARD_VALUES[code]
+        points = 2 if count == 15 or count == PLAY_LIMIT else 0
+
+        if pile and _LOW_RANKS[pile[-1]] == rank:
+            streak = self.streak + 1
+        else:
+            streak = 1
+        points += streak * (streak - 1)
+
+        # The window of trailing cards with distinct ranks, which is as
+        # far back as a run can go, now starts after this rank's last card.
+        window = self._window
+        previous = self._seen.get(rank)
+        if previous is not None and previous >= window:
+            window = previous + 1
+        low = high = rank
+        length = 1
+        run = 0
+        for i in range(len(pile) - 1, window - 1, -1):
+            other = _LOW_RANKS[pile[i]]
+            low = min(low, other)
+            high = max(high, other)
+            length += 1
+            if length >= 3 and high - low == length - 1:
+                run = length
+        return points + run, streak, window
+
+
+Discard = collections.namedtuple(
+    "Discard", ["keep", "discard", "expected", "distribution", "crib"])
+Discard.__doc__ = """One way to discard two cards; see `best_discard()`.
+
+keep, discard - StandardHands of the four cards kept and two thrown.
+expected      - Float; average hand score over every possible turned card.
+distribution  - Dict of {hand score: number of turned cards giving it}.
+crib          - Float; estimated crib score, or None if not estimated.
+"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _discard_values(pattern, dealer):
+    """Score every discard from the canonical hand with suit `pattern`.
+
+    Returns a list of (kept codes, discarded codes, expected score,
+    distribution) tuples. Cached, since the answer only depends on the
+    ranks in each suit and not on which suit is which.
+
+    """
+    from . import canonical
+    cards, _ = canonical.from_pattern(pattern)
+    starters = [c for c in standard.make_deck() if c not in cards]
+    values = []
+    for discard in itertools.combinations(cards, 2):
+        keep = [c for c in cards if c not in discard]
+        distribution = collections.Counter()
+        for turned in starters:
+            score = score_hand(keep, turned, dealer=dealer)
+            distribution[sum(score.values())] += 1
+        expected = (sum(k * v for k, v in distribution.items()) /
+                    float(len(starters)))
+        values.append(([c.code for c in keep], [c.code for c in discard],
+                       expected, dict(distribution)))
+    return values
+
+
+def _estimate_crib(discard, unseen, samples, rng):
+    """Average the crib score over random opponent discards and turns."""
+    total = 0
+    for _ in range(samples):
+        drawn = rng.sample(unseen, 3)
+        score = score_hand(list(discard) + drawn[:2], drawn[2], crib=True)
+        total += sum(score.values())
+    return total / float(samples)
+
+
+def best_discard(cards, dealer=False, crib_samples=0, rng=None):
+    """Evaluate every way of discarding two of six cards to the crib.
+
+    Required Argument:
+    cards        - Six distinct `protocards.standard.StandardCard`s.
+
+    Optional Arguments:
+    dealer       - Boolean; whether the hand is the dealer's, which decides
+                   whether heels count and whose crib it is.
+    crib_samples - Int; if given, estimate the crib score of each discard
+                   by averaging this many random opponent discards and
+                   turned cards. Defaults to 0, no estimate.
+    rng          - `random.Random`-like object to sample with. Defaults
+                   to the `random` module.
+
+    Returns a list of all fifteen `Discard`s, best first: by expected
+    hand score, plus the estimated crib score if it's the dealer's crib
+    or minus it if it's the opponent's. Hand scores are cached by the
+    ranks in each suit, so repeat analyses of the same (or suit-swapped)
+    cards are fast. Raises ValueError if `cards` isn't six distinct cards.
+
+    """
+    cards = list(cards)
+    if len(cards) != 6 or len(set(cards)) != 6:
+        raise ValueError("best_discard needs six distinct cards")
+    if rng is None:
+        rng = random
+    from . import canonical
+    pattern, order = canonical.suit_pattern(cards)
+    unseen = [c for c in standard.make_deck() if c not in cards]
+
+    def actual(codes):
+        return standard.StandardHand(
+            [standard.StandardCard.from_code(c & ~3 | order[c & 3])
+             for c in codes])
+
+    results = []
+    for keep, discard, expected, distribution in _discard_values(pattern,
+                                                                 dealer):
+        discard = actual(discard)
+        crib = None
+        if crib_samples:
+            crib = _estimate_crib(discard, unseen, crib_samples, rng)
+        results.append(Discard(actual(keep), discard, expected,
+                               dict(distribution), crib))
+
+    def overall(result):
+        if result.crib is None:
+            return result.expected
+        return result.expected + (result.crib if dealer else -result.crib)
+    results.sort(key=overall, reverse=True)
+    return results
+
+
 if __name__ == "__main__":
     from random import getrandbits
 
@@ -0,0 +1,72 @@
+"""Fast, reproducible dealing of standard cards.
+
+These functions deal card codes (see `protocards.standard.StandardCard`)
+rather than cards, for simulations that deal millions of hands. They all
+take an explicit random number generator, anything `base.randbelow()`
+accepts, so that runs can be repeated; `spawn_rngs()` makes independent
+generators for parallel workers. See `protocards.arrays` for dealing
+straight into NumPy arrays.
+
+"""
+
+import hashlib
+import random
+
+from . import base, standard
+
+
+DECK_SIZE = len(standard.RANKS) * len(standard.SUITS)
+
+
+def stream_rng(seed, stream):
+    """Return a `random.Random` for stream number `stream` of `seed`.
+
+    The generator's seed is a hash of both numbers, so each (seed,
+    stream) pair gives the same sequence every time, and different
+    streams are independent of each other.
+
+    """
+    digest = hashlib.sha256("{}:{}".format(seed, stream).encode()).digest()
+    return random.Random(int.from_bytes(digest, "big"))
+
+
+def spawn_rngs(seed, count):
+    """Return a list of `count` independent `random.Random`s from `seed`."""
+    return [stream_rng(seed, stream) for stream in range(count)]
+
+
+def deal_codes(count, rng=None):
+    """Return a list of `count` random card codes from a full deck.
+
+    Only draws `count` random numbers. Raises IndexError if `count` is
+    more than a deck.
+
+    """
+    if count > DECK_SIZE:
+        raise IndexError("Not enough cards in a deck")
+    return base.partial_shuffle(list(range(DECK_SIZE)), count,
+                                rng)[DECK_SIZE - count:]
+
+
+def deal_cards(count, rng=None):
+    """Return a `StandardHand` of `count` random cards from a full deck."""
+    return standard.StandardHand([standard.StandardCard.from_code(c)
+                                  for c in deal_codes(count, rng)])
+
+
+def deal_stream(deals, count, rng=None):
+    """Yield `deals` independent deals of `count` card codes each.
+
+    Each deal is a tuple of codes from a full deck. All the deals share
+    one list of codes, partially reshuffled for each, so nothing is
+    rebuilt between them. Raises IndexError if `count` is more than a
+    deck.
+
+    """
+    if count > DECK_SIZE:
+        raise IndexError("Not enough cards in a deck")
+    codes = list(range(DECK_SIZE))
+    start = DECK_SIZE - count
+    for _ in range(deals):
+        base.partial_shuffle(codes, count, rng)
+        yield tuple(codes[start:])
@@ -0,0 +1,189 @@
+"""Exhaustive cribbage score distributions, computed in parallel.
+
+Scores every four-card hand against every possible turned card (about
+13 million combinations) three ways: as the non-dealer's hand, as the
+dealer's hand, and as a crib. The combinations are split into chunks by
+their two lowest cards and scored in a process pool; finished chunks
+can be checkpointed to disk so an interrupted run can pick up where it
+left off.
+
+Run from the command line with `python -m protocards.distribution`, or
+the `protocards-distribution` script; pass `--help` for options.
+
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from . import cribbage, standard
+
+
+VARIANTS = ("hand", "dealer", "crib")
+# 29 is the best hand; heels can take a dealer's total to 30.
+MAX_SCORE = 30
+DECK_SIZE = 52
+
+_JACK = standard.JACK.ordinal
+
+
+def chunks():
+    """Return the list of chunks: every pair of card codes (i, j), i < j."""
+    return list(itertools.combinations(range(DECK_SIZE), 2))
+
+
+def empty_histograms():
+    """Return a dict of zeroed score histograms, one per variant."""
+    return {variant: [0] * (MAX_SCORE + 1) for variant in VARIANTS}
+
+
+def merge(total, histograms):
+    """Add `histograms` into `total` in place, and return `total`."""
+    for variant in VARIANTS:
+        counts = total[variant]
+        for score, count in enumerate(histograms[variant]):
+            counts[score] += count
+    return total
+
+
+def score_chunk(chunk):
+    """Score every hand whose two lowest card codes are `chunk`.
+
+    Returns a tuple of `chunk` and a dict of histograms by variant.
+
+    """
+    table = cribbage.rank_table()
+    weights = cribbage.RANK_WEIGHTS
+    histograms = empty_histograms()
+    hand, dealer, crib = (histograms[v] for v in VARIANTS)
+    first, second = chunk
+    for third, fourth in itertools.combinations(range(second + 1,
+                                                      DECK_SIZE), 2):
+        codes = (first, second, third, fourth)
+        key = 0
+        jack_suits = 0
+        for code in codes:
+            key += weights[code >> 2]
+            if code >> 2 == _JACK:
+                jack_suits |= 1 << (code & 3)
+        suit = first & 3
+        flush = all(code & 3 == suit for code in codes)
+        for turned in range(DECK_SIZE):
+            if turned in codes:
+                continue
+            fifteens, pairs, runs = table[key + weights[turned >> 2]]
+            base = fifteens + pairs + runs + (jack_suits >> (turned & 3) & 1)
+            if flush and turned & 3 == suit:
+                crib[base + 5] += 1
+                base += 5
+            else:
+                crib[base] += 1
+                if flush:
+                    base += 4
+            hand[base] += 1
+            dealer[base + 2 if turned >> 2 == _JACK else base] += 1
+    return chunk, histograms
+
+
+def _load_checkpoint(path):
+    """Return (set of finished chunks, histograms) saved at `path`."""
+    if not path or not os.path.exists(path):
+        return set(), empty_histograms()
+    with open(path) as f:
+        saved = json.load(f)
+    return set(tuple(c) for c in saved["done"]), saved["histograms"]
+
+
+def _save_checkpoint(path, done, histograms):
+    """Atomically write the finished chunks and histograms to `path`."""
+    temp = path + ".tmp"
+    with open(temp, "w") as f:
+        json.dump({"done": sorted(done), "histograms": histograms}, f)
+    os.replace(temp, path)
+
+
+def compute(workers=None, checkpoint=None, checkpoint_every=50,
+            progress=None):
+    """Compute the full score distributions.
+
+    Optional Arguments:
+    workers          - Int; number of worker processes. Defaults to the
+                       number of CPUs; 1 scores in this process.
+    checkpoint       - Path of a JSON checkpoint file. If it exists, the
+                       chunks it records are skipped; it's updated as
+                       chunks finish.
+    checkpoint_every - Int; how many chunks to finish between saves.
+    progress         - Callable taking (finished chunks, total chunks),
+                       called as chunks finish.
+
+    Returns a dict of {variant: list of counts by score}. The result
+    doesn't depend on the number of workers or on checkpointing.
+
+    """
+    all_chunks = chunks()
+    done, histograms = _load_checkpoint(checkpoint)
+    todo = [c for c in all_chunks if c not in done]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    pool = None
+    if workers > 1 and todo:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(score_chunk, todo, chunksize=4)
+    else:
+        results = map(score_chunk, todo)
+    try:
+        for chunk, chunk_histograms in results:
+            merge(histograms, chunk_histograms)
+            done.add(chunk)
+            if checkpoint and len(done) % checkpoint_every == 0:
+                _save_checkpoint(checkpoint, done, histograms)
+            if progress:
+                progress(len(done), len(all_chunks))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    if checkpoint:
+        _save_checkpoint(checkpoint, done, histograms)
+    return histograms
+
+
+def main(argv=None):
+    """Command-line entry point; see `--help`."""
+    parser = argparse.ArgumentParser(
+        description="Compute exhaustive cribbage score distributions.")
+    parser.add_argument("-o", "--output",
+                        help="write JSON results here instead of stdout")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("-c", "--checkpoint",
+                        help="checkpoint file to resume from and update")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="don't report progress on stderr")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+
+    def progress(finished, total):
+        sys.stderr.write("\r{}/{} chunks, {:.0f}s".format(
+            finished, total, time.time() - start))
+        sys.stderr.flush()
+
+    histograms = compute(args.workers, args.checkpoint,
+                         progress=None if args.quiet else progress)
+    if not args.quiet:
+        sys.stderr.write("\n")
+    output = json.dumps(histograms, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == "__main__":
+    main()
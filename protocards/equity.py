@@ -0,0 +1,203 @@
+"""Hold'em equity: each player's chance of winning the showdown.
+
+`equity()` takes each player's hole cards, the board so far and any dead
+cards, and deals out the rest of the board. When the number of possible
+boards is small enough it tries every one; otherwise it samples boards
+at random until every player's equity is known to within a tolerance.
+Hands are ranked with `protocards.poker`, and the work can be spread
+over a process pool.
+
+Cards can be StandardCards or card codes, including NumPy integers.
+Dealt and dead cards are tracked as a bitmask with bit `code` set for
+each card, so the deck that remains is found with mask arithmetic
+rather than by building hands.
+
+"""
+
+import collections
+import itertools
+import math
+
+from . import base, combos, dealing, poker, standard
+
+
+BOARD_SIZE = 5
+DECK_SIZE = dealing.DECK_SIZE
+EXHAUSTIVE_LIMIT = 100000
+EXHAUSTIVE_CHUNKS = 64
+BATCH_TRIALS = 2000
+# Two-sided 95% normal quantile, for the Monte Carlo stopping rule.
+_Z = 1.96
+
+Equity = collections.namedtuple(
+    "Equity", ["win", "tie", "equity", "margin", "trials", "exhaustive"])
+Equity.__doc__ = """The result of `equity()`; lists have one entry per player.
+
+win        - Probability of winning outright.
+tie        - Probability of tying for the best hand.
+equity     - Expected share of the pot: win, plus ties split evenly.
+margin     - Half-width of the 95% confidence interval of each equity;
+             zeros if exhaustive.
+trials     - Int; the number of boards evaluated.
+exhaustive - Boolean; whether every possible board was evaluated.
+"""
+
+
+class _Tally(object):
+
+    """Counts of showdown outcomes, mergeable across workers."""
+
+    def __init__(self, players):
+        self.trials = 0
+        self.wins = [0] * players
+        self.ties = [0] * players
+        self.shares = [0.0] * players
+        self.squares = [0.0] * players
+
+    def showdown(self, holes, board):
+        strengths = [poker.evaluate_codes(hole + board) for hole in holes]
+        best = max(strengths)
+        winners = [i for i, s in enumerate(strengths) if s == best]
+        share = 1.0 / len(winners)
+        self.trials += 1
+        for i in winners:
+            if len(winners) == 1:
+                self.wins[i] += 1
+            else:
+                self.ties[i] += 1
+            self.shares[i] += share
+            self.squares[i] += share * share
+
+    def merge(self, other):
+        self.trials += other.trials
+        for i in range(len(self.wins)):
+            self.wins[i] += other.wins[i]
+            self.ties[i] += other.ties[i]
+            self.shares[i] += other.shares[i]
+            self.squares[i] += other.squares[i]
+
+    def margins(self):
+        """Return the 95% confidence half-width of each player's equity."""
+        margins = []
+        for share, square in zip(self.shares, self.squares):
+            mean = share / self.trials
+            variance = max(square / self.trials - mean * mean, 0.0)
+            margins.append(_Z * math.sqrt(variance / self.trials))
+        return margins
+
+
+def _as_codes(cards):
+    return [standard.card_code(card) for card in cards]
+
+
+def _exhaustive_chunk(args):
+    """Tally the boards completed by combinations `start` to `stop`."""
+    holes, board, remaining, needed, start, stop = args
+    tally = _Tally(len(holes))
+    for more in combos.combinations(remaining, needed, start, stop):
+        tally.showdown(holes, board + list(more))
+    return tally
+
+
+def _sample_batch(args):
+    """Tally `trials` random boards from random stream `batch` of `seed`."""
+    holes, board, remaining, needed, trials, seed, batch = args
+    rng = dealing.stream_rng(seed, batch)
+    deck = list(remaining)
+    tally = _Tally(len(holes))
+    start = len(deck) - needed
+    for _ in range(trials):
+        base.partial_shuffle(deck, needed, rng)
+        tally.showdown(holes, board + deck[start:])
+    return tally
+
+
+def equity(holes, board=(), dead=(), exhaustive_limit=EXHAUSTIVE_LIMIT,
+           tolerance=0.005, max_trials=1000000, workers=1, seed=0,
+           batch=BATCH_TRIALS):
+    """Calculate each player's showdown equity.
+
+    Required Argument:
+    holes            - Sequence of each player's hole cards (at most two
+                       each), at least two players.
+
+    Optional Arguments:
+    board            - Community cards already dealt, up to five.
+    dead             - Cards known to be out of play.
+    exhaustive_limit - Int; evaluate every board if there are at most
+                       this many, otherwise sample.
+    tolerance        - Float; when sampling, stop once every player's 95%
+                       confidence interval is within +/- this much.
+    max_trials       - Int; when sampling, stop after this many boards
+                       regardless.
+    workers          - Int; number of worker processes. 1 evaluates in
+                       this process.
+    seed             - Int; seed for the sampling's random streams. The
+                       result for a seed doesn't depend on `workers`.
+    batch            - Int; boards per sampling batch; the stopping rule
+                       is checked between batches.
+
+    Returns an `Equity`. Raises ValueError if a card is used twice, a
+    code isn't a card, or there are too few players or too many cards.
+
+    """
+    holes = [_as_codes(hole) for hole in holes]
+    board = _as_codes(board)
+    dead = _as_codes(dead)
+    if len(holes) < 2:
+        raise ValueError("Equity needs at least two players")
+    if len(board) > BOARD_SIZE or \
+            any(len(hole) + BOARD_SIZE > poker.MAX_CARDS for hole in holes):
+        raise ValueError("Too many cards for a Hold'em showdown")
+    used = 0
+    for code in itertools.chain(board, dead, *holes):
+        if used >> code & 1:
+            raise ValueError("Card {} is used twice".format(code))
+        used |= 1 << code
+    remaining = [c for c in range(DECK_SIZE) if not used >> c & 1]
+    needed = BOARD_SIZE - len(board)
+    if needed > len(remaining):
+        raise ValueError("Not enough cards left to finish the board")
+
+    pool = None
+    if workers > 1:
+        # About 17 ms to import, which single-process runs don't need.
+        import multiprocessing
+        pool = multiprocessing.Pool(workers)
+    imap = pool.imap if pool is not None else map
+    tally = _Tally(len(holes))
+    try:
+        exhaustive = math.comb(len(remaining), needed) <= exhaustive_limit
+        if exhaustive and needed == 0:
+            tally.showdown(holes, board)
+        elif exhaustive:
+            chunks = [(holes, board, remaining, needed, start, stop)
+                      for start, stop in combos.split(
+                          len(remaining), needed, EXHAUSTIVE_CHUNKS)]
+            for chunk in imap(_exhaustive_chunk, chunks):
+                tally.merge(chunk)
+        else:
+            # Batches go out a wave at a time, but are merged and checked
+            # in order, so the stopping point doesn't depend on `workers`.
+            done = False
+            for wave in itertools.count(0, workers):
+                batches = [(holes, board, remaining, needed, batch, seed, i)
+                           for i in range(wave, wave + workers)]
+                for chunk in imap(_sample_batch, batches):
+                    tally.merge(chunk)
+                    if tally.trials >= max_trials or \
+                            max(tally.margins()) <= tolerance:
+                        done = True
+                        break
+                if done:
+                    break
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    trials = float(tally.trials)
+    return Equity([w / trials for w in tally.wins],
+                  [t / trials for t in tally.ties],
+                  [s / trials for s in tally.shares],
+                  [0.0] * len(holes) if exhaustive else tally.margins(),
+                  tally.trials, exhaustive)
@@ -0,0 +1,161 @@
+"""Optional call counters and timers for the package's hot functions.
+
+Instrumentation works by replacing functions with timing wrappers:
+`enable()` swaps them in and `disable()` puts the originals back, so
+while it's off nothing is different and nothing is slower. Use the
+`instrumented()` context manager to turn it on for a block, or set the
+PROTOCARDS_INSTRUMENT environment variable to turn it on at import.
+
+Covered by default are `Hand.deal()`, `make_deck()`, and cribbage's
+`score_hand()`, `score_codes()`, `score_ranks()`, the `score_*()` and
+`check_flush()` helpers, and `rank_table()`; `register()` adds more.
+Times are cumulative, so a function's time includes the instrumented
+functions it calls. Only calls made through the module or class
+attribute are seen, not ones through references taken beforehand.
+
+`stats()` returns what's been recorded as a dictionary, and
+`prometheus()` as Prometheus text exposition format.
+
+"""
+
+import contextlib
+import functools
+import threading
+import time
+
+from . import base, cribbage, standard
+
+
+# Checked by `protocards/__init__.py`, which has its own copy of the name.
+ENV_VAR = "PROTOCARDS_INSTRUMENT"
+
+# (owner, attribute name, label) for everything instrumented.
+_targets = [(base.Hand, "deal", "base.Hand.deal"),
+            (standard, "make_deck", "standard.make_deck")] + [
+    (cribbage, name, "cribbage." + name)
+    for name in ("score_hand", "score_codes", "score_ranks",
+                 "score_fifteens", "score_pairs", "score_runs",
+                 "check_flush", "rank_table")]
+# Label: [calls, seconds].
+_records = {}
+# Label: (owner, attribute name, original function), while enabled.
+_originals = {}
+_lock = threading.Lock()
+
+
+def _wrap(function, record):
+    clock = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            with _lock:
+                record[0] += 1
+                record[1] += elapsed
+    return wrapper
+
+
+def _patch(owner, name, label):
+    original = vars(owner)[name]
+    record = _records.setdefault(label, [0, 0.0])
+    _originals[label] = (owner, name, original)
+    setattr(owner, name, _wrap(original, record))
+
+
+def register(owner, name, label=None):
+    """Add a function to instrument: attribute `name` of `owner`.
+
+    `owner` is a module or class, and `label` the name to report it by,
+    by default "module.name" or "module.Class.name". If instrumentation
+    is on, the function is wrapped straight away.
+
+    """
+    if label is None:
+        if isinstance(owner, type):
+            where = "{}.{}".format(owner.__module__, owner.__qualname__)
+        else:
+            where = owner.__name__
+        label = "{}.{}".format(where.rpartition("protocards.")[2], name)
+    _targets.append((owner, name, label))
+    if _originals:
+        _patch(owner, name, label)
+
+
+def is_enabled():
+    """Return whether instrumentation is on."""
+    return bool(_originals)
+
+
+def enable():
+    """Turn instrumentation on. Does nothing if it's already on."""
+    if _originals:
+        return
+    for owner, name, label in _targets:
+        _patch(owner, name, label)
+
+
+def disable():
+    """Turn instrumentation off, restoring the original functions.
+
+    What's been recorded is kept until `reset()`.
+
+    """
+    for owner, name, original in _originals.values():
+        setattr(owner, name, original)
+    _originals.clear()
+
+
+def reset():
+    """Clear every counter and timer."""
+    with _lock:
+        for record in _records.values():
+            record[0] = 0
+            record[1] = 0.0
+
+
+@contextlib.contextmanager
+def instrumented(clear=False):
+    """Context manager which turns instrumentation on for its block.
+
+    If it was already on it's left on afterwards. With `clear=True`,
+    counters are reset first.
+
+    """
+    was_enabled = is_enabled()
+    if clear:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+def stats():
+    """Return {label: {"calls": int, "seconds": float}} for every function
+    called since the last reset."""
+    with _lock:
+        return {label: {"calls": calls, "seconds": seconds}
+                for label, (calls, seconds) in _records.items() if calls}
+
+
+def prometheus(prefix="protocards"):
+    """Return the counters and timers in Prometheus text format."""
+    lines = []
+    current = sorted(stats().items())
+    for metric, key, help_text in (
+            ("calls_total", "calls", "Calls to instrumented functions."),
+            ("seconds_total", "seconds",
+             "Cumulative seconds spent in instrumented functions.")):
+        name = "{}_{}".format(prefix, metric)
+        lines.append("# HELP {} {}".format(name, help_text))
+        lines.append("# TYPE {} counter".format(name))
+        for label, record in current:
+            lines.append('{}{{function="{}"}} {}'.format(
+                name, label, record[key]))
+    return "\n".join(lines) + "\n"
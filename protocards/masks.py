@@ -0,0 +1,181 @@
+"""A compact, bitmask-backed hand of standard playing cards.
+
+A `MaskHand` stores a set of `protocards.standard.StandardCard`s as a
+single 52-bit integer. Each suit has a 13-bit lane, lowest suit first,
+and within a lane each rank has one bit, lowest rank first. So the bit
+for a card is at `suit.ordinal * 13 + rank.ordinal`, and iterating over
+a full mask yields cards in `make_deck()` order.
+
+Also provides the tables used to build masks: BITS (indexed by card
+code), SUIT_MASKS and RANK_MASKS (indexed by ordinal), and FULL_MASK.
+
+"""
+
+from . import base, standard
+
+
+LANE = 13
+LANE_MASK = (1 << LANE) - 1
+
+BITS = tuple(1 << (card.suit.ordinal * LANE + card.rank.ordinal)
+             for card in standard._CARDS)
+SUIT_MASKS = tuple(LANE_MASK << (s * LANE)
+                   for s in range(len(standard.SUITS)))
+RANK_MASKS = tuple(sum(1 << (s * LANE + r)
+                       for s in range(len(standard.SUITS)))
+                   for r in range(len(standard.RANKS)))
+FULL_MASK = (1 << len(BITS)) - 1
+
+# Cards by bit index, the reverse of BITS.
+_BIT_CARDS = tuple(sorted(standard._CARDS,
+                          key=lambda c: BITS[c.code].bit_length()))
+
+# Defined in base, which can't import this module, and kept here too.
+popcount = base.popcount
+
+
+def mask_of(cards):
+    """Return the mask of an iterable of StandardCards."""
+    mask = 0
+    for card in cards:
+        mask |= BITS[card.code]
+    return mask
+
+
+def iter_bits(mask):
+    """Yield the index of each set bit in `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class MaskHand(object):
+
+    """An immutable set of StandardCards backed by a 52-bit integer.
+
+    Initialize optionally with an iterable of StandardCards, such as a
+    `StandardHand`; duplicate cards are only counted once. Use
+    `MaskHand.from_mask()` to wrap an existing integer.
+
+    MaskHands support `len()`, `in`, iteration (in `make_deck()` order),
+    equality and hashing, and the set operators `|`, `&`, `-` and `^`.
+
+    Attributes:
+        mask - The integer backing the hand. Read-only.
+
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, cards=()):
+        object.__setattr__(self, "mask", mask_of(cards))
+
+    @classmethod
+    def from_mask(cls, mask):
+        """Return a MaskHand of the cards set in the integer `mask`.
+
+        Raises ValueError if `mask` has bits above the 52 cards.
+
+        """
+        if mask & ~FULL_MASK:
+            raise ValueError("Not a standard card mask: {!r}".format(mask))
+        hand = cls.__new__(cls)
+        object.__setattr__(hand, "mask", mask)
+        return hand
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MaskHands are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("MaskHands are immutable")
+
+    def to_hand(self):
+        """Return a `StandardHand` of the same cards."""
+        return standard.StandardHand(iter(self))
+
+    def __str__(self):
+        return str(self.to_hand())
+
+    def __repr__(self):
+        return "<{}:{}>".format(self.__class__.__name__,
+                                ",".join([c.short for c in self]))
+
+    def __len__(self):
+        return popcount(self.mask)
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __iter__(self):
+        for i in iter_bits(self.mask):
+            yield _BIT_CARDS[i]
+
+    def __contains__(self, card):
+        if not isinstance(card, standard.StandardCard):
+            return False
+        return bool(self.mask & BITS[card.code])
+
+    def __eq__(self, other):
+        if isinstance(other, MaskHand):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, MaskHand):
+            return self.mask != other.mask
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __or__(self, other):
+        if isinstance(other, MaskHand):
+            return self.from_mask(self.mask | other.mask)
+        return NotImplemented
+
+    def __and__(self, other):
+        if isinstance(other, MaskHand):
+            return self.from_mask(self.mask & other.mask)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, MaskHand):
+            return self.from_mask(self.mask & ~other.mask)
+        return NotImplemented
+
+    def __xor__(self, other):
+        if isinstance(other, MaskHand):
+            return self.from_mask(self.mask ^ other.mask)
+        return NotImplemented
+
+    def suit_lane(self, suit):
+        """Return the 13-bit integer of ranks held in `suit`."""
+        return (self.mask >> (suit.ordinal * LANE)) & LANE_MASK
+
+    def by_suit(self, suit):
+        """Return all cards of `suit` as a new MaskHand."""
+        return self.from_mask(self.mask & SUIT_MASKS[suit.ordinal])
+
+    def by_rank(self, rank):
+        """Return all cards of `rank` as a new MaskHand."""
+        return self.from_mask(self.mask & RANK_MASKS[rank.ordinal])
+
+    def count_suit(self, suit):
+        """Return the number of cards of `suit`."""
+        return popcount(self.mask & SUIT_MASKS[suit.ordinal])
+
+    def count_rank(self, rank):
+        """Return the number of cards of `rank`."""
+        return popcount(self.mask & RANK_MASKS[rank.ordinal])
+
+    def suit_counts(self):
+        """Return a list of the number of cards of each suit, by ordinal."""
+        return [popcount(self.mask & m) for m in SUIT_MASKS]
+
+    def rank_counts(self):
+        """Return a list of the number of cards of each rank, by ordinal."""
+        counts = [0] * LANE
+        for i in iter_bits(self.mask):
+            counts[i % LANE] += 1
+        return counts
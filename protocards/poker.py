@@ -0,0 +1,183 @@
+"""Poker hand evaluation for standard cards.
+
+`evaluate()` takes five, six or seven cards, as StandardCards or card
+codes, and returns a strength: an int which is higher for better hands
+and equal for hands that tie. For six or seven cards it's the strength
+of the best five. `category()` names a strength's category, like
+"full house".
+
+Evaluation is two table lookups. Hands without a flush only depend on
+their ranks, which are identified by the product of a prime for each
+rank, so `rank_table()` maps every such product to its strength. Hands
+with five or more cards in one suit (which, with seven cards or fewer,
+can't make anything better than a flush) are looked up in
+`flush_table()` by the bitmask of ranks in that suit. Both tables are
+built the first time they're needed. See `protocards.arrays` for
+evaluating arrays of hands at once.
+
+"""
+
+import itertools
+
+from . import standard
+
+
+CATEGORIES = ("high card", "pair", "two pair", "three of a kind",
+              "straight", "flush", "full house", "four of a kind",
+              "straight flush")
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, \
+    STRAIGHT_FLUSH = range(len(CATEGORIES))
+
+MIN_CARDS = 5
+MAX_CARDS = 7
+
+# One prime per rank, by standard ordinal.
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+_LANE = len(standard.RANKS)
+_ACE = standard.ACE.ordinal
+# Strengths are the category above five 4-bit ranks, most important first.
+_CATEGORY_SHIFT = 20
+
+_rank_table = None
+_flush_table = None
+
+
+def _strength(category, ranks):
+    """Pack a category and up to five deciding ranks into a strength."""
+    strength = category
+    for i in range(5):
+        strength = (strength << 4) | (ranks[i] if i < len(ranks) else 0)
+    return strength
+
+
+def category(strength):
+    """Return the name of the category of `strength`, e.g. "flush"."""
+    return CATEGORIES[strength >> _CATEGORY_SHIFT]
+
+
+def _straight_high(bits):
+    """Return the top rank of the best straight in a rank bitmask, or None."""
+    for high in range(_ACE, 3, -1):
+        run = 0b11111 << (high - 4)
+        if bits & run == run:
+            return high
+    wheel = (1 << _ACE) | 0b1111
+    if bits & wheel == wheel:
+        return 3
+    return None
+
+
+def _top(bits, count):
+    """Return the highest `count` ranks set in a bitmask, highest first."""
+    ranks = [r for r in range(_ACE, -1, -1) if bits >> r & 1]
+    return ranks[:count]
+
+
+def _rank_strength(counts):
+    """Return the strength of the best five cards with rank `counts`."""
+    by_count = sorted(((n, r) for r, n in enumerate(counts) if n),
+                      reverse=True)
+    present = 0
+    for rank, n in enumerate(counts):
+        if n:
+            present |= 1 << rank
+
+    def kickers(exclude, count):
+        return _top(present & ~sum(1 << r for r in exclude), count)
+
+    most, top = by_count[0]
+    if most == 4:
+        return _strength(QUADS, [top] + kickers([top], 1))
+    if most == 3 and by_count[1][0] >= 2:
+        return _strength(FULL_HOUSE, [top, by_count[1][1]])
+    high = _straight_high(present)
+    if high is not None:
+        return _strength(STRAIGHT, [high])
+    if most == 3:
+        return _strength(TRIPS, [top] + kickers([top], 2))
+    if most == 2 and by_count[1][0] == 2:
+        second = by_count[1][1]
+        return _strength(TWO_PAIR, [top, second] + kickers([top, second], 1))
+    if most == 2:
+        return _strength(PAIR, [top] + kickers([top], 3))
+    return _strength(HIGH_CARD, _top(present, 5))
+
+
+def _flush_strength(bits):
+    """Return the strength of the best flush in a suit's rank bitmask."""
+    high = _straight_high(bits)
+    if high is not None:
+        return _strength(STRAIGHT_FLUSH, [high])
+    return _strength(FLUSH, _top(bits, 5))
+
+
+def rank_table():
+    """Return the table for hands without a flush, building it if needed.
+
+    It's a dict mapping the product of `PRIMES` for every multiset of
+    five to seven ranks (at most four of each) to its strength.
+
+    """
+    global _rank_table
+    if _rank_table is None:
+        table = {}
+        for size in range(MIN_CARDS, MAX_CARDS + 1):
+            for ranks in itertools.combinations_with_replacement(
+                    range(_LANE), size):
+                counts = [0] * _LANE
+                product = 1
+                for rank in ranks:
+                    counts[rank] += 1
+                    product *= PRIMES[rank]
+                if max(counts) <= 4:
+                    table[product] = _rank_strength(counts)
+        _rank_table = table
+    return _rank_table
+
+
+def flush_table():
+    """Return the table for flushes, building it if needed.
+
+    It's a list indexed by the bitmask of ranks held in one suit, giving
+    the strength of the best flush for masks with at least five ranks
+    and 0 for the rest.
+
+    """
+    global _flush_table
+    if _flush_table is None:
+        _flush_table = [_flush_strength(bits) if bin(bits).count("1") >= 5
+                        else 0 for bits in range(1 << _LANE)]
+    return _flush_table
+
+
+def evaluate_codes(codes):
+    """Like `evaluate()`, but for a sequence of card codes."""
+    if not MIN_CARDS <= len(codes) <= MAX_CARDS:
+        raise ValueError("Can only evaluate 5 to 7 cards")
+    lanes = [0, 0, 0, 0]
+    product = 1
+    for code in codes:
+        product *= PRIMES[code >> 2]
+        lanes[code & 3] |= 1 << (code >> 2)
+    flushes = flush_table()
+    for lane in lanes:
+        if flushes[lane]:
+            return flushes[lane]
+    return rank_table()[product]
+
+
+def evaluate(cards):
+    """Return the strength of the best poker hand in `cards`.
+
+    `cards` is five to seven distinct StandardCards, like a StandardHand,
+    or card codes, which can be NumPy integers. Raises ValueError for any
+    other number of cards, or for a code which isn't a card.
+
+    """
+    return evaluate_codes([standard.card_code(card) for card in cards])
+
+
+def evaluate_many(hands):
+    """Return a list of the strengths of a sequence of hands."""
+    return [evaluate(hand) for hand in hands]
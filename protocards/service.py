@@ -0,0 +1,293 @@
+"""Score cribbage hands from asyncio code without blocking the event loop.
+
+A `BatchScorer` collects scoring requests from any number of coroutines,
+waits a few milliseconds for more to arrive, and scores them together in
+an executor: by default the event loop's thread pool, or a process pool,
+or an `InlineExecutor` which scores in the calling thread for tests. A
+bounded queue applies backpressure when requests arrive faster than they
+can be scored, and `metrics()` reports how it's going.
+
+    async with BatchScorer(max_batch=512, max_delay=0.005) as scorer:
+        score = await scorer.score_hand(hand, turned, dealer=True)
+
+Make one scorer for the life of the application, or of a batch of work,
+and share it between the coroutines which need it. `score_hand_async()`
+takes a scorer too, or scores a single hand in a worker thread without
+one.
+
+"""
+
+import asyncio
+import concurrent.futures
+import time
+
+from . import cribbage
+
+
+MAX_BATCH = 256
+MAX_DELAY = 0.002
+MAX_PENDING = 10000
+
+_CLOSE = object()
+
+
+def score_batch(requests):
+    """Score a list of (hand, turned, crib, dealer) tuples.
+
+    Returns a list of `cribbage.score_hand()` dictionaries. This is the
+    default work function for `BatchScorer`, and is picklable, so it can
+    run in a process pool.
+
+    """
+    score = cribbage.score_hand
+    return [score(*request) for request in requests]
+
+
+class InlineExecutor(concurrent.futures.Executor):
+
+    """An executor which runs each call immediately in the caller's thread.
+
+    A stand-in for a thread or process pool in tests, and for batches
+    so cheap that handing them off costs more than running them.
+
+    """
+
+    def submit(self, function, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as error:
+            future.set_exception(error)
+        return future
+
+
+def _cancel_batch(batch):
+    """Cancel the futures of a batch of queued items which won't be run."""
+    for _, future, _ in batch:
+        future.cancel()
+
+
+class BatchScorer(object):
+
+    """Scores requests from many coroutines in batches.
+
+    Optional Arguments:
+    max_batch   - Int; the most requests to score at once.
+    max_delay   - Float; the longest, in seconds, to wait for a batch to
+                  fill after its first request arrives.
+    max_pending - Int; the most requests waiting to be batched. Beyond
+                  this, callers wait for room, which slows producers down
+                  to the rate requests can be scored.
+    executor    - `concurrent.futures.Executor` to score batches in.
+                  Defaults to the event loop's default executor, a thread
+                  pool.
+    work        - Function taking a list of request tuples and returning
+                  a list of results in the same order. Defaults to
+                  `score_batch()`.
+
+    The scorer starts with its first request, and belongs to the event
+    loop that was running then. Use it as an async context manager, or
+    call `close()` when done, to finish outstanding work and stop its
+    collecting task.
+
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_delay=MAX_DELAY,
+                 max_pending=MAX_PENDING, executor=None, work=score_batch):
+        if max_batch < 1 or max_pending < 1:
+            raise ValueError("max_batch and max_pending must be positive")
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.executor = executor
+        self.work = work
+        self._queue = None
+        self._task = None
+        self._closed = False
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._largest_batch = 0
+        self._deepest_queue = 0
+        self._latency = 0.0
+        self._busy = 0.0
+
+    async def __aenter__(self):
+        self._start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _start(self):
+        if self._closed:
+            raise RuntimeError("This BatchScorer has been closed")
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._task = asyncio.get_running_loop().create_task(
+                self._collect())
+
+    async def submit(self, request):
+        """Queue one request tuple for `work`; returns its result.
+
+        Waits for room if `max_pending` requests are already queued.
+        Raises whatever `work` raised for the request's batch, or
+        RuntimeError if the scorer is closed, including while waiting for
+        room.
+
+        """
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future, time.perf_counter()))
+        self._deepest_queue = max(self._deepest_queue, self._queue.qsize())
+        if self._closed:
+            # Closed while this was waiting for room: it wasn't queued in
+            # time to be scored, and the collector may have stopped.
+            if not future.done():
+                future.set_exception(RuntimeError(
+                    "This BatchScorer was closed before the request was "
+                    "queued"))
+            if self._task.done():
+                self._fail_queued()
+        return await future
+
+    async def score_hand(self, hand, turned=None, crib=False, dealer=False):
+        """Like `cribbage.score_hand()`, but scored in the next batch."""
+        return await self.submit((hand, turned, crib, dealer))
+
+    async def _next_batch(self):
+        """Wait for a batch of queued items; returns (batch, closing)."""
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is _CLOSE:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(),
+                                                  remaining)
+                except asyncio.TimeoutError:
+                    break
+                except asyncio.CancelledError:
+                    _cancel_batch(batch)
+                    raise
+            else:
+                item = self._queue.get_nowait()
+            if item is _CLOSE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _fail_queued(self):
+        """Fail every request left in the queue once collecting stops."""
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _CLOSE and not item[1].done():
+                item[1].set_exception(
+                    RuntimeError("This BatchScorer has been closed"))
+
+    async def _collect(self):
+        try:
+            await self._collect_batches()
+        finally:
+            self._fail_queued()
+
+    async def _collect_batches(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            batch, closing = await self._next_batch()
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.work, [item[0] for item in batch])
+                if len(results) != len(batch):
+                    raise ValueError("work returned {} results for {} "
+                                     "requests".format(len(results),
+                                                       len(batch)))
+            except asyncio.CancelledError:
+                # The collector is being cancelled; nothing else will
+                # resolve this batch's futures.
+                _cancel_batch(batch)
+                raise
+            except Exception as error:
+                self._errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            finished = time.perf_counter()
+            self._busy += finished - started
+            self._batches += 1
+            self._requests += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._latency += sum(finished - item[2] for item in batch)
+
+    async def close(self):
+        """Score everything already queued, then stop.
+
+        Requests made after closing, or still waiting for room in the
+        queue, raise RuntimeError. Closing again waits for the first
+        close to finish.
+
+        """
+        if not self._closed:
+            self._closed = True
+            if self._task is not None:
+                await self._queue.put(_CLOSE)
+        if self._task is not None:
+            await self._task
+
+    def metrics(self):
+        """Return a dictionary of statistics about the scorer so far.
+
+        requests      - Requests scored (or failed).
+        batches       - Batches run.
+        errors        - Batches whose `work` raised an exception.
+        mean_batch    - Average requests per batch.
+        largest_batch - Most requests in one batch.
+        pending       - Requests waiting to be batched now.
+        deepest_queue - Most requests ever waiting at once.
+        mean_latency  - Average seconds from request to result.
+        busy_seconds  - Total seconds spent scoring batches.
+
+        """
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "errors": self._errors,
+            "mean_batch": (self._requests / float(self._batches)
+                           if self._batches else 0.0),
+            "largest_batch": self._largest_batch,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "deepest_queue": self._deepest_queue,
+            "mean_latency": (self._latency / self._requests
+                             if self._requests else 0.0),
+            "busy_seconds": self._busy,
+        }
+
+
+async def score_hand_async(hand, turned=None, crib=False, dealer=False,
+                           scorer=None):
+    """Like `cribbage.score_hand()`, but without blocking the event loop.
+
+    With a `BatchScorer` as `scorer`, the hand is scored in its next
+    batch. Without one, it's scored on its own in the event loop's
+    default executor; there's no hidden shared scorer, since one would
+    outlive whoever started it.
+
+    """
+    if scorer is not None:
+        return await scorer.score_hand(hand, turned, crib, dealer)
+    return await asyncio.get_running_loop().run_in_executor(
+        None, cribbage.score_hand, hand, turned, crib, dealer)
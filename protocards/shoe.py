@@ -0,0 +1,168 @@
+"""A dealing shoe of several standard decks shuffled together.
+
+A `Shoe` doesn't hold card objects: it keeps a flat list of card codes
+(see `protocards.standard.StandardCard.code`), one per physical card,
+and counts of what's left by card, rank and suit. Drawing picks a random
+position among the cards not yet drawn and swaps it to the end, so each
+draw takes constant time and every remaining card, counting duplicates,
+is equally likely. Resetting just moves the boundary back.
+
+"""
+
+import random
+
+from . import base, standard
+
+
+DECK_SIZE = len(standard._CARDS)
+_RANKS = len(standard.RANKS)
+_SUITS = len(standard.SUITS)
+
+
+class Shoe(object):
+
+    """A shoe of `decks` standard decks with a cut card.
+
+    Optional Arguments:
+    decks       - Int; the number of 52-card decks. Defaults to 6.
+    penetration - Float; the fraction of the shoe dealt before the cut
+                  card comes out. Defaults to 0.75.
+    rng         - Random number generator for drawing, as for
+                  `base.randbelow()`. Defaults to the `random` module.
+
+    Drawing past the cut card is allowed, to finish a round; check
+    `.past_cut` between rounds and `reset()` when it's set.
+
+    Attributes:
+        decks - Int; as provided.
+        size  - Int; the total number of cards.
+        cut   - Int; the number of cards dealt before the cut card.
+
+    Raises ValueError if `decks` is less than 1 or `penetration` isn't
+    between 0 and 1.
+
+    """
+
+    def __init__(self, decks=6, penetration=0.75, rng=None):
+        if decks < 1:
+            raise ValueError("A shoe needs at least one deck")
+        if not 0 <= penetration <= 1:
+            raise ValueError("Penetration must be between 0 and 1")
+        self.decks = decks
+        self.size = decks * DECK_SIZE
+        self.cut = int(self.size * penetration)
+        self._cards = list(range(DECK_SIZE)) * decks
+        self.rng = rng
+        self.reset()
+
+    def reset(self, rng=None):
+        """Put every card back in the shoe.
+
+        Costs the same however many decks there are. `rng`, if given,
+        replaces the shoe's random number generator.
+
+        """
+        if rng is not None:
+            self.rng = rng
+        self._below = base.randbelow(random if self.rng is None
+                                     else self.rng)
+        self._remaining = self.size
+        self._card_counts = [self.decks] * DECK_SIZE
+        self._rank_counts = [self.decks * _SUITS] * _RANKS
+        self._suit_counts = [self.decks * _RANKS] * _SUITS
+
+    def __len__(self):
+        """Return the number of cards left in the shoe."""
+        return self._remaining
+
+    def __repr__(self):
+        return "<{}:{} decks, {}/{} left>".format(
+            self.__class__.__name__, self.decks, self._remaining, self.size)
+
+    @property
+    def dealt(self):
+        """The number of cards drawn since the last reset."""
+        return self.size - self._remaining
+
+    @property
+    def past_cut(self):
+        """Whether the cut card has come out, so it's time to reset."""
+        return self.size - self._remaining >= self.cut
+
+    def draw_code(self):
+        """Draw a random card; returns its code.
+
+        Raises IndexError if the shoe is empty.
+
+        """
+        remaining = self._remaining - 1
+        if remaining < 0:
+            raise IndexError("The shoe is empty")
+        cards = self._cards
+        i = self._below(remaining + 1)
+        code = cards[i]
+        cards[i] = cards[remaining]
+        cards[remaining] = code
+        self._remaining = remaining
+        self._card_counts[code] -= 1
+        self._rank_counts[code >> 2] -= 1
+        self._suit_counts[code & 3] -= 1
+        return code
+
+    def draw(self):
+        """Draw a random card; returns the (shared) StandardCard.
+
+        Raises IndexError if the shoe is empty.
+
+        """
+        return standard._CARDS[self.draw_code()]
+
+    def draw_codes(self, count):
+        """Draw `count` cards; returns a list of their codes.
+
+        Raises IndexError, without drawing anything, if there aren't
+        enough cards left.
+
+        """
+        if count > self._remaining:
+            raise IndexError("Not enough cards in the shoe")
+        return [self.draw_code() for _ in range(count)]
+
+    def deal(self, count):
+        """Draw `count` cards; returns them as a StandardHand.
+
+        Raises IndexError, without drawing anything, if there aren't
+        enough cards left.
+
+        """
+        cards = standard._CARDS
+        return standard.StandardHand([cards[c]
+                                      for c in self.draw_codes(count)])
+
+    def burn(self, count=1):
+        """Draw and discard `count` cards."""
+        self.draw_codes(count)
+
+    def count(self, card):
+        """Return how many of `card` (a StandardCard) are left."""
+        return self._card_counts[card.code]
+
+    def count_rank(self, rank):
+        """Return how many cards of `rank` are left."""
+        return self._rank_counts[rank.ordinal]
+
+    def count_suit(self, suit):
+        """Return how many cards of `suit` are left."""
+        return self._suit_counts[suit.ordinal]
+
+    def rank_counts(self):
+        """Return a list of how many of each rank are left, by ordinal."""
+        return list(self._rank_counts)
+
+    def suit_counts(self):
+        """Return a list of how many of each suit are left, by ordinal."""
+        return list(self._suit_counts)
+
+    def card_counts(self):
+        """Return a list of how many of each card are left, by code."""
+        return list(self._card_counts)
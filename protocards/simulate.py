@@ -0,0 +1,290 @@
+"""Monte Carlo simulation of complete two-player cribbage games.
+
+A game is dealt, discarded, pegged and counted to 121 points, with
+each player's decisions made by a `Strategy`. Cards are handled as
+integer codes throughout (see `protocards.standard.StandardCard`), so
+the inner loop doesn't build cards or hands.
+
+`simulate()` plays many games, optionally across worker processes, and
+collects the outcomes in `Results`. Games are played in batches, each
+with its own random stream from `protocards.dealing.stream_rng()`, so
+the results for a given seed don't depend on the number of workers.
+
+"""
+
+import abc
+import math
+
+from . import base, cribbage, dealing, standard
+
+
+TARGET = 121
+HAND_SIZE = 6
+BATCH_GAMES = 500
+
+_VALUES = cribbage.CARD_VALUES
+
+
+class Strategy(abc.ABC):
+
+    """Decides what a player does. Subclass and override both methods.
+
+    Both are abstract, so a subclass missing either raises TypeError
+    when it's instantiated. Strategies are passed to worker processes,
+    so they should be picklable, which instances of module-level classes
+    usually are.
+
+    """
+
+    @abc.abstractmethod
+    def discard(self, hand, dealer, rng):
+        """Choose two cards to put in the crib.
+
+        `hand` is a list of six card codes and `dealer` whether it's
+        this player's crib. Returns a sequence of two codes from `hand`.
+
+        """
+
+    @abc.abstractmethod
+    def play(self, hand, pegging, rng):
+        """Choose a card to peg.
+
+        `hand` is a list of the player's remaining card codes, and
+        `pegging` the `cribbage.Pegging` state of the play so far, which
+        mustn't be changed. Only called when at least one card can be
+        played without going over 31. Returns a code from `hand`.
+
+        """
+
+
+class RandomStrategy(Strategy):
+
+    """Discards and plays at random."""
+
+    def discard(self, hand, dealer, rng):
+        return rng.sample(hand, 2)
+
+    def play(self, hand, pegging, rng):
+        return rng.choice([c for c in hand if pegging.can_play_code(c)])
+
+
+class GreedyStrategy(Strategy):
+
+    """Keeps the best expected hand and pegs the most points it can.
+
+    Discards with `cribbage.best_discard()`, ignoring the crib. Plays
+    the card which scores the most immediately, breaking ties by playing
+    the highest value.
+
+    """
+
+    def discard(self, hand, dealer, rng):
+        best = cribbage.best_discard(
+            [standard.StandardCard.from_code(c) for c in hand], dealer)[0]
+        return [c.code for c in best.discard]
+
+    def play(self, hand, pegging, rng):
+        best = None
+        for code in hand:
+            if not pegging.can_play_code(code):
+                continue
+            rating = (pegging.peek_code(code), _VALUES[code])
+            if best is None or rating > best[0]:
+                best = (rating, code)
+        return best[1]
+
+
+class _GameOver(Exception):
+
+    """Raised inside a game when a player reaches the target score."""
+
+    pass
+
+
+def _award(scores, player, points, target):
+    scores[player] += points
+    if scores[player] >= target:
+        raise _GameOver(player)
+
+
+def _peg(hands, strategies, scores, pone, rng, target):
+    """Play out the pegging for one deal, awarding points as they come."""
+    hands = [list(hands[0]), list(hands[1])]
+    pegging = cribbage.Pegging()
+    turn = pone
+    while hands[0] or hands[1]:
+        player = turn
+        if any(pegging.can_play_code(c) for c in hands[player]):
+            code = strategies[player].play(hands[player], pegging, rng)
+            hands[player].remove(code)
+            _award(scores, player, pegging.play_code(code, player), target)
+            turn = 1 - player
+        elif any(pegging.can_play_code(c) for c in hands[1 - player]):
+            turn = 1 - player
+        else:
+            # Neither player can go: one for the go, and start again.
+            last = pegging.last_player
+            _award(scores, last, pegging.go(), target)
+            turn = 1 - last
+    _award(scores, pegging.last_player, pegging.go(), target)
+
+
+def play_game(strategies, rng, target=TARGET):
+    """Play one game between two strategies; returns (winner, scores).
+
+    `strategies` is a pair of `Strategy`s, `rng` a `random.Random`-like
+    object, and `target` the score to play to. The first dealer is
+    chosen at random. `scores` is a list of both players' final scores.
+
+    """
+    scores = [0, 0]
+    deck = list(range(len(standard.RANKS) * len(standard.SUITS)))
+    dealer = rng.randrange(2)
+    try:
+        while True:
+            pone = 1 - dealer
+            base.partial_shuffle(deck, 2 * HAND_SIZE + 1, rng)
+            starter = deck[-1]
+            dealt = (deck[-1 - HAND_SIZE:-1], deck[-1 - 2 * HAND_SIZE:
+                                                   -1 - HAND_SIZE])
+            hands = []
+            crib = []
+            for player in (0, 1):
+                thrown = strategies[player].discard(
+                    dealt[player], player == dealer, rng)
+                crib.extend(thrown)
+                hands.append([c for c in dealt[player] if c not in thrown])
+            if starter >> 2 == standard.JACK.ordinal:
+                _award(scores, dealer, 2, target)
+            _peg(hands, strategies, scores, pone, rng, target)
+            _award(scores, pone,
+                   cribbage.score_codes(hands[pone], starter), target)
+            _award(scores, dealer,
+                   cribbage.score_codes(hands[dealer], starter), target)
+            _award(scores, dealer,
+                   cribbage.score_codes(crib, starter, crib=True), target)
+            dealer = pone
+    except _GameOver as over:
+        return over.args[0], scores
+
+
+class Results(object):
+
+    """Running totals over simulated games.
+
+    Attributes:
+        games  - Int; the number of games added.
+        wins   - List of each player's number of wins.
+        points - List of each player's total final score.
+
+    Winning margins are tracked with Welford's algorithm, so `add()` and
+    `merge()` are O(1) and exact enough for any number of games.
+
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.points = [0, 0]
+        self._mean = 0.0
+        self._squares = 0.0
+
+    def add(self, winner, scores):
+        """Record a game's winner and final scores."""
+        self.games += 1
+        self.wins[winner] += 1
+        self.points[0] += scores[0]
+        self.points[1] += scores[1]
+        margin = scores[0] - scores[1]
+        delta = margin - self._mean
+        self._mean += delta / self.games
+        self._squares += delta * (margin - self._mean)
+
+    def merge(self, other):
+        """Add the games recorded in another `Results` to this one."""
+        if not other.games:
+            return
+        games = self.games + other.games
+        delta = other._mean - self._mean
+        self._squares += (other._squares +
+                          delta * delta * self.games * other.games / games)
+        self._mean += delta * other.games / games
+        self.games = games
+        for player in (0, 1):
+            self.wins[player] += other.wins[player]
+            self.points[player] += other.points[player]
+
+    def win_rate(self, player=0):
+        """Return the fraction of games `player` won."""
+        return self.wins[player] / float(self.games)
+
+    def mean_margin(self):
+        """Return player 0's average final score minus player 1's."""
+        return self._mean
+
+    def margin_stdev(self):
+        """Return the sample standard deviation of the score margin."""
+        if self.games < 2:
+            return 0.0
+        return math.sqrt(self._squares / (self.games - 1))
+
+    def __repr__(self):
+        return "<{}:{} games, {:.3f} win rate>".format(
+            self.__class__.__name__, self.games,
+            self.win_rate() if self.games else 0.0)
+
+
+def run_batch(strategies, games, seed, batch):
+    """Play `games` games with the random stream for `batch` of `seed`.
+
+    Returns a `Results`. This is the unit of work `simulate()` hands to
+    worker processes.
+
+    """
+    rng = dealing.stream_rng(seed, batch)
+    results = Results()
+    for _ in range(games):
+        results.add(*play_game(strategies, rng))
+    return results
+
+
+def _run_batch(args):
+    return run_batch(*args)
+
+
+def simulate(strategies, games, workers=1, seed=0, progress=None,
+             batch=BATCH_GAMES):
+    """Play `games` games between a pair of strategies.
+
+    Optional Arguments:
+    workers  - Int; number of worker processes. 1 plays in this process.
+    seed     - Int; seed for the games' random streams.
+    progress - Callable taking the `Results` so far, called after each
+               batch of games finishes.
+    batch    - Int; the number of games in each batch.
+
+    Returns a `Results`, which is the same for the same strategies, seed
+    and batch size whatever the number of workers.
+
+    """
+    batches = [(strategies, min(batch, games - start), seed, i)
+               for i, start in enumerate(range(0, games, batch))]
+    results = Results()
+    pool = None
+    if workers > 1:
+        # Not at the top of the module, so that `bench_simulate` and
+        # single-process callers don't pay for importing it.
+        import multiprocessing
+        pool = multiprocessing.Pool(workers)
+        outcomes = pool.imap(_run_batch, batches)
+    else:
+        outcomes = map(_run_batch, batches)
+    try:
+        for outcome in outcomes:
+            results.merge(outcome)
+            if progress:
+                progress(results)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return results
@@ -6,22 +6,63 @@ list of each: RANKS and SUITS.
 
 """
 
-import functools
+import collections.abc
 import itertools
+import numbers
+import operator
 
 from . import base
 
 
-class Rank(base.CardProperty):
+class OrderedProperty(base.CardProperty):
 
-    """Subclass of `protocards.base.CardProperty` for symmetry with `Suit`."""
+    """A `CardProperty` with a position in a fixed ordering.
+
+    The members of `RANKS` and `SUITS` have their `.ordinal` set to their
+    index in that list; other instances have an `.ordinal` of None. Two
+    properties of the same class which both have ordinals are equal if
+    their ordinals are, which is O(1). Otherwise they compare like any
+    `CardProperty`, by their attributes apart from `.ordinal`, so
+    `Rank("Ace")` is still equal to `ACE`. They hash by name.
+
+    """
+
+    ordinal = None
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(self) is type(other) and self.ordinal is not None and \
+                other.ordinal is not None:
+            return self.ordinal == other.ordinal
+        try:
+            return _unordered(self.__dict__) == _unordered(other.__dict__)
+        except AttributeError:
+            return False
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+def _unordered(attributes):
+    """Return a property's attributes without its ordinal."""
+    if "ordinal" not in attributes:
+        return attributes
+    attributes = dict(attributes)
+    del attributes["ordinal"]
+    return attributes
+
+
+class Rank(OrderedProperty):
+
+    """Subclass of `OrderedProperty` for symmetry with `Suit`."""
 
     pass
 
 
-class Suit(base.CardProperty):
+class Suit(OrderedProperty):
 
-    """Subclass of `protocards.base.CardProperty`. Lowercases its `.short`."""
+    """Subclass of `OrderedProperty`. Lowercases its `.short`."""
 
     def __init__(self, *args, **kwargs):
         super(Suit, self).__init__(*args, **kwargs)
@@ -51,26 +92,74 @@ RANKS = [TWO, THREE, FOUR, FIVE, SIX, SEVEN, EIGHT,
          NINE, TEN, JACK, QUEEN, KING, ACE]
 SUITS = [CLUB, DIAMOND, HEART, SPADE]
 
+for _ordinal, _rank in enumerate(RANKS):
+    _rank.ordinal = _ordinal
+for _ordinal, _suit in enumerate(SUITS):
+    _suit.ordinal = _ordinal
+
 
-@functools.total_ordering
 class StandardCard(base.Card):
 
     """A regular playing card with a rank and a suit.
 
     Initialize with members of `RANKS` and `SUITS`. Raises ValueError
-    if anything else is provided.
+    if anything else is provided. Each of the 52 cards exists exactly
+    once; initializing a card returns the existing instance, and cards
+    can't be modified.
 
     Attributes:
         rank, suit - As provided.
         name       - "Rank of Suits" in title case.
         short      - rank.short + suit.short
+        code       - Integer from 0 to 51: rank index * 4 + suit index.
+                     Cards compare and hash by their codes.
     """
 
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.suit = suit
-        self.short = self.rank.short + self.suit.short
-        self.name = "{} of {}".format(rank.name.title(), suit.plural.title())
+    __slots__ = ("rank", "suit", "short", "name", "code")
+
+    def __new__(cls, rank, suit):
+        try:
+            card = _CARDS[rank.ordinal * 4 + suit.ordinal]
+        except (AttributeError, TypeError, IndexError):
+            # Not members of RANKS and SUITS, but maybe equal to them.
+            try:
+                card = _CARDS[RANKS.index(rank) * 4 + SUITS.index(suit)]
+            except ValueError:
+                card = None
+        if card is None or card.rank != rank or card.suit != suit:
+            raise ValueError("Not a standard rank and suit: {!r}, {!r}"
+                             .format(rank, suit))
+        return card
+
+    @classmethod
+    def from_code(cls, code):
+        """Return the card with integer code `code`.
+
+        Raises ValueError if `code` isn't between 0 and 51.
+
+        """
+        if not 0 <= code < len(_CARDS):
+            raise ValueError("Not a standard card code: {!r}".format(code))
+        return _CARDS[code]
+
+    @classmethod
+    def parse(cls, text):
+        """Return the card named by its short form, like "Ah" or "Td".
+
+        Either case is accepted, as is surrounding whitespace. Raises
+        ValueError for anything else.
+
+        """
+        try:
+            return _SHORT_CARDS[text.strip()]
+        except (KeyError, AttributeError):
+            raise ValueError("Not a standard card: {!r}".format(text))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StandardCards are immutable")
+
+    def __reduce__(self):
+        return (StandardCard.from_code, (self.code,))
 
     def __str__(self):
         return self.name
@@ -78,11 +167,124 @@ class StandardCard(base.Card):
     def __repr__(self):
         return "<{}:{}>".format(self.__class__.__name__, self.short)
 
+    def __hash__(self):
+        return self.code
+
+    def __eq__(self, other):
+        if isinstance(other, StandardCard):
+            return self.code == other.code
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, StandardCard):
+            return self.code != other.code
+        return NotImplemented
+
     def __lt__(self, other):
-        if self.rank == other.rank:
-            return SUITS.index(self.suit) < SUITS.index(other.suit)
+        if isinstance(other, StandardCard):
+            return self.code < other.code
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, StandardCard):
+            return self.code <= other.code
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, StandardCard):
+            return self.code > other.code
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, StandardCard):
+            return self.code >= other.code
+        return NotImplemented
+
+
+def _make_card(rank, suit):
+    """Build the single instance of a card; used only to fill `_CARDS`."""
+    card = object.__new__(StandardCard)
+    for name, value in [
+            ("rank", rank), ("suit", suit),
+            ("short", rank.short + suit.short),
+            ("name", "{} of {}".format(rank.name.title(),
+                                       suit.plural.title())),
+            ("code", rank.ordinal * 4 + suit.ordinal)]:
+        object.__setattr__(card, name, value)
+    return card
+
+
+# Every card, indexed by code; and every card in `make_deck` order.
+_CARDS = tuple(_make_card(rank, suit) for rank in RANKS for suit in SUITS)
+_DECK = [_CARDS[r * 4 + s] for s in range(len(SUITS))
+         for r in range(len(RANKS))]
+
+
+# Lookups for parsing short forms, in either case.
+_SHORT_RANKS = {}
+for _rank in RANKS:
+    _SHORT_RANKS[_rank.short.upper()] = _rank.ordinal
+    _SHORT_RANKS[_rank.short.lower()] = _rank.ordinal
+_SHORT_SUITS = {}
+for _suit in SUITS:
+    _SHORT_SUITS[_suit.short.upper()] = _suit.ordinal
+    _SHORT_SUITS[_suit.short.lower()] = _suit.ordinal
+_SHORT_CARDS = {r + s: _CARDS[_SHORT_RANKS[r] * 4 + _SHORT_SUITS[s]]
+                for r in _SHORT_RANKS for s in _SHORT_SUITS}
+# Cards already parsed from each token seen, like "AJ6s" or "AhKd".
+_TOKENS = dict((short, (card,)) for short, card in _SHORT_CARDS.items())
+_MAX_TOKENS = 100000
+
+
+def _parse_token(token):
+    """Return a tuple of the cards in a token of ranks followed by suits."""
+    cards = []
+    ranks = []
+    for char in token:
+        if char in _SHORT_RANKS:
+            ranks.append(_SHORT_RANKS[char])
+        elif char in _SHORT_SUITS and ranks:
+            suit = _SHORT_SUITS[char]
+            cards.extend(_CARDS[r * 4 + suit] for r in ranks)
+            ranks = []
         else:
-            return RANKS.index(self.rank) < RANKS.index(other.rank)
+            raise ValueError("Can't parse cards from {!r}".format(token))
+    if ranks:
+        raise ValueError("Ranks without a suit in {!r}".format(token))
+    cards = tuple(cards)
+    if len(_TOKENS) < _MAX_TOKENS:
+        _TOKENS[token] = cards
+    return cards
+
+
+# Sorting key for StandardCards, in the same order their comparisons use.
+sort_key = operator.attrgetter("code")
+
+
+def card_code(card):
+    """Return the code of `card`, a StandardCard or a card code.
+
+    Codes can be NumPy integers, and are returned as ints. Raises
+    ValueError for a code which isn't between 0 and 51.
+
+    """
+    if not isinstance(card, numbers.Integral):
+        return card.code
+    code = int(card)
+    if not 0 <= code < len(_CARDS):
+        raise ValueError("Not a card code: {!r}".format(card))
+    return code
+
+
+def hand_key(cards):
+    """Return a hashable key for a hand which doesn't depend on its order.
+
+    `cards` is an iterable of StandardCards or card codes, which can be
+    NumPy integers; the key is a sorted tuple of int codes, so repeated
+    cards are kept. Raises ValueError for a code which isn't a card.
+
+    """
+    return tuple(sorted(map(card_code, cards)))
 
 
 class StandardHand(base.Hand):
@@ -91,14 +293,34 @@ class StandardHand(base.Hand):
 
     Raises TypeError if a non-`StandardCard` is passed in."""
 
+    @classmethod
+    def parse(cls, text):
+        """Return a hand of the cards written in `text`.
+
+        Cards are written as in `str()` of a hand: ranks followed by the
+        suit they share, so "AJ6s 2h" is the ace, jack and six of spades
+        and the two of hearts, and "AhKd" two cards. Groups can be
+        separated by whitespace or commas. The cards come in the order
+        they're written, so `parse(str(hand))` has the same cards as
+        `hand`, sorted as `str()` sorts them.
+
+        Raises ValueError if `text` isn't made of cards.
+
+        """
+        if "," in text:
+            text = text.replace(",", " ")
+        tokens = text.split()
+        chain = itertools.chain.from_iterable
+        try:
+            cards = list(chain(map(_TOKENS.__getitem__, tokens)))
+        except KeyError:
+            cards = list(chain(_TOKENS.get(token) or _parse_token(token)
+                               for token in tokens))
+        # A list is copied straight in, skipping UserList's type checks.
+        return cls(cards)
+
     def __str__(self):
-        suit_strings = []
-        for suit in reversed(SUITS):
-            cards = sorted(self.by_suit(suit), reverse=True)
-            if cards:
-                ranks = "".join([c.rank.short for c in cards])
-                suit_strings.append(ranks + suit.short)
-        return " ".join(suit_strings)
+        return _format_cards(self.data)
 
     def __repr__(self):
         return "<{}:{}>".format(self.__class__.__name__,
@@ -106,22 +328,239 @@ class StandardHand(base.Hand):
 
     def by_suit(self, suit):
         """Return all cards of `suit`, without removing them."""
+        if isinstance(suit, Suit) and suit.ordinal is not None:
+            ordinal = suit.ordinal
+            return self.__class__([c for c in self.data
+                                   if c.code & 3 == ordinal])
         return self.__class__([c for c in self if c.suit == suit])
 
     def by_rank(self, rank):
         """Return all cards of `rank`, without removing them."""
+        if isinstance(rank, Rank) and rank.ordinal is not None:
+            ordinal = rank.ordinal
+            return self.__class__([c for c in self.data
+                                   if c.code >> 2 == ordinal])
         return self.__class__([c for c in self if c.rank == rank])
 
+    def sort(self, key=None, reverse=False):
+        """Sort the hand in place, by `sort_key` unless given a `key`."""
+        self.data.sort(key=sort_key if key is None else key,
+                       reverse=reverse)
+
+    def key(self):
+        """Return a hashable key for the cards, whatever their order.
+
+        It's `hand_key()` of the cards, a sorted tuple of card codes, so
+        hands with the same cards have the same key.
+
+        """
+        return hand_key(self.data)
+
+    def freeze(self):
+        """Return a `FrozenStandardHand` of the same cards."""
+        return FrozenStandardHand(self.data)
+
+    def union(self, other):
+        """Return the cards in this hand, then those only in `other`."""
+        return self.__class__(_union(self.data, other))
+
+    def intersection(self, other):
+        """Return the cards in this hand which are also in `other`."""
+        return self.__class__(_intersection(self.data, other))
+
+    def difference(self, other):
+        """Return the cards in this hand which aren't in `other`."""
+        return self.__class__(_difference(self.data, other))
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+class FrozenStandardHand(collections.abc.Sequence):
+
+    """An immutable, hashable hand of standard playing cards.
+
+    The cards are kept in `sort_key` order, so two frozen hands with the
+    same cards are equal and hash the same however they were made, and
+    can be used as dictionary keys or deduplicated with a set. They're
+    only equal to other frozen hands, not to tuples or lists of the same
+    cards. Supports `len()`, indexing, slicing, iteration and `in`, and
+    adding or multiplying them makes frozen hands. It has the same
+    `str()`, `key()` and set operations as `StandardHand`.
+
+    Raises TypeError if a non-`StandardCard` is passed in.
+
+    """
+
+    __slots__ = ("_cards",)
+
+    def __init__(self, cards=()):
+        object.__setattr__(self, "_cards",
+                           tuple(sorted(cards, key=_checked_code)))
 
-def make_deck(shuffle=False):
-    """Return a `StandardHand` of all 52 cards; optionally, shuffle it."""
-    deck = StandardHand([StandardCard(rank, suit)
-                         for suit, rank in itertools.product(SUITS, RANKS)])
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenStandardHands are immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self._cards,))
+
+    def __len__(self):
+        return len(self._cards)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__class__(self._cards[index])
+        return self._cards[index]
+
+    def __iter__(self):
+        return iter(self._cards)
+
+    def __contains__(self, card):
+        return card in self._cards
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenStandardHand):
+            return self._cards == other._cards
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, FrozenStandardHand):
+            return self._cards != other._cards
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._cards)
+
+    def __add__(self, other):
+        if isinstance(other, FrozenStandardHand):
+            return self.__class__(self._cards + other._cards)
+        return NotImplemented
+
+    def __mul__(self, count):
+        if not isinstance(count, int):
+            return NotImplemented
+        return self.__class__(self._cards * count)
+
+    __rmul__ = __mul__
+
+    def __str__(self):
+        return _format_cards(self)
+
+    def __repr__(self):
+        return "<{}:{}>".format(self.__class__.__name__,
+                                ",".join([c.short for c in self]))
+
+    def key(self):
+        """Return the sorted tuple of the hand's card codes."""
+        return hand_key(self)
+
+    def thaw(self):
+        """Return a `StandardHand` of the same cards."""
+        return StandardHand(list(self))
+
+    def union(self, other):
+        """Return a frozen hand of the cards in either hand."""
+        return self.__class__(_union(self, other))
+
+    def intersection(self, other):
+        """Return a frozen hand of the cards in both hands."""
+        return self.__class__(_intersection(self, other))
+
+    def difference(self, other):
+        """Return a frozen hand of the cards only in this hand."""
+        return self.__class__(_difference(self, other))
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+# Rank short names by card code, for formatting.
+_RANK_SHORTS = tuple(card.rank.short for card in _CARDS)
+
+
+def _format_cards(cards):
+    """Format cards like "AJ6s 2h 3c": by suit, highest first."""
+    by_suit = [[], [], [], []]
+    for card in sorted(cards, key=sort_key, reverse=True):
+        by_suit[card.code & 3].append(_RANK_SHORTS[card.code])
+    return " ".join("".join(ranks) + SUITS[i].short
+                    for i, ranks in reversed(list(enumerate(by_suit)))
+                    if ranks)
+
+
+def _checked_code(card):
+    if not isinstance(card, StandardCard):
+        raise TypeError("Not a StandardCard: {!r}".format(card))
+    return card.code
+
+
+def _union(cards, other):
+    seen = set(cards)
+    extra = []
+    for card in other:
+        if card not in seen:
+            seen.add(card)
+            extra.append(card)
+    return list(cards) + extra
+
+
+def _intersection(cards, other):
+    other = set(other)
+    return [c for c in cards if c in other]
+
+
+def _difference(cards, other):
+    other = set(other)
+    return [c for c in cards if c not in other]
+
+
+def parse_lines(lines):
+    """Yield a `StandardHand` for each line of an iterable, like a file.
+
+    Lines are parsed with `StandardHand.parse()`; blank lines give empty
+    hands, so hands line up with line numbers. Raises ValueError, naming
+    the line number, for a line that doesn't parse.
+
+    """
+    parse = StandardHand.parse
+    for number, line in enumerate(lines, 1):
+        try:
+            yield parse(line)
+        except ValueError as error:
+            raise ValueError("Line {}: {}".format(number, error))
+
+
+def make_deck(shuffle=False, rng=None):
+    """Return a `StandardHand` of all 52 cards; optionally, shuffle it.
+
+    `rng` is passed to `StandardHand.shuffle()`.
+
+    """
+    deck = StandardHand(_DECK)
     if shuffle:
-        deck.shuffle()
+        deck.shuffle(rng)
     return deck
 
 
+class StandardDeck(base.Deck):
+
+    """A `base.Deck` of the 52 standard cards, shuffled to begin with.
+
+    Optional Argument:
+    rng - Random number generator for shuffling, as for `make_deck()`.
+
+    Views it deals turn into StandardHands with `to_hand()`.
+
+    """
+
+    hand_class = StandardHand
+
+    def __init__(self, rng=None):
+        super(StandardDeck, self).__init__(_DECK, shuffle=True, rng=rng)
+
+
 if __name__ == "__main__":
     deck = make_deck(shuffle=True)
     print(deck.deal(13))
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+
+import os
+import tempfile
+import unittest
+import random
+
+from .. import standard, codec, cribbage, masks, poker
+
+try:
+    import numpy
+    from .. import arrays
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "requires numpy")
+class TestArrays(unittest.TestCase):
+    def setUp(self):
+        self.deck = standard.make_deck()
+        rng = random.Random(0)
+        self.hands = []
+        self.turned = []
+        for _ in range(2000):
+            rng.shuffle(self.deck)
+            self.hands.append(standard.StandardHand(self.deck[:4]))
+            self.turned.append(self.deck[4])
+        self.crib = numpy.array([rng.random() < 0.5 for _ in self.hands])
+        self.dealer = numpy.array([rng.random() < 0.5 for _ in self.hands])
+
+    def test_to_codes(self):
+        codes = arrays.to_codes(self.hands[:3])
+        self.assertEqual(codes.shape, (3, 4))
+        self.assertEqual(codes[0, 0], self.hands[0][0].code)
+        self.assertEqual(arrays.to_codes([]).shape, (0, 0))
+
+    def test_score_hands(self):
+        score = arrays.score_hands(arrays.to_codes(self.hands),
+                                   arrays.to_codes([self.turned])[0],
+                                   self.crib, self.dealer)
+        for i, hand in enumerate(self.hands):
+            expected = cribbage.score_hand(hand, self.turned[i],
+                                           crib=self.crib[i],
+                                           dealer=self.dealer[i])
+            self.assertEqual({k: score[k][i] for k in arrays.SCORE_TYPES},
+                             expected)
+
+    def test_score_hands_noturn(self):
+        score = arrays.score_hands(arrays.to_codes(self.hands))
+        for i, hand in enumerate(self.hands):
+            expected = cribbage.score_hand(hand)
+            self.assertEqual({k: score[k][i] for k in arrays.SCORE_TYPES},
+                             expected)
+
+    def test_bad_shapes(self):
+        codes = arrays.to_codes(self.hands)
+        self.assertRaises(ValueError, arrays.score_hands, codes[0])
+        self.assertRaises(ValueError, arrays.score_hands, codes, codes[:5, 0])
+
+    def test_bad_codes(self):
+        codes = arrays.to_codes(self.hands)
+        turned = codes[:, 0].copy()
+        codes[3, 2] = 52
+        self.assertRaises(ValueError, arrays.score_hands, codes)
+        codes[3, 2] = -1
+        self.assertRaises(ValueError, arrays.score_hands, codes)
+        turned[0] = 52
+        self.assertRaises(ValueError, arrays.score_hands,
+                          arrays.to_codes(self.hands), turned)
+
+    def test_empty_batch(self):
+        for cards in (arrays.to_codes([]), numpy.zeros((0, 4))):
+            score = arrays.score_hands(cards)
+            self.assertEqual(sorted(score), sorted(arrays.SCORE_TYPES))
+            for points in score.values():
+                self.assertEqual(points.shape, (0,))
+
+    def test_deal_array(self):
+        first, second = arrays.spawn_generators(0, 2)
+        deals = arrays.deal_array(1000, 5, first)
+        self.assertEqual(deals.shape, (1000, 5))
+        self.assertTrue(all(len(set(row)) == 5 for row in deals.tolist()))
+        self.assertTrue(((deals >= 0) & (deals < 52)).all())
+        again = arrays.deal_array(1000, 5, arrays.spawn_generators(0, 1)[0])
+        self.assertTrue((deals == again).all())
+        self.assertFalse((deals == arrays.deal_array(1000, 5, second)).all())
+        full = arrays.deal_array(3, 52, first)
+        self.assertEqual(sorted(full[0].tolist()), list(range(52)))
+
+    def test_deal_batches(self):
+        batches = list(arrays.deal_batches(250, 4, batch=100))
+        self.assertEqual([len(b) for b in batches], [100, 100, 50])
+
+    def test_evaluate_hands(self):
+        rng = numpy.random.default_rng(0)
+        for size in (5, 6, 7):
+            deals = arrays.deal_array(2000, size, rng)
+            expected = [poker.evaluate_codes(row) for row in deals.tolist()]
+            self.assertEqual(arrays.evaluate_hands(deals).tolist(), expected)
+        self.assertRaises(ValueError, arrays.evaluate_hands, deals[:, :4])
+
+    def test_load_masks(self):
+        hands = self.hands[:50]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "hands.pcrd")
+            with open(path, "wb") as stream:
+                with codec.HandWriter(stream, codec.MASKS) as writer:
+                    writer.write_all(hands)
+            loaded = arrays.load_masks(path)
+            self.assertIsInstance(loaded, numpy.memmap)
+            self.assertEqual(loaded.tolist(),
+                             [masks.mask_of(hand) for hand in hands])
+            codes = arrays.mask_codes(loaded)
+            self.assertEqual(codes.shape, (50, 4))
+            self.assertEqual([sorted(row) for row in codes.tolist()],
+                             [sorted(c.code for c in hand) for hand in hands])
+            del loaded
+            copy = os.path.join(directory, "copy.pcrd")
+            arrays.save_masks(copy, numpy.array(
+                [masks.mask_of(hand) for hand in hands], dtype=numpy.uint64))
+            with open(path, "rb") as a, open(copy, "rb") as b:
+                self.assertEqual(a.read(), b.read())
+            with open(path, "wb") as stream:
+                codec.HandWriter(stream, codec.HANDS).write(hands[0])
+            self.assertRaises(ValueError, arrays.load_masks, path)
+        self.assertRaises(ValueError, arrays.mask_codes, [0b11, 0b1])
+        self.assertEqual(arrays.mask_codes([]).shape, (0, 0))
@@ -1,9 +1,18 @@
 #!/usr/bin/python
 
+import operator
+import pickle
 import unittest
 import random
 
-from .. import base
+from .. import base, masks
+
+
+COLORS = [base.CardProperty("Red"), base.CardProperty("Green"),
+          base.CardProperty("Purple")]
+SHAPES = ["oval", "diamond", "squiggle"]
+Gem = base.make_card_type("Gem", [("color", COLORS), ("number", range(1, 4)),
+                                  ("shape", SHAPES)])
 
 
 class TestBase(unittest.TestCase):
@@ -27,10 +36,102 @@ class TestBase(unittest.TestCase):
         self.assertEqual(hand.data, [1, 2])
         self.assertEqual(book.data, [3, 4, 5])
 
+    def test_shuffle_rng(self):
+        first = base.Hand(range(20))
+        second = base.Hand(range(20))
+        first.shuffle(random.Random(1))
+        second.shuffle(random.Random(1))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first.data, list(range(20)))
+
+    def test_deal_rng(self):
+        hand = base.Hand(range(20))
+        book = hand.deal(5, rng=random.Random(2))
+        self.assertEqual(len(hand), 15)
+        self.assertEqual(sorted(hand.data + book.data), list(range(20)))
+        self.assertNotEqual(book.data, [15, 16, 17, 18, 19])
+        again = base.Hand(range(20)).deal(5, rng=random.Random(2))
+        self.assertEqual(book, again)
+
+    def test_partial_shuffle(self):
+        counts = [0] * 5
+        rng = random.Random(3)
+        for _ in range(5000):
+            items = base.partial_shuffle([0, 1, 2, 3, 4], 1, rng)
+            counts[items[-1]] += 1
+        for count in counts:
+            self.assertTrue(800 < count < 1200)
+
+    def test_randbelow(self):
+        class Integers(object):
+            def integers(self, n):
+                return n - 1
+        self.assertEqual(base.randbelow(Integers())(7), 6)
+        self.assertEqual(base.randbelow(random.Random(0))(1), 0)
+
     def test_deal_toomany(self):
         hand = base.Hand([1, 2, 3, 4, 5])
         self.assertRaises(IndexError, hand.deal, 10)
 
+    def test_deck_deal(self):
+        deck = base.Deck(range(10), shuffle=False)
+        self.assertEqual(len(deck), 10)
+        first = deck.deal(3)
+        second = deck.deal(4)
+        self.assertEqual(first, [0, 1, 2])
+        self.assertEqual(list(second), [3, 4, 5, 6])
+        self.assertEqual(len(deck), 3)
+        self.assertRaises(ValueError, deck.deal, -1)
+        self.assertEqual(len(deck), 3)
+        self.assertEqual(deck.deal_one(), 7)
+        self.assertEqual(deck.remaining(), [8, 9])
+        self.assertRaises(IndexError, deck.deal, 3)
+        deck.deal(2)
+        self.assertRaises(IndexError, deck.deal_one)
+        self.assertEqual(deck.deal(0), [])
+
+    def test_hand_view(self):
+        view = base.Deck(range(10), shuffle=False).deal(5)
+        self.assertEqual(len(view), 5)
+        self.assertEqual(view[0], 0)
+        self.assertEqual(view[-1], 4)
+        self.assertEqual(view[1:4], [1, 2, 3])
+        self.assertEqual(view[::-2], [4, 2, 0])
+        self.assertRaises(IndexError, view.__getitem__, 5)
+        self.assertRaises(IndexError, view.__getitem__, -6)
+        self.assertIn(3, view)
+        self.assertNotIn(5, view)
+        self.assertEqual(view.index(2), 2)
+        self.assertEqual(list(reversed(view)), [4, 3, 2, 1, 0])
+        self.assertEqual(base.Hand([0, 1, 2, 3, 4]), view)
+        self.assertNotEqual(view, [0, 1, 2])
+        self.assertNotEqual(view, "01234")
+        hand = view.to_hand()
+        self.assertIsInstance(hand, base.Hand)
+        self.assertEqual(hand.data, [0, 1, 2, 3, 4])
+        self.assertRaises(TypeError, hash, view)
+        with self.assertRaises(TypeError):
+            view[0] = 1
+
+    def test_deck_reset(self):
+        deck = base.Deck(range(20), rng=random.Random(4))
+        again = base.Deck(range(20), rng=random.Random(4))
+        self.assertEqual(deck.remaining(), again.remaining())
+        self.assertNotEqual(list(deck.remaining()), list(range(20)))
+        view = deck.deal(5)
+        cards = view.to_hand()
+        deck.reset()
+        self.assertEqual(len(deck), 20)
+        self.assertEqual(sorted(deck.remaining()), list(range(20)))
+        self.assertRaises(RuntimeError, list, view)
+        self.assertRaises(RuntimeError, view.__getitem__, 0)
+        self.assertEqual(len(cards), 5)
+        # Resetting shuffles in place, so it starts from the last order.
+        again.reset()
+        deck.reset(random.Random(5))
+        again.reset(random.Random(5))
+        self.assertEqual(deck.deal(20), again.deal(20))
+
 
 class TestEqualityMixin(unittest.TestCase):
     def setUp(self):
@@ -70,3 +171,94 @@ class TestEqualityMixin(unittest.TestCase):
         a.name = "apple"
         b.name = "banana"
         self.assertNotEqual(a, b)
+
+
+class TestCompactCards(unittest.TestCase):
+    def test_card(self):
+        gem = Gem(COLORS[1], 2, "diamond")
+        self.assertIsInstance(gem, base.CompactCard)
+        self.assertEqual(gem.color, COLORS[1])
+        self.assertEqual(gem.number, 2)
+        self.assertEqual(gem.shape, "diamond")
+        self.assertEqual(gem.code, 1 * 9 + 1 * 3 + 1)
+        self.assertEqual(gem.values(), (COLORS[1], 2, "diamond"))
+        self.assertEqual(repr(gem), "<Gem:G/2/diamond>")
+        self.assertEqual(str(gem), "Green 2 diamond")
+        self.assertEqual(Gem.size, 27)
+        self.assertFalse(hasattr(gem, "__dict__"))
+
+    def test_interned(self):
+        gem = Gem(COLORS[2], 3, "oval")
+        self.assertIs(gem, Gem(shape="oval", number=3, color=COLORS[2]))
+        self.assertIs(gem, Gem(COLORS[2], 3, shape="oval"))
+        # An equal property which isn't the same object still works.
+        self.assertIs(gem, Gem(base.CardProperty("Purple"), 3, "oval"))
+        self.assertIs(gem, Gem.from_code(gem.code))
+        self.assertEqual(len(set(map(id, Gem._cards))), Gem.size)
+        self.assertIs(gem, pickle.loads(pickle.dumps(gem)))
+        with self.assertRaises(AttributeError):
+            gem.number = 1
+
+    def test_bad_cards(self):
+        self.assertRaises(ValueError, Gem, COLORS[0], 4, "oval")
+        self.assertRaises(ValueError, Gem, COLORS[0], 1, "cube")
+        self.assertRaises(TypeError, Gem, COLORS[0], 1)
+        self.assertRaises(TypeError, Gem, COLORS[0], 1, "oval", size=2)
+        self.assertRaises(ValueError, Gem.from_code, 27)
+        self.assertRaises(ValueError, base.make_card_type, "X",
+                          [("a", [1]), ("a", [2])])
+        self.assertRaises(ValueError, base.make_card_type, "X", [("b", [])])
+        self.assertRaises(ValueError, base.make_card_type, "X",
+                          [("code", [1])])
+
+    def test_ordering(self):
+        deck = Gem.make_deck()
+        self.assertIsInstance(deck, base.Hand)
+        self.assertEqual([g.code for g in deck], list(range(27)))
+        shuffled = list(deck)
+        random.Random(0).shuffle(shuffled)
+        self.assertEqual(sorted(shuffled), list(deck))
+        self.assertLess(Gem(COLORS[0], 3, "squiggle"),
+                        Gem(COLORS[1], 1, "oval"))
+        self.assertEqual(len(set(deck + deck)), 27)
+        Other = base.make_card_type("Other", [("n", range(3))])
+        self.assertNotEqual(Other(0), deck[0])
+
+    def test_hand(self):
+        GemHand = Gem.hand_class
+        self.assertEqual(GemHand.__name__, "GemHand")
+        deck = Gem.make_deck()
+        hand = GemHand(deck[::2])
+        self.assertEqual(len(hand), 14)
+        self.assertEqual(list(hand), list(deck[::2]))
+        self.assertIn(deck[0], hand)
+        self.assertNotIn(deck[1], hand)
+        twos = hand.by("number", 2)
+        self.assertTrue(all(g.number == 2 for g in twos))
+        self.assertEqual(len(twos), hand.count("number", 2))
+        self.assertEqual(hand.counts("color"), [5, 4, 5])
+        self.assertEqual(sum(hand.counts("shape")), 14)
+        self.assertEqual(hand.count("color", base.CardProperty("Red")), 5)
+        self.assertRaises(ValueError, hand.by, "size", 1)
+        self.assertRaises(ValueError, hand.counts, "size")
+        self.assertRaises(ValueError, hand.by, "number", 5)
+        self.assertRaises(TypeError, GemHand, [1])
+        self.assertEqual(GemHand(deck) - hand, GemHand(deck[1::2]))
+        self.assertEqual(hand | GemHand(deck[1::2]), GemHand(deck))
+        self.assertEqual(len(hand & twos), len(twos))
+        self.assertEqual(hash(hand), hash(GemHand(reversed(deck[::2]))))
+        self.assertEqual(hand.to_hand(), base.Hand(list(deck[::2])))
+        self.assertRaises(ValueError, GemHand.from_mask, 1 << 27)
+        with self.assertRaises(AttributeError):
+            hand.mask = 0
+
+    def test_hand_types(self):
+        hand = Gem.hand_class(Gem.make_deck())
+        Other = base.make_card_type("Other", [("n", range(3))])
+        other = Other.hand_class(Other.make_deck())
+        self.assertEqual(hand.mask & other.mask, other.mask)
+        for operation in (operator.or_, operator.and_, operator.sub,
+                          operator.xor):
+            self.assertRaises(TypeError, operation, hand, other)
+            self.assertRaises(TypeError, operation, hand,
+                              masks.MaskHand.from_mask(other.mask))
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+try:
+    from benchmarks import run
+except ImportError:
+    # The benchmarks live beside the package, in a source checkout only.
+    run = None
+
+
+def _result(ops_per_sec):
+    return {"ops": 10, "seconds": 10.0 / ops_per_sec,
+            "ops_per_sec": ops_per_sec, "peak_bytes": 0}
+
+
+@unittest.skipIf(run is None, "requires the benchmarks directory")
+class TestRun(unittest.TestCase):
+    def test_compare(self):
+        baseline = {"fast": _result(1000.0), "slow": _result(1000.0),
+                    "gone": _result(1000.0)}
+        results = {"fast": _result(900.0), "slow": _result(700.0),
+                   "new": _result(1.0)}
+        self.assertEqual(run.compare(results, baseline),
+                         [("slow", 0.7)])
+        self.assertEqual(run.compare(results, baseline, threshold=0.5), [])
+        self.assertEqual(run.compare(results, {}), [])
+
+    def test_baseline(self):
+        with open(run.BASELINE) as stream:
+            baseline = json.load(stream)
+        self.assertEqual(sorted(baseline["benchmarks"]),
+                         sorted(run.BENCHMARKS))
+        self.assertEqual(run.compare(baseline["benchmarks"],
+                                     baseline["benchmarks"]), [])
+
+    def test_main(self):
+        # A tiny scale still times at least one operation.
+        args = ["--scale", "1e-9", "--repeat", "1", "--only", "make_deck",
+                "score_hand"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(run.main(args + ["--save", path]), 0)
+            with open(path) as stream:
+                saved = json.load(stream)["benchmarks"]
+            self.assertEqual(sorted(saved), ["make_deck", "score_hand"])
+            self.assertEqual(saved["make_deck"]["ops"], 1)
+
+            # Anything is a regression against an impossibly fast baseline.
+            for result in saved.values():
+                result["ops_per_sec"] *= 1e9
+            with open(path, "w") as stream:
+                json.dump({"benchmarks": saved}, stream)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(run.main(args + ["--compare", path]), 1)
+            self.assertIn("REGRESSION: make_deck", output.getvalue())
@@ -0,0 +1,138 @@
+#!/usr/bin/python
+
+import threading
+import unittest
+
+from .. import cache, cribbage, poker, standard
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestCache(unittest.TestCase):
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_hand_key_numpy(self):
+        hand = standard.make_deck()[:5]
+        key = cache.hand_key(numpy.array([c.code for c in hand]))
+        self.assertEqual(key, cache.hand_key(hand))
+        self.assertIs(type(key[0]), int)
+
+    def test_hand_key(self):
+        deck = standard.make_deck()
+        hand = deck[:5]
+        self.assertEqual(cache.hand_key(hand), cache.hand_key(hand[::-1]))
+        self.assertEqual(cache.hand_key(hand),
+                         cache.hand_key([c.code for c in hand]))
+        self.assertNotEqual(cache.hand_key(hand), cache.hand_key(deck[1:6]))
+        self.assertEqual(cache.hand_key([3, 3, 1]), (1, 3, 3))
+        self.assertRaises(ValueError, cache.hand_key, [1, 52])
+
+    def test_lru(self):
+        lru = cache.Cache(2, policy=cache.LRU)
+        lru.put("a", 1)
+        lru.put("b", 2)
+        self.assertEqual(lru.get("a"), 1)
+        lru.put("c", 3)
+        self.assertNotIn("b", lru)
+        self.assertIn("a", lru)
+        self.assertEqual(lru.get("b", "gone"), "gone")
+        self.assertEqual(lru.info(), cache.CacheInfo(1, 1, 1, 2, 2))
+
+    def test_lfu(self):
+        lfu = cache.Cache(2, policy=cache.LFU)
+        lfu.put("a", 1)
+        lfu.put("b", 2)
+        for _ in range(3):
+            lfu.get("a")
+        lfu.put("c", 3)
+        self.assertNotIn("b", lfu)
+        lfu.get("c")
+        lfu.put("d", 4)
+        # "c" and "d" were both used less than "a"; "c" is older.
+        self.assertNotIn("c", lfu)
+        self.assertEqual(sorted(lfu._data), ["a", "d"])
+        lfu.put("d", 5)
+        self.assertEqual(lfu.get("d"), 5)
+        lfu.clear()
+        self.assertEqual(len(lfu), 0)
+        self.assertEqual(lfu.info().hits, 0)
+
+    def test_bad_args(self):
+        self.assertRaises(ValueError, cache.Cache, policy="fifo")
+        self.assertRaises(ValueError, cache.Cache, 0)
+
+    def test_memoize(self):
+        calls = []
+
+        @cache.memoize(cache.Cache(), key=cache.hand_key)
+        def strength(hand):
+            calls.append(hand)
+            return poker.evaluate(hand)
+
+        hand = standard.make_deck()[:5]
+        self.assertEqual(strength(hand), poker.evaluate(hand))
+        self.assertEqual(strength(hand[::-1]), poker.evaluate(hand))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(strength.cache.info().hits, 1)
+
+        default = cache.memoize(cache.Cache())(pow)
+        self.assertEqual(default(2, 10), 1024)
+        self.assertEqual(default(2, 10), 1024)
+        self.assertEqual(default.cache.info()[:2], (1, 1))
+
+    def test_threads(self):
+        shared = cache.Cache(50, policy=cache.LFU)
+        square = cache.memoize(shared)(lambda n: n * n)
+
+        # Failures in a thread don't reach unittest, so each thread only
+        # records what it saw, and that's checked here afterwards.
+        results = [[] for _ in range(8)]
+        errors = []
+
+        def work(offset):
+            try:
+                for i in range(2000):
+                    n = (i + offset) % 80
+                    results[offset].append((n, square(n)))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        for found in results:
+            self.assertEqual(len(found), 2000)
+            self.assertEqual([value for _, value in found],
+                             [n * n for n, _ in found])
+        info = shared.info()
+        self.assertEqual(info.hits + info.misses, 16000)
+        self.assertEqual(info.size, 50)
+        self.assertEqual(len(shared._uses), 50)
+
+
+class TestCachedScoreHand(unittest.TestCase):
+    def test_cached_score_hand(self):
+        score = cribbage.cached_score_hand()
+        deck = standard.make_deck()
+        hand = standard.StandardHand(deck[9:13])
+        turned = deck[20]
+        expected = cribbage.score_hand(hand, turned, dealer=True)
+        self.assertEqual(score(hand, turned, dealer=True), expected)
+        result = score(standard.StandardHand(hand[::-1]), turned, dealer=True)
+        self.assertEqual(result, expected)
+        result["runs"] = 100
+        self.assertEqual(score(hand, turned, dealer=True), expected)
+        self.assertEqual(score.cache.info()[:2], (2, 1))
+        self.assertEqual(score(hand, turned, crib=True),
+                         cribbage.score_hand(hand, turned, crib=True))
+        self.assertEqual(score(hand), score(hand, None, True, True))
+
+    def test_key(self):
+        hand = standard.make_deck()[:4]
+        self.assertEqual(cribbage.score_hand_key(hand, crib=True),
+                         cribbage.score_hand_key(hand[::-1]))
@@ -0,0 +1,62 @@
+#!/usr/bin/python
+
+import itertools
+import unittest
+import random
+
+from .. import standard, canonical
+
+
+def swap_suits(cards, permutation):
+    return [standard.StandardCard(c.rank, standard.SUITS[
+        permutation[c.suit.ordinal]]) for c in cards]
+
+
+class TestCanonical(unittest.TestCase):
+    def setUp(self):
+        self.deck = standard.make_deck()
+        random.seed(0)
+        self.deck.shuffle()
+
+    def test_suit_swap_invariant(self):
+        hand = self.deck[:4]
+        turned = self.deck[4]
+        form = canonical.canonicalize(hand, turned)
+        for permutation in itertools.permutations(range(4)):
+            swapped = canonical.canonicalize(
+                swap_suits(hand, permutation),
+                swap_suits([turned], permutation)[0])
+            self.assertEqual(swapped, form)
+
+    def test_canonical_form(self):
+        hand = [standard.StandardCard(standard.ACE, standard.SPADE),
+                standard.StandardCard(standard.TWO, standard.HEART),
+                standard.StandardCard(standard.THREE, standard.HEART)]
+        form = canonical.canonicalize(hand)
+        self.assertEqual(str(form.hand), "32d Ac")
+        self.assertIsNone(form.turned)
+        self.assertEqual(form.multiplicity, 12)
+        pattern, order = canonical.suit_pattern(hand)
+        self.assertEqual(pattern, form.pattern)
+        self.assertEqual(order[:2], [standard.SPADE.ordinal,
+                                     standard.HEART.ordinal])
+
+    def test_index_covers_everything(self):
+        index = canonical.CanonicalIndex(2, turned=True)
+        self.assertEqual(sum(index.canonical(i).multiplicity
+                             for i in range(len(index))), 52 * 51 // 2 * 50)
+        index = canonical.CanonicalIndex(3)
+        self.assertEqual(sum(canonical.multiplicity(p)
+                             for p in index.patterns), 52 * 51 * 50 // 6)
+        self.assertEqual(len(set(index.patterns)), len(index))
+
+    def test_index_roundtrip(self):
+        index = canonical.CanonicalIndex(3, turned=True)
+        hand = self.deck[:3]
+        i = index.index(hand, self.deck[3])
+        form = index.canonical(i)
+        self.assertEqual(form, canonical.canonicalize(hand, self.deck[3]))
+        self.assertEqual(index.index(form.hand, form.turned), i)
+        self.assertRaises(ValueError, index.index, hand)
+        self.assertRaises(ValueError, index.index, self.deck[:4],
+                          self.deck[4])
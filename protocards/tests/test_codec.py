@@ -0,0 +1,97 @@
+#!/usr/bin/python
+
+import io
+import random
+import unittest
+
+from .. import codec, masks, standard
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestCodec(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        deck = list(range(52))
+        self.hands = []
+        for size in (0, 1, 5, 6, 13, 52):
+            rng.shuffle(deck)
+            self.hands.append(tuple(deck[:size]))
+
+    def test_encode_hand(self):
+        for hand in self.hands:
+            data = codec.encode_hand(hand)
+            self.assertEqual(len(data), 1 + (6 * len(hand) + 7) // 8)
+            self.assertEqual(codec.decode_hand(data), (hand, len(data)))
+        cards = standard.make_deck()[:3]
+        self.assertEqual(codec.encode_hand(cards),
+                         codec.encode_hand([c.code for c in cards]))
+        self.assertRaises(ValueError, codec.encode_hand, [52])
+        self.assertRaises(ValueError, codec.encode_hand, [-1])
+        self.assertRaises(ValueError, codec.decode_hand,
+                          codec.encode_hand(self.hands[2])[:-1])
+        # Six bits can hold codes past the end of the deck.
+        self.assertRaises(ValueError, codec.decode_hand, b"\x01\x3f")
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_codes(self):
+        codes = numpy.array([c.code for c in self.hands[0]])
+        self.assertEqual(codec.encode_hand(codes),
+                         codec.encode_hand(self.hands[0]))
+        self.assertEqual(codec.encode_mask(codes),
+                         codec.encode_mask(self.hands[0]))
+        self.assertRaises(ValueError, codec.encode_hand, numpy.array([52]))
+
+    def test_encode_mask(self):
+        hand = standard.make_deck()[10:16]
+        data = codec.encode_mask(hand)
+        self.assertEqual(len(data), codec.MASK_SIZE)
+        self.assertEqual(codec.decode_mask(data), (masks.mask_of(hand), 8))
+        self.assertEqual(codec.encode_mask(masks.MaskHand(hand)), data)
+
+    def test_streaming(self):
+        for kind, records in ((codec.HANDS, self.hands),
+                              (codec.DEALS, [self.hands[:3], (),
+                                             self.hands[3:]]),
+                              (codec.MASKS, self.hands)):
+            stream = io.BytesIO()
+            with codec.HandWriter(stream, kind) as writer:
+                writer.write_all(records)
+            self.assertEqual(writer.count, len(records))
+            stream.seek(0)
+            # A tiny chunk size makes records straddle reads.
+            reader = codec.HandReader(stream, chunk_size=3)
+            self.assertEqual(reader.kind, kind)
+            found = list(reader)
+            if kind == codec.MASKS:
+                self.assertEqual(found, [sum(masks.BITS[c] for c in hand)
+                                         for hand in records])
+            else:
+                self.assertEqual(found, [tuple(r) for r in records])
+
+    def test_hands(self):
+        stream = io.BytesIO()
+        hand = standard.StandardHand(standard.make_deck()[:5])
+        codec.HandWriter(stream).write(hand)
+        stream.seek(0)
+        self.assertEqual(list(codec.HandReader(stream).hands()), [hand])
+        stream = io.BytesIO()
+        codec.HandWriter(stream, codec.MASKS).write(hand)
+        stream.seek(0)
+        self.assertEqual(list(codec.HandReader(stream).hands()),
+                         [masks.MaskHand(hand)])
+
+    def test_bad_files(self):
+        self.assertRaises(ValueError, codec.HandReader, io.BytesIO(b"PCR"))
+        self.assertRaises(ValueError, codec.HandReader,
+                          io.BytesIO(b"NOPE\x01\x00\x00\x00"))
+        self.assertRaises(ValueError, codec.HandReader,
+                          io.BytesIO(b"PCRD\x09\x00\x00\x00"))
+        self.assertRaises(ValueError, codec.HandWriter, io.BytesIO(), 7)
+        stream = io.BytesIO()
+        codec.HandWriter(stream).write(self.hands[3])
+        truncated = io.BytesIO(stream.getvalue()[:-1])
+        self.assertRaises(ValueError, list, codec.HandReader(truncated))
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+
+import itertools
+import math
+import unittest
+
+from .. import combos, masks, standard
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestCombos(unittest.TestCase):
+    def test_rank_unrank(self):
+        for n, k in ((8, 3), (6, 6), (5, 0), (52, 2)):
+            for i, combo in enumerate(itertools.combinations(range(n), k)):
+                self.assertEqual(combos.rank(combo, n), i)
+                self.assertEqual(tuple(combos.unrank(i, n, k)), combo)
+        self.assertEqual(combos.rank(range(47, 52), 52),
+                         combos.count(52, 5) - 1)
+        self.assertEqual(combos.unrank(2598959, 52, 5), [47, 48, 49, 50, 51])
+        self.assertRaises(IndexError, combos.unrank, 2598960, 52, 5)
+
+    def test_combinations_range(self):
+        everything = list(itertools.combinations("abcdefg", 3))
+        self.assertEqual(list(combos.combinations("abcdefg", 3)), everything)
+        self.assertEqual(list(combos.combinations("abcdefg", 3, 10, 20)),
+                         everything[10:20])
+        self.assertEqual(list(combos.combinations("abcdefg", 3, 30)),
+                         everything[30:])
+        self.assertEqual(list(combos.combinations("abcdefg", 3, 5, 5)), [])
+
+    def test_split(self):
+        ranges = combos.split(20, 4, 7)
+        self.assertEqual(len(ranges), 7)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], math.comb(20, 4))
+        for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(stop, start)
+        resumed = []
+        for start, stop in ranges:
+            resumed.extend(combos.combinations(range(20), 4, start, stop))
+        self.assertEqual(resumed, list(itertools.combinations(range(20), 4)))
+        self.assertEqual(combos.split(3, 3, 4), [(0, 1)])
+
+    def test_hands(self):
+        dead = [standard.StandardCard(standard.ACE, standard.SPADE), 0]
+        left = combos.remaining(dead)
+        self.assertEqual(len(left), 50)
+        self.assertNotIn(dead[0].code, left)
+        self.assertNotIn(0, left)
+        self.assertEqual(sum(1 for _ in combos.hands(2, dead)),
+                         combos.count(50, 2))
+        self.assertEqual(next(combos.hands(2, dead, 1)), (left[0], left[2]))
+        self.assertRaises(ValueError, combos.remaining, [52])
+        self.assertRaises(ValueError, combos.remaining, [-1])
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_codes(self):
+        self.assertEqual(combos.remaining(numpy.arange(2, 52)), [0, 1])
+
+    def test_masks(self):
+        hand = masks.mask_of(standard.make_deck()[:6])
+        found = list(combos.masks(hand, 4))
+        self.assertEqual(len(found), 15)
+        self.assertEqual(len(set(found)), 15)
+        for mask in found:
+            self.assertEqual(masks.popcount(mask), 4)
+            self.assertEqual(mask & ~hand, 0)
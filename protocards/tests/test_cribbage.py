@@ -1,6 +1,9 @@
 #!/usr/bin/python
 
+import os
+import tempfile
 import unittest
+import random
 
 from .. import standard, cribbage
 
@@ -120,3 +123,187 @@ class TestCribbage(unittest.TestCase):
         for d in [True, False]:
             score = cribbage.score_hand(hand, turned=turned, dealer=d)
             self.assertEqual(score["nobs"], 1)
+
+    def test_score_matches_reference(self):
+        def reference(hand, turned, crib, dealer):
+            full = standard.StandardHand(hand + [turned])
+            score = {"fifteens": cribbage.score_fifteens(full),
+                     "pairs": cribbage.score_pairs(full),
+                     "runs": cribbage.score_runs(full),
+                     "flush": 0, "heels": 0, "nobs": 0}
+            if len(hand.by_suit(hand[0].suit)) == len(hand):
+                if hand[0].suit == turned.suit:
+                    score["flush"] = 5
+                elif not crib:
+                    score["flush"] = 4
+            if not crib and dealer and turned.rank == standard.JACK:
+                score["heels"] = 2
+            elif any(c.rank == standard.JACK and c.suit == turned.suit
+                     for c in hand):
+                score["nobs"] = 1
+            return score
+
+        rng = random.Random(0)
+        for _ in range(3000):
+            rng.shuffle(self.deck)
+            hand = self.deck[:4]
+            turned = self.deck[4]
+            crib = rng.random() < 0.5
+            dealer = rng.random() < 0.5
+            self.assertEqual(
+                cribbage.score_hand(hand, turned, crib=crib, dealer=dealer),
+                reference(hand, turned, crib, dealer))
+
+    def test_score_ranks(self):
+        hand = self.deck.by_rank(standard.FIVE)
+        hand.append(self.deck.by_rank(standard.JACK)[0])
+        self.assertEqual(cribbage.score_ranks(hand), (16, 12, 0))
+        self.assertEqual(cribbage.score_ranks(hand + hand[:1]), (30, 20, 0))
+        self.assertEqual(cribbage.rank_key(hand),
+                         cribbage.rank_key(reversed(hand)))
+
+    def test_rank_table_file(self):
+        # The shipped table must match the one the scoring rules give.
+        computed = cribbage._build_rank_table()
+        self.assertEqual(cribbage._load_rank_table(), computed)
+        self.assertEqual(cribbage.rank_table(), computed)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "table.bin")
+            self.assertIsNone(cribbage._load_rank_table(path))
+            cribbage.save_rank_table(path)
+            self.assertEqual(cribbage._load_rank_table(path), computed)
+            with open(path, "wb") as stream:
+                stream.write(b"not a table")
+            self.assertIsNone(cribbage._load_rank_table(path))
+
+    def test_card_values(self):
+        for card in self.deck:
+            self.assertEqual(cribbage.CARD_VALUES[card.code],
+                             cribbage.VALUES[card.rank.ordinal])
+
+    def test_best_discard(self):
+        six = standard.StandardHand(self.deck[10:13] + self.deck[20:23])
+        results = cribbage.best_discard(six, dealer=True)
+        self.assertEqual(len(results), 15)
+        self.assertEqual(sorted(r.expected for r in results)[::-1],
+                         [r.expected for r in results])
+        for result in results:
+            self.assertEqual(sorted(result.keep + result.discard), sorted(six))
+            self.assertEqual(sum(result.distribution.values()), 46)
+            self.assertIsNone(result.crib)
+        best = results[0]
+        scores = [sum(cribbage.score_hand(best.keep, t, dealer=True).values())
+                  for t in self.deck if t not in six]
+        self.assertAlmostEqual(best.expected, sum(scores) / 46.0)
+
+    def test_best_discard_suit_swap(self):
+        six = self.deck[0:3] + self.deck[13:16]
+        swapped = self.deck[26:29] + self.deck[39:42]
+        expected = [r.expected for r in cribbage.best_discard(six)]
+        self.assertEqual([r.expected for r in cribbage.best_discard(swapped)],
+                         expected)
+
+    def test_best_discard_crib(self):
+        six = self.deck[0:6]
+        first = cribbage.best_discard(six, crib_samples=50,
+                                      rng=random.Random(0))
+        second = cribbage.best_discard(six, crib_samples=50,
+                                       rng=random.Random(0))
+        self.assertEqual(first, second)
+        self.assertTrue(all(r.crib is not None for r in first))
+
+    def test_best_discard_bad_cards(self):
+        self.assertRaises(ValueError, cribbage.best_discard, self.deck[:5])
+        self.assertRaises(ValueError, cribbage.best_discard,
+                          self.deck[:5] + self.deck[:1])
+
+    def test_score_codes(self):
+        rng = random.Random(1)
+        for _ in range(1000):
+            rng.shuffle(self.deck)
+            hand = self.deck[:4]
+            codes = [c.code for c in hand]
+            turned = self.deck[4]
+            crib = rng.random() < 0.5
+            dealer = rng.random() < 0.5
+            self.assertEqual(
+                cribbage.score_codes(codes, turned.code, crib, dealer),
+                sum(cribbage.score_hand(hand, turned, crib, dealer).values()))
+            self.assertEqual(cribbage.score_codes(codes),
+                             sum(cribbage.score_hand(hand).values()))
+        codes = [c.code for c in self.spades]
+        self.assertEqual(cribbage.score_codes(codes),
+                         sum(self.sscore.values()))
+
+
+class TestPegging(unittest.TestCase):
+    def setUp(self):
+        self.cards = {c.short: c for c in standard.make_deck()}
+
+    def play(self, shorts):
+        pegging = cribbage.Pegging()
+        points = [pegging.play(self.cards[s]) for s in shorts.split()]
+        return points, pegging
+
+    def test_fifteen_and_pairs(self):
+        self.assertEqual(self.play("7h 8d")[0], [0, 2])
+        self.assertEqual(self.play("7h 7d 7s")[0], [0, 2, 6])
+        self.assertEqual(self.play("2h 2d 2s 2c")[0], [0, 2, 6, 12])
+        self.assertEqual(self.play("5h 5d 5s")[0], [0, 2, 8])
+
+    def test_runs(self):
+        self.assertEqual(self.play("3h 2d Ah")[0], [0, 0, 3])
+        self.assertEqual(self.play("4h 2d 3s 5c")[0], [0, 0, 3, 4])
+        self.assertEqual(self.play("4h 2d 3s 3c")[0], [0, 0, 3, 2])
+        self.assertEqual(self.play("Kh Ad 2s")[0], [0, 0, 0])
+        self.assertEqual(self.play("2h 3d 2s 4c")[0], [0, 0, 0, 3])
+
+    def test_thirty_one(self):
+        points, pegging = self.play("Th Kd Ah Ac")
+        self.assertEqual(points, [0, 0, 0, 2])
+        self.assertEqual(pegging.count, 22)
+        self.assertFalse(pegging.can_play(self.cards["Js"]))
+        self.assertRaises(ValueError, pegging.play, self.cards["Js"])
+        self.assertEqual(pegging.peek(self.cards["9s"]), 2)
+        self.assertEqual(pegging.count, 22)
+        self.assertEqual(pegging.play(self.cards["9s"], player="b"), 2)
+        self.assertEqual(pegging.count, 0)
+        self.assertEqual(pegging.last_player, "b")
+        self.assertEqual(pegging.go(), 0)
+
+    def test_go(self):
+        points, pegging = self.play("Th Kd 9s")
+        self.assertEqual(pegging.go(), 1)
+        self.assertEqual(pegging.count, 0)
+        self.assertEqual(pegging.pile, [])
+
+    def test_matches_rescan(self):
+        def rescan(pile, count):
+            ranks = [cribbage.RANKS.index(c.rank) for c in pile]
+            points = 2 if count in (15, 31) else 0
+            same = 1
+            while same < len(ranks) and ranks[-1 - same] == ranks[-1]:
+                same += 1
+            points += same * (same - 1)
+            for length in range(len(ranks), 2, -1):
+                window = ranks[-length:]
+                if len(set(window)) == length and \
+                        max(window) - min(window) == length - 1:
+                    return points + length
+            return points
+
+        rng = random.Random(0)
+        deck = standard.make_deck()
+        for _ in range(300):
+            rng.shuffle(deck)
+            pegging = cribbage.Pegging()
+            pile = []
+            for card in deck:
+                if not pegging.can_play(card):
+                    pegging.go()
+                    pile = []
+                pile.append(card)
+                count = pegging.count + cribbage.value(card)
+                self.assertEqual(pegging.play(card), rescan(pile, count))
+                if count == 31:
+                    pile = []
@@ -0,0 +1,38 @@
+#!/usr/bin/python
+
+import unittest
+import random
+
+from .. import dealing, standard
+
+
+class TestDealing(unittest.TestCase):
+    def test_deal_codes(self):
+        codes = dealing.deal_codes(13, random.Random(0))
+        self.assertEqual(len(codes), 13)
+        self.assertEqual(len(set(codes)), 13)
+        self.assertTrue(all(0 <= c < 52 for c in codes))
+        self.assertEqual(codes, dealing.deal_codes(13, random.Random(0)))
+        self.assertEqual(sorted(dealing.deal_codes(52)), list(range(52)))
+        self.assertRaises(IndexError, dealing.deal_codes, 53)
+
+    def test_deal_cards(self):
+        hand = dealing.deal_cards(5, random.Random(0))
+        self.assertIsInstance(hand, standard.StandardHand)
+        self.assertEqual([c.code for c in hand],
+                         dealing.deal_codes(5, random.Random(0)))
+
+    def test_deal_stream(self):
+        deals = list(dealing.deal_stream(100, 5, random.Random(0)))
+        self.assertEqual(len(deals), 100)
+        self.assertTrue(all(len(set(d)) == 5 for d in deals))
+        self.assertGreater(len(set(deals)), 95)
+        self.assertEqual(deals,
+                         list(dealing.deal_stream(100, 5, random.Random(0))))
+
+    def test_spawn_rngs(self):
+        first = [r.random() for r in dealing.spawn_rngs(7, 3)]
+        second = [r.random() for r in dealing.spawn_rngs(7, 3)]
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 3)
+        self.assertEqual(dealing.stream_rng(7, 2).random(), first[2])
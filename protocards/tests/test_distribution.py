@@ -0,0 +1,72 @@
+#!/usr/bin/python
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import standard, cribbage, distribution
+
+
+class TestDistribution(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_chunks(self):
+        chunks = distribution.chunks()
+        self.assertEqual(len(chunks), 52 * 51 // 2)
+        self.assertEqual(len(set(chunks)), len(chunks))
+
+    def test_score_chunk(self):
+        chunk, histograms = distribution.score_chunk((37, 40))
+        self.assertEqual(chunk, (37, 40))
+        expected = distribution.empty_histograms()
+        cards = [standard.StandardCard.from_code(c) for c in range(52)]
+        for third in range(41, 52):
+            for fourth in range(third + 1, 52):
+                hand = [cards[37], cards[40], cards[third], cards[fourth]]
+                for turned in cards:
+                    if turned in hand:
+                        continue
+                    for variant, kwargs in [
+                            ("hand", {}), ("dealer", {"dealer": True}),
+                            ("crib", {"crib": True, "dealer": True})]:
+                        score = cribbage.score_hand(hand, turned, **kwargs)
+                        expected[variant][sum(score.values())] += 1
+        self.assertEqual(histograms, expected)
+
+    def test_checkpoint_resume(self):
+        path = os.path.join(self.tempdir, "checkpoint.json")
+        chunks = distribution.chunks()
+        with open(path, "w") as f:
+            json.dump({"done": chunks[:-20],
+                       "histograms": distribution.empty_histograms()}, f)
+        progress = []
+        histograms = distribution.compute(
+            workers=1, checkpoint=path, checkpoint_every=5,
+            progress=lambda done, total: progress.append((done, total)))
+        expected = distribution.empty_histograms()
+        for chunk in chunks[-20:]:
+            distribution.merge(expected, distribution.score_chunk(chunk)[1])
+        self.assertEqual(histograms, expected)
+        self.assertEqual(progress[-1], (len(chunks), len(chunks)))
+        with open(path) as f:
+            saved = json.load(f)
+        self.assertEqual(len(saved["done"]), len(chunks))
+        self.assertEqual(saved["histograms"], expected)
+
+    def test_parallel(self):
+        path = os.path.join(self.tempdir, "checkpoint.json")
+        chunks = distribution.chunks()
+        with open(path, "w") as f:
+            json.dump({"done": chunks[10:],
+                       "histograms": distribution.empty_histograms()}, f)
+        parallel = distribution.compute(workers=2, checkpoint=path)
+        expected = distribution.empty_histograms()
+        for chunk in chunks[:10]:
+            distribution.merge(expected, distribution.score_chunk(chunk)[1])
+        self.assertEqual(parallel, expected)
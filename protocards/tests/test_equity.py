@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+import unittest
+
+from .. import standard, equity, poker
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestEquity(unittest.TestCase):
+    def setUp(self):
+        self.cards = {c.short: c for c in standard.make_deck()}
+
+    def hand(self, shorts):
+        return [self.cards[s] for s in shorts.split()]
+
+    def test_river(self):
+        result = equity.equity([self.hand("As Ad"), self.hand("Ks Kd")],
+                               board=self.hand("2h 7c 9d Jh Qc"))
+        self.assertEqual(result.win, [1.0, 0.0])
+        self.assertEqual(result.trials, 1)
+        self.assertTrue(result.exhaustive)
+
+    def test_split(self):
+        result = equity.equity([self.hand("2s 3d"), self.hand("2h 3c")],
+                               board=self.hand("Ah Kc Qd Js Tc"))
+        self.assertEqual(result.tie, [1.0, 1.0])
+        self.assertEqual(result.equity, [0.5, 0.5])
+
+    def test_exhaustive(self):
+        holes = [self.hand("As Ad"), self.hand("Ks Kd")]
+        board = self.hand("2h 7c 9d")
+        result = equity.equity(holes, board=board)
+        self.assertTrue(result.exhaustive)
+        self.assertEqual(result.trials, 45 * 44 // 2)
+        wins = 0
+        remaining = [c for c in self.cards.values()
+                     if c not in holes[0] + holes[1] + board]
+        for i, turn in enumerate(remaining):
+            for river in remaining[i + 1:]:
+                full = board + [turn, river]
+                wins += (poker.evaluate(holes[0] + full) >
+                         poker.evaluate(holes[1] + full))
+        self.assertAlmostEqual(result.win[0], wins / 990.0)
+        self.assertEqual(result.margin, [0.0, 0.0])
+
+    def test_dead_cards(self):
+        holes = [self.hand("As Ad"), self.hand("Ks Kd")]
+        board = self.hand("2h 7c 9d")
+        live = equity.equity(holes, board=board)
+        dead = equity.equity(holes, board=board, dead=self.hand("Kh Kc"))
+        self.assertEqual(dead.trials, 43 * 42 // 2)
+        self.assertGreater(dead.win[0], live.win[0])
+
+    def test_sampled(self):
+        holes = [self.hand("As Ad"), self.hand("Ks Kd")]
+        result = equity.equity(holes, tolerance=0.01, batch=500)
+        self.assertFalse(result.exhaustive)
+        self.assertTrue(all(m <= 0.01 for m in result.margin))
+        self.assertAlmostEqual(result.equity[0], 0.82, delta=0.03)
+        parallel = equity.equity(holes, tolerance=0.01, batch=500,
+                                 workers=2)
+        self.assertEqual(result, parallel)
+        capped = equity.equity(holes, tolerance=0.0, max_trials=1000,
+                               batch=500)
+        self.assertEqual(capped.trials, 1000)
+
+    def test_codes(self):
+        holes = [self.hand("As Ad"), self.hand("Ks Kd")]
+        board = self.hand("2h 7c 9d Jh")
+        self.assertEqual(
+            equity.equity(holes, board),
+            equity.equity([[c.code for c in h] for h in holes],
+                          [c.code for c in board]))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_codes(self):
+        holes = [self.hand("As Ad"), self.hand("Ks Kd")]
+        board = self.hand("2h 7c 9d Jh")
+        self.assertEqual(
+            equity.equity(holes, board),
+            equity.equity([numpy.array([c.code for c in h]) for h in holes],
+                          numpy.array([c.code for c in board])))
+
+    def test_bad_input(self):
+        self.assertRaises(ValueError, equity.equity, [self.hand("As Ad")])
+        self.assertRaises(ValueError, equity.equity,
+                          [self.hand("As Ad"), self.hand("As Kd")])
+        self.assertRaises(ValueError, equity.equity,
+                          [self.hand("As Ad Ah"), self.hand("Ks Kd")])
+        self.assertRaises(ValueError, equity.equity, [[0, 1], [2, 60]])
+        self.assertRaises(ValueError, equity.equity, [[0, 1], [2, -1]])
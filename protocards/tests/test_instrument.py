@@ -0,0 +1,87 @@
+#!/usr/bin/python
+
+import os
+import subprocess
+import sys
+import unittest
+
+from .. import base, cribbage, instrument, poker, standard
+
+
+class TestInstrument(unittest.TestCase):
+    def tearDown(self):
+        instrument.disable()
+        instrument.reset()
+
+    def test_off_by_default(self):
+        self.assertFalse(instrument.is_enabled())
+        self.assertFalse(hasattr(cribbage.score_hand, "__wrapped__"))
+        self.assertFalse(hasattr(base.Hand.deal, "__wrapped__"))
+
+    def test_instrumented(self):
+        original = cribbage.score_hand
+        with instrument.instrumented(clear=True):
+            self.assertTrue(instrument.is_enabled())
+            self.assertIs(cribbage.score_hand.__wrapped__, original)
+            deck = standard.make_deck()
+            hand = deck.deal(4)
+            cribbage.score_hand(hand, deck.deal(1)[0])
+            cribbage.score_hand(hand)
+        self.assertIs(cribbage.score_hand, original)
+        stats = instrument.stats()
+        self.assertEqual(stats["standard.make_deck"]["calls"], 1)
+        self.assertEqual(stats["base.Hand.deal"]["calls"], 2)
+        self.assertEqual(stats["cribbage.score_hand"]["calls"], 2)
+        self.assertEqual(stats["cribbage.score_ranks"]["calls"], 2)
+        self.assertEqual(stats["cribbage.check_flush"]["calls"], 2)
+        self.assertGreaterEqual(stats["cribbage.score_hand"]["seconds"],
+                                stats["cribbage.score_ranks"]["seconds"])
+        self.assertNotIn("cribbage.score_fifteens", stats)
+
+        # Counters survive disabling, until reset.
+        cribbage.score_hand(hand)
+        self.assertEqual(instrument.stats()["cribbage.score_hand"]["calls"], 2)
+        instrument.reset()
+        self.assertEqual(instrument.stats(), {})
+
+    def test_nested(self):
+        instrument.enable()
+        with instrument.instrumented():
+            pass
+        self.assertTrue(instrument.is_enabled())
+        instrument.enable()
+        instrument.disable()
+        self.assertFalse(hasattr(cribbage.score_hand, "__wrapped__"))
+
+    def test_register(self):
+        original = poker.evaluate
+        try:
+            instrument.register(poker, "evaluate")
+            with instrument.instrumented():
+                poker.evaluate(standard.make_deck()[:5])
+            self.assertIs(poker.evaluate, original)
+            self.assertEqual(instrument.stats()["poker.evaluate"]["calls"], 1)
+        finally:
+            instrument._targets.pop()
+
+    def test_prometheus(self):
+        with instrument.instrumented():
+            standard.make_deck()
+        text = instrument.prometheus()
+        self.assertIn("# TYPE protocards_calls_total counter\n", text)
+        label = '{function="standard.make_deck"}'
+        self.assertIn("protocards_calls_total" + label + " 1\n", text)
+        self.assertIn("protocards_seconds_total" + label + " ", text)
+
+    def test_environment(self):
+        code = ("import protocards; from protocards import instrument; "
+                "print(instrument.is_enabled())")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__))))
+        for value, expected in (("1", "True"), ("0", "False")):
+            # Also checks that protocards/__init__.py reads ENV_VAR.
+            env = dict(os.environ)
+            env[instrument.ENV_VAR] = value
+            out = subprocess.check_output([sys.executable, "-c", code],
+                                          env=env, cwd=root)
+            self.assertEqual(out.decode().strip(), expected)
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+import unittest
+import random
+
+from .. import base, standard, masks, cribbage
+
+
+class TestMaskHand(unittest.TestCase):
+    def setUp(self):
+        self.deck = standard.make_deck()
+        self.full = masks.MaskHand(self.deck)
+
+    def test_full_deck(self):
+        self.assertEqual(self.full.mask, masks.FULL_MASK)
+        self.assertEqual(len(self.full), 52)
+        self.assertEqual(list(self.full), list(self.deck))
+        self.assertEqual(str(self.full), str(self.deck))
+        self.assertEqual(self.full.to_hand(), self.deck)
+
+    def test_from_mask(self):
+        hand = masks.MaskHand.from_mask(0b101)
+        self.assertEqual(list(hand), self.deck[0:3:2])
+        self.assertRaises(ValueError, masks.MaskHand.from_mask, 1 << 52)
+
+    def test_roundtrip(self):
+        random.seed(0)
+        self.deck.shuffle()
+        hand = self.deck.deal(7)
+        mhand = masks.MaskHand(hand)
+        self.assertEqual(sorted(mhand.to_hand()), sorted(hand))
+        self.assertEqual(masks.MaskHand(mhand.to_hand()), mhand)
+        self.assertEqual(hash(masks.MaskHand(hand)), hash(mhand))
+
+    def test_membership(self):
+        spades = self.full.by_suit(standard.SPADE)
+        ace = standard.StandardCard(standard.ACE, standard.SPADE)
+        self.assertIn(ace, spades)
+        self.assertNotIn(ace, spades - masks.MaskHand([ace]))
+        self.assertNotIn("As", spades)
+        # Cards of other types aren't held, whatever their codes.
+        Big = base.make_card_type("Big", [("n", range(60))])
+        self.assertNotIn(Big(55), self.full)
+        self.assertNotIn(Big(ace.code), self.full)
+
+    def test_set_operations(self):
+        spades = self.full.by_suit(standard.SPADE)
+        aces = self.full.by_rank(standard.ACE)
+        self.assertEqual(len(spades | aces), 16)
+        self.assertEqual(list(spades & aces),
+                         [standard.StandardCard(standard.ACE, standard.SPADE)])
+        self.assertEqual(len(spades - aces), 12)
+        self.assertEqual(len(spades ^ aces), 15)
+        self.assertFalse(spades - spades)
+        with self.assertRaises(TypeError):
+            spades | standard.StandardHand(aces)
+        with self.assertRaises(TypeError):
+            spades & 1
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.full.mask = 0
+        with self.assertRaises(AttributeError):
+            del self.full.mask
+        self.assertEqual(self.full.mask, masks.FULL_MASK)
+
+    def test_counts(self):
+        self.assertEqual(self.full.count_suit(standard.HEART), 13)
+        self.assertEqual(self.full.count_rank(standard.TEN), 4)
+        self.assertEqual(self.full.suit_counts(), [13] * 4)
+        self.assertEqual(self.full.rank_counts(), [4] * 13)
+        spades = self.full.by_suit(standard.SPADE)
+        self.assertEqual(spades.suit_lane(standard.SPADE), masks.LANE_MASK)
+        self.assertEqual(spades.suit_lane(standard.CLUB), 0)
+
+    def test_cribbage(self):
+        random.seed(1)
+        for _ in range(20):
+            self.deck.shuffle()
+            hand = self.deck[:5]
+            mhand = masks.MaskHand(hand)
+            self.assertEqual(cribbage.score_runs(mhand),
+                             cribbage.score_runs(hand))
+            self.assertEqual(cribbage.score_pairs(mhand),
+                             cribbage.score_pairs(hand))
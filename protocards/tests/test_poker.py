@@ -0,0 +1,91 @@
+#!/usr/bin/python
+
+import itertools
+import unittest
+import random
+
+from .. import standard, poker
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestPoker(unittest.TestCase):
+    def setUp(self):
+        self.cards = {c.short: c for c in standard.make_deck()}
+
+    def hand(self, shorts):
+        return standard.StandardHand([self.cards[s] for s in shorts.split()])
+
+    def test_categories(self):
+        examples = [
+            ("high card", "As Kd 9h 7c 2s"),
+            ("pair", "As Ad 9h 7c 2s"),
+            ("two pair", "As Ad 9h 9c 2s"),
+            ("three of a kind", "As Ad Ah 7c 2s"),
+            ("straight", "5s 4d 3h 2c As"),
+            ("flush", "As Ks 9s 7s 2s"),
+            ("full house", "As Ad Ah 2c 2s"),
+            ("four of a kind", "As Ad Ah Ac 2s"),
+            ("straight flush", "As Ks Qs Js Ts"),
+        ]
+        strengths = []
+        for name, shorts in examples:
+            strength = poker.evaluate(self.hand(shorts))
+            self.assertEqual(poker.category(strength), name)
+            strengths.append(strength)
+        self.assertEqual(strengths, sorted(strengths))
+
+    def test_comparisons(self):
+        for better, worse in [
+                ("6s 5d 4h 3c 2s", "5s 4d 3h 2c As"),
+                ("As Ad Kh Qc Js", "As Ad Kh Qc Ts"),
+                ("Ks Kd Qh Qc 2s", "Ks Kd Jh Jc As"),
+                ("2s 2d 2h 3c 3s", "As Ad Kh Kc Qs"),
+                ("Ah Kh Qh Jh 9h", "Ks Qs Js Ts 8s")]:
+            self.assertGreater(poker.evaluate(self.hand(better)),
+                               poker.evaluate(self.hand(worse)))
+        self.assertEqual(poker.evaluate(self.hand("As Kd 9h 7c 2s")),
+                         poker.evaluate(self.hand("Ad Kh 9c 7s 2d")))
+
+    def test_best_of_seven(self):
+        rng = random.Random(0)
+        deck = standard.make_deck()
+        for _ in range(300):
+            rng.shuffle(deck)
+            for size in (6, 7):
+                cards = deck[:size]
+                best = max(poker.evaluate(five)
+                           for five in itertools.combinations(cards, 5))
+                self.assertEqual(poker.evaluate(cards), best)
+                self.assertEqual(poker.evaluate([c.code for c in cards]),
+                                 best)
+
+    def test_distinct_strengths(self):
+        ranks = set()
+        for combo in itertools.combinations(range(13), 5):
+            codes = [r * 4 + i % 2 for i, r in enumerate(combo)]
+            ranks.add(poker.evaluate(codes))
+        self.assertEqual(len(ranks), 1287)
+
+    def test_evaluate_many(self):
+        hands = [self.hand("As Ad 9h 7c 2s"), self.hand("As Ks Qs Js Ts")]
+        self.assertEqual(poker.evaluate_many(hands),
+                         [poker.evaluate(h) for h in hands])
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_numpy_codes(self):
+        hand = self.hand("As Ks Qs Js Ts 2d 3c")
+        codes = numpy.array([card.code for card in hand])
+        self.assertEqual(poker.evaluate(codes), poker.evaluate(hand))
+        self.assertEqual(poker.evaluate(list(codes)), poker.evaluate(hand))
+
+    def test_bad_size(self):
+        self.assertRaises(ValueError, poker.evaluate, self.hand("As Ad 9h"))
+        self.assertRaises(ValueError, poker.evaluate, list(range(8)))
+
+    def test_bad_code(self):
+        self.assertRaises(ValueError, poker.evaluate, [0, 1, 2, 3, 60])
+        self.assertRaises(ValueError, poker.evaluate, [-1, 1, 2, 3, 4])
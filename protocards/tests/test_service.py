@@ -0,0 +1,205 @@
+#!/usr/bin/python
+
+import asyncio
+import concurrent.futures
+import random
+import threading
+import unittest
+
+from .. import cribbage, service, standard
+
+
+def _requests(count, seed=0):
+    rng = random.Random(seed)
+    deck = list(standard.make_deck())
+    requests = []
+    for _ in range(count):
+        cards = rng.sample(deck, 5)
+        requests.append((standard.StandardHand(cards[:4]), cards[4],
+                         rng.random() < 0.5, rng.random() < 0.5))
+    return requests
+
+
+class TestBatchScorer(unittest.TestCase):
+    def test_scores_match(self):
+        requests = _requests(200)
+
+        async def run():
+            async with service.BatchScorer(
+                    max_batch=64, executor=service.InlineExecutor()) as scorer:
+                results = await asyncio.gather(
+                    *[scorer.score_hand(*r) for r in requests])
+            return results, scorer.metrics()
+
+        results, metrics = asyncio.run(run())
+        self.assertEqual(results, [cribbage.score_hand(*r) for r in requests])
+        self.assertEqual(metrics["requests"], 200)
+        self.assertLessEqual(metrics["largest_batch"], 64)
+        self.assertGreaterEqual(metrics["batches"], 4)
+        self.assertLess(metrics["batches"], 200)
+        self.assertEqual(metrics["errors"], 0)
+        self.assertEqual(metrics["pending"], 0)
+
+    def test_thread_pool(self):
+        requests = _requests(50, seed=1)
+
+        async def run():
+            async with service.BatchScorer() as scorer:
+                return await asyncio.gather(
+                    *[scorer.score_hand(*r) for r in requests])
+
+        self.assertEqual(asyncio.run(run()),
+                         [cribbage.score_hand(*r) for r in requests])
+
+    def test_delay(self):
+        # A lone request is scored once the delay runs out.
+        async def run():
+            scorer = service.BatchScorer(max_delay=0.01,
+                                         executor=service.InlineExecutor())
+            hand = standard.make_deck()[:4]
+            result = await scorer.score_hand(hand)
+            await scorer.close()
+            return result, scorer.metrics()
+
+        result, metrics = asyncio.run(run())
+        self.assertEqual(result,
+                         cribbage.score_hand(standard.make_deck()[:4]))
+        self.assertEqual(metrics["batches"], 1)
+        self.assertGreater(metrics["mean_latency"], 0.0)
+
+    def test_backpressure(self):
+        seen = []
+
+        def work(batch):
+            seen.append(len(batch))
+            return [n * 2 for n in batch]
+
+        async def run():
+            scorer = service.BatchScorer(max_batch=5, max_pending=3,
+                                         executor=service.InlineExecutor(),
+                                         work=work)
+            results = await asyncio.gather(
+                *[scorer.submit(n) for n in range(30)])
+            await scorer.close()
+            return results, scorer.metrics()
+
+        results, metrics = asyncio.run(run())
+        self.assertEqual(results, [n * 2 for n in range(30)])
+        self.assertLessEqual(metrics["deepest_queue"], 3)
+        self.assertTrue(all(size <= 5 for size in seen))
+        self.assertEqual(sum(seen), 30)
+
+    def test_errors(self):
+        def work(batch):
+            raise KeyError("broken")
+
+        async def run():
+            async with service.BatchScorer(
+                    executor=service.InlineExecutor(), work=work) as scorer:
+                outcomes = await asyncio.gather(
+                    scorer.submit(1), scorer.submit(2),
+                    return_exceptions=True)
+            return outcomes, scorer
+
+        outcomes, scorer = asyncio.run(run())
+        self.assertTrue(all(isinstance(o, KeyError) for o in outcomes))
+        self.assertEqual(scorer.metrics()["errors"], 1)
+
+        async def submit_closed():
+            await scorer.submit(3)
+
+        self.assertRaises(RuntimeError, asyncio.run, submit_closed())
+
+    def test_bad_work(self):
+        async def run():
+            async with service.BatchScorer(
+                    executor=service.InlineExecutor(),
+                    work=lambda batch: []) as scorer:
+                await scorer.submit(1)
+
+        self.assertRaises(ValueError, asyncio.run, run())
+
+    def test_close_while_waiting(self):
+        # The first request holds up the only worker, the second fills
+        # the queue, and the third has to wait for room when the scorer
+        # is closed.
+        release = threading.Event()
+
+        def work(batch):
+            release.wait(5)
+            return batch
+
+        async def run():
+            executor = concurrent.futures.ThreadPoolExecutor(1)
+            scorer = service.BatchScorer(max_batch=1, max_pending=1,
+                                         executor=executor, work=work)
+            first = asyncio.ensure_future(scorer.submit(1))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(scorer.submit(2))
+            third = asyncio.ensure_future(scorer.submit(3))
+            await asyncio.sleep(0.01)
+            self.assertFalse(third.done())
+            closing = asyncio.ensure_future(scorer.close())
+            await asyncio.sleep(0.01)
+            release.set()
+            outcomes = await asyncio.wait_for(asyncio.gather(
+                first, second, third, return_exceptions=True), 5)
+            await asyncio.wait_for(closing, 5)
+            # Closing twice is harmless.
+            await asyncio.wait_for(scorer.close(), 5)
+            executor.shutdown()
+            return outcomes
+
+        first, second, third = asyncio.run(run())
+        self.assertEqual((first, second), (1, 2))
+        self.assertIsInstance(third, RuntimeError)
+
+    def test_cancelled(self):
+        # Cancelling the collector mid-batch cancels that batch's
+        # requests and fails the ones still queued.
+        release = threading.Event()
+
+        def work(batch):
+            release.wait(5)
+            return batch
+
+        async def run():
+            executor = concurrent.futures.ThreadPoolExecutor(1)
+            scorer = service.BatchScorer(max_batch=1, executor=executor,
+                                         work=work)
+            first = asyncio.ensure_future(scorer.submit(1))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(scorer.submit(2))
+            await asyncio.sleep(0.01)
+            scorer._task.cancel()
+            outcomes = await asyncio.wait_for(asyncio.gather(
+                first, second, return_exceptions=True), 5)
+            release.set()
+            executor.shutdown()
+            return outcomes
+
+        first, second = asyncio.run(run())
+        self.assertIsInstance(first, asyncio.CancelledError)
+        self.assertIsInstance(second, RuntimeError)
+
+    def test_score_hand_async(self):
+        requests = _requests(20, seed=2)
+
+        async def run():
+            alone = await asyncio.gather(
+                *[service.score_hand_async(*r) for r in requests])
+            async with service.BatchScorer(
+                    executor=service.InlineExecutor()) as scorer:
+                batched = await asyncio.gather(
+                    *[service.score_hand_async(*r, scorer=scorer)
+                      for r in requests])
+            return alone, batched, scorer.metrics()
+
+        alone, batched, metrics = asyncio.run(run())
+        expected = [cribbage.score_hand(*r) for r in requests]
+        self.assertEqual(alone, expected)
+        self.assertEqual(batched, expected)
+        self.assertEqual(metrics["requests"], 20)
+
+    def test_bad_args(self):
+        self.assertRaises(ValueError, service.BatchScorer, max_batch=0)
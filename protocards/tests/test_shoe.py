@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+import collections
+import random
+import unittest
+
+from .. import shoe, standard
+
+
+class TestShoe(unittest.TestCase):
+    def test_counts(self):
+        six = shoe.Shoe(rng=random.Random(0))
+        self.assertEqual(len(six), 312)
+        self.assertEqual(six.cut, 234)
+        ace = standard.StandardCard(standard.ACE, standard.SPADE)
+        self.assertEqual(six.count(ace), 6)
+        self.assertEqual(six.count_rank(standard.ACE), 24)
+        self.assertEqual(six.count_suit(standard.HEART), 78)
+        drawn = six.draw_codes(100)
+        self.assertEqual(len(six), 212)
+        self.assertEqual(six.dealt, 100)
+        by_code = collections.Counter(drawn)
+        self.assertEqual(six.card_counts(),
+                         [6 - by_code[c] for c in range(52)])
+        self.assertEqual(six.rank_counts(),
+                         [24 - sum(1 for c in drawn if c >> 2 == r)
+                          for r in range(13)])
+        self.assertEqual(six.suit_counts(),
+                         [78 - sum(1 for c in drawn if c & 3 == s)
+                          for s in range(4)])
+
+    def test_draw_everything(self):
+        two = shoe.Shoe(2, rng=random.Random(1))
+        cards = [two.draw() for _ in range(104)]
+        self.assertTrue(all(isinstance(c, standard.StandardCard)
+                            for c in cards))
+        self.assertEqual(collections.Counter(cards),
+                         collections.Counter(list(standard.make_deck()) * 2))
+        self.assertRaises(IndexError, two.draw_code)
+        self.assertEqual(two.rank_counts(), [0] * 13)
+
+    def test_deal(self):
+        one = shoe.Shoe(1, rng=random.Random(2))
+        hand = one.deal(5)
+        self.assertIsInstance(hand, standard.StandardHand)
+        self.assertEqual(len(set(hand)), 5)
+        self.assertRaises(IndexError, one.deal, 48)
+        self.assertEqual(len(one), 47)
+        one.burn(3)
+        self.assertEqual(len(one), 44)
+
+    def test_cut_and_reset(self):
+        eight = shoe.Shoe(8, penetration=0.5, rng=random.Random(3))
+        self.assertEqual(eight.cut, 208)
+        eight.burn(207)
+        self.assertFalse(eight.past_cut)
+        eight.draw_code()
+        self.assertTrue(eight.past_cut)
+        eight.reset()
+        self.assertFalse(eight.past_cut)
+        self.assertEqual(len(eight), 416)
+        self.assertEqual(eight.rank_counts(), [32] * 13)
+        first = shoe.Shoe(1, rng=random.Random(4))
+        second = shoe.Shoe(1, rng=random.Random(4))
+        self.assertEqual(first.draw_codes(52), second.draw_codes(52))
+
+    def test_weighted(self):
+        # Cards with two copies left should come up twice as often, per
+        # card, as cards with one copy left; none with no copies.
+        two = shoe.Shoe(2, rng=random.Random(5))
+        drawn_twos = 0
+        expected_twos = 0.0
+        for _ in range(3000):
+            two.reset()
+            two.burn(52)
+            before = two.card_counts()
+            expected_twos += 2.0 * before.count(2) / len(two)
+            code = two.draw_code()
+            self.assertGreater(before[code], 0)
+            drawn_twos += before[code] == 2
+        self.assertAlmostEqual(drawn_twos / expected_twos, 1.0, delta=0.1)
+
+    def test_bad_args(self):
+        self.assertRaises(ValueError, shoe.Shoe, 0)
+        self.assertRaises(ValueError, shoe.Shoe, 6, 1.5)
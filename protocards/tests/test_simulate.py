@@ -0,0 +1,54 @@
+#!/usr/bin/python
+
+import unittest
+import random
+
+from .. import simulate
+
+
+class TestSimulate(unittest.TestCase):
+    def test_play_game(self):
+        strategies = (simulate.RandomStrategy(), simulate.GreedyStrategy())
+        rng = random.Random(0)
+        for _ in range(5):
+            winner, scores = simulate.play_game(strategies, rng)
+            self.assertGreaterEqual(scores[winner], simulate.TARGET)
+            self.assertLess(scores[1 - winner], simulate.TARGET)
+
+    def test_incomplete_strategy(self):
+        class DiscardOnly(simulate.Strategy):
+            def discard(self, hand, dealer, rng):
+                return hand[:2]
+
+        self.assertRaises(TypeError, simulate.Strategy)
+        self.assertRaises(TypeError, DiscardOnly)
+
+    def test_results(self):
+        whole = simulate.Results()
+        halves = [simulate.Results(), simulate.Results()]
+        rng = random.Random(0)
+        for i in range(50):
+            scores = [rng.randrange(80, 131), rng.randrange(80, 131)]
+            winner = int(scores[1] > scores[0])
+            whole.add(winner, scores)
+            halves[i % 2].add(winner, scores)
+        halves[0].merge(halves[1])
+        self.assertEqual(halves[0].games, whole.games)
+        self.assertEqual(halves[0].wins, whole.wins)
+        self.assertEqual(halves[0].points, whole.points)
+        self.assertAlmostEqual(halves[0].mean_margin(), whole.mean_margin())
+        self.assertAlmostEqual(halves[0].margin_stdev(),
+                               whole.margin_stdev())
+
+    def test_simulate_deterministic(self):
+        strategies = (simulate.RandomStrategy(), simulate.RandomStrategy())
+        progress = []
+        serial = simulate.simulate(strategies, 60, seed=3, batch=20,
+                                   progress=progress.append)
+        parallel = simulate.simulate(strategies, 60, workers=2, seed=3,
+                                     batch=20)
+        self.assertEqual(serial.games, 60)
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(serial.wins, parallel.wins)
+        self.assertEqual(serial.points, parallel.points)
+        self.assertEqual(serial.margin_stdev(), parallel.margin_stdev())
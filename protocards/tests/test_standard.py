@@ -1,5 +1,7 @@
 #!/usr/bin/python
 
+import copy
+import pickle
 import unittest
 import random
 
@@ -13,11 +15,39 @@ class TestStandard(unittest.TestCase):
         self.assertEqual(suit.plural, "FOOs")
         self.assertEqual(suit.short, "f")
 
+    def test_ordinals(self):
+        for i, rank in enumerate(standard.RANKS):
+            self.assertEqual(rank.ordinal, i)
+        for i, suit in enumerate(standard.SUITS):
+            self.assertEqual(suit.ordinal, i)
+        self.assertIsNone(standard.Suit("FOO").ordinal)
+
+    def test_property_equality(self):
+        self.assertEqual(standard.ACE, standard.RANKS[-1])
+        self.assertNotEqual(standard.ACE, standard.KING)
+        self.assertEqual(standard.ACE, standard.Rank("Ace"))
+        self.assertEqual(hash(standard.ACE), hash(standard.Rank("Ace")))
+        self.assertNotEqual(standard.ACE, standard.Rank("Ace", short="1"))
+        self.assertNotEqual(standard.CLUB, standard.Rank("Club"))
+        self.assertEqual(standard.Suit("Foo"), standard.Suit("Foo"))
+        self.assertEqual(hash(standard.Suit("Foo")),
+                         hash(standard.Suit("Foo")))
+        self.assertEqual(len(set(standard.RANKS + standard.SUITS)), 17)
+
+    def test_sort_key(self):
+        deck = standard.make_deck()
+        random.seed(0)
+        deck.shuffle()
+        self.assertEqual(sorted(deck, key=standard.sort_key), sorted(deck))
+
     def test_card_init(self):
         good_args = [(standard.ACE, standard.SPADE),
-                     (standard.RANKS[12], standard.SUITS[3])]
+                     (standard.RANKS[12], standard.SUITS[3]),
+                     (standard.Rank("Ace"), standard.Suit("Spade"))]
         for args in good_args:
             card = standard.StandardCard(*args)
+            self.assertIs(card, standard.StandardCard(standard.ACE,
+                                                      standard.SPADE))
             self.assertEqual(card.rank, standard.ACE)
             self.assertEqual(card.suit, standard.SPADE)
             self.assertEqual(card.short, "As")
@@ -28,6 +58,30 @@ class TestStandard(unittest.TestCase):
         card_b = standard.StandardCard(standard.ACE, standard.SPADE)
         self.assertEqual(card_a, card_b)
 
+    def test_card_interned(self):
+        card_a = standard.StandardCard(standard.ACE, standard.SPADE)
+        card_b = standard.StandardCard(standard.ACE, standard.SPADE)
+        self.assertIs(card_a, card_b)
+        self.assertIs(copy.copy(card_a), card_a)
+        self.assertIs(pickle.loads(pickle.dumps(card_a)), card_a)
+        self.assertRaises(AttributeError, setattr, card_a, "rank",
+                          standard.TWO)
+
+    def test_card_bad_init(self):
+        self.assertRaises(ValueError, standard.StandardCard,
+                          standard.SPADE, standard.ACE)
+        self.assertRaises(ValueError, standard.StandardCard,
+                          standard.ACE, "spade")
+
+    def test_card_code(self):
+        card = standard.StandardCard(standard.FOUR, standard.HEART)
+        self.assertEqual(card.code, 2 * 4 + 2)
+        self.assertEqual(hash(card), card.code)
+        for code in range(52):
+            self.assertEqual(standard.StandardCard.from_code(code).code, code)
+        self.assertRaises(ValueError, standard.StandardCard.from_code, 52)
+        self.assertRaises(ValueError, standard.StandardCard.from_code, -1)
+
     def test_card_inequality(self):
         cards = {
             "As": standard.StandardCard(standard.ACE, standard.SPADE),
@@ -55,6 +109,119 @@ class TestStandard(unittest.TestCase):
         aces = standard.make_deck().by_rank(standard.ACE)
         self.assertEqual(str(aces), "As Ah Ad Ac")
 
+    def test_hand_sort(self):
+        hand = standard.StandardHand.parse("Kd 2s Ah 2c")
+        hand.sort()
+        self.assertEqual(repr(hand), "<StandardHand:2c,2s,Kd,Ah>")
+        hand.sort(reverse=True)
+        self.assertEqual(repr(hand), "<StandardHand:Ah,Kd,2s,2c>")
+        hand.sort(key=lambda card: card.suit.ordinal)
+        self.assertEqual(repr(hand), "<StandardHand:2c,Kd,Ah,2s>")
+
+    def test_card_code(self):
+        card = standard.StandardHand.parse("Kd")[0]
+        self.assertEqual(standard.card_code(card), card.code)
+        self.assertEqual(standard.card_code(51), 51)
+        self.assertRaises(ValueError, standard.card_code, 52)
+        self.assertRaises(ValueError, standard.card_code, -1)
+
+    def test_hand_key(self):
+        hand = standard.StandardHand.parse("Kd 2s Ah")
+        self.assertEqual(hand.key(), tuple(sorted(c.code for c in hand)))
+        self.assertEqual(standard.StandardHand(hand[::-1]).key(),
+                         hand.key())
+        self.assertNotEqual(standard.StandardHand.parse("Kd 2s").key(),
+                            hand.key())
+
+    def test_frozen_hand(self):
+        hand = standard.StandardHand.parse("Kd 2s Ah")
+        frozen = hand.freeze()
+        self.assertIsInstance(frozen, standard.FrozenStandardHand)
+        self.assertEqual(frozen, standard.StandardHand(hand[::-1]).freeze())
+        self.assertEqual(len({frozen, hand.freeze(),
+                              standard.StandardHand(hand[1:]).freeze()}),
+                         2)
+        self.assertEqual({frozen: 1}[standard.FrozenStandardHand(hand)], 1)
+        self.assertEqual(str(frozen), str(hand))
+        self.assertEqual(frozen.key(), hand.key())
+        self.assertEqual(repr(frozen), "<FrozenStandardHand:2s,Kd,Ah>")
+        self.assertEqual(sorted(frozen.thaw()), sorted(hand))
+        with self.assertRaises(TypeError):
+            standard.FrozenStandardHand(["Ah"])
+
+    def test_frozen_hand_tuples(self):
+        frozen = standard.StandardHand.parse("Kd 2s").freeze()
+        self.assertNotEqual(frozen, tuple(frozen))
+        self.assertNotEqual(tuple(frozen), frozen)
+        self.assertEqual(len({frozen, tuple(frozen)}), 2)
+        other = standard.StandardHand.parse("Ah").freeze()
+        self.assertIsInstance(frozen + other, standard.FrozenStandardHand)
+        self.assertEqual(frozen + other, (other + frozen))
+        self.assertEqual(repr(frozen + other),
+                         "<FrozenStandardHand:2s,Kd,Ah>")
+        with self.assertRaises(TypeError):
+            frozen + tuple(other)
+        doubled = 2 * frozen
+        self.assertIsInstance(doubled, standard.FrozenStandardHand)
+        self.assertEqual(doubled, frozen * 2)
+        self.assertEqual(repr(doubled), "<FrozenStandardHand:2s,2s,Kd,Kd>")
+        self.assertEqual(doubled[1:3], frozen)
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)), frozen)
+        with self.assertRaises(AttributeError):
+            frozen._cards = ()
+
+    def test_hand_set_operations(self):
+        hand = standard.StandardHand.parse("Kd 2s Ah")
+        other = standard.StandardHand.parse("Ah 3c 2s")
+        self.assertEqual(repr(hand | other),
+                         "<StandardHand:Kd,2s,Ah,3c>")
+        self.assertEqual(repr(hand.intersection(other)),
+                         "<StandardHand:2s,Ah>")
+        self.assertEqual(repr(hand - other), "<StandardHand:Kd>")
+        frozen = hand.freeze()
+        self.assertEqual(frozen | other, (hand | other).freeze())
+        self.assertEqual(frozen & other, (hand & other).freeze())
+        self.assertEqual(frozen.difference(other.freeze()),
+                         (hand - other).freeze())
+
+    def test_card_parse(self):
+        ace = standard.StandardCard(standard.ACE, standard.HEART)
+        self.assertIs(standard.StandardCard.parse("Ah"), ace)
+        self.assertIs(standard.StandardCard.parse(" aH\n"), ace)
+        for card in standard.make_deck():
+            self.assertIs(standard.StandardCard.parse(card.short), card)
+        for bad in ("", "A", "Ahh", "1h", "hA", None):
+            self.assertRaises(ValueError, standard.StandardCard.parse, bad)
+
+    def test_hand_parse(self):
+        parse = standard.StandardHand.parse
+        hand = parse("AJ6s 2h 3c")
+        self.assertIsInstance(hand, standard.StandardHand)
+        self.assertEqual([c.short for c in hand],
+                         ["As", "Js", "6s", "2h", "3c"])
+        self.assertEqual([c.short for c in parse("Ah,Kd")], ["Ah", "Kd"])
+        self.assertEqual([c.short for c in parse("AhKd, 2c")],
+                         ["Ah", "Kd", "2c"])
+        self.assertEqual(parse(""), standard.StandardHand())
+        for bad in ("AJ6", "Ah Xd", "h", "Ah,,K"):
+            self.assertRaises(ValueError, parse, bad)
+
+    def test_hand_parse_round_trip(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            hand = standard.make_deck().deal(rng.randrange(53), rng)
+            by_str = standard.StandardHand.parse(str(hand))
+            self.assertEqual(str(by_str), str(hand))
+            self.assertEqual(sorted(by_str), sorted(hand))
+            shorts = ",".join(c.short for c in hand)
+            self.assertEqual(standard.StandardHand.parse(shorts), hand)
+
+    def test_parse_lines(self):
+        hands = list(standard.parse_lines(["AKs 2c\n", "\n", "Td,9d\n"]))
+        self.assertEqual([str(h) for h in hands], ["AKs 2c", "", "T9d"])
+        with self.assertRaisesRegex(ValueError, "Line 2"):
+            list(standard.parse_lines(["Ah", "Zz"]))
+
     def test_make_deck(self):
         hand = standard.StandardHand()
         for suit in standard.SUITS:
@@ -68,3 +235,17 @@ class TestStandard(unittest.TestCase):
         unshuffled = standard.make_deck(shuffle=False)
         shuffled = standard.make_deck(shuffle=True)
         self.assertNotEqual(unshuffled, shuffled)
+
+    def test_standard_deck(self):
+        deck = standard.StandardDeck(random.Random(0))
+        self.assertEqual(len(deck), 52)
+        hands = [deck.deal(13) for _ in range(4)]
+        self.assertEqual(len(deck), 0)
+        self.assertEqual(sorted(c for hand in hands for c in hand),
+                         sorted(standard.make_deck()))
+        hand = hands[0].to_hand()
+        self.assertIsInstance(hand, standard.StandardHand)
+        self.assertEqual(str(hand), str(standard.StandardHand(hands[0])))
+        self.assertEqual(
+            list(standard.StandardDeck(random.Random(0)).deal(13)),
+            list(hands[0]))
@@ -16,6 +16,13 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/relsqui/protocards",
     packages=setuptools.find_packages(),
+    package_data={"protocards": ["data/*.bin"]},
+    extras_require={"numpy": ["numpy"]},
+    entry_points={
+        "console_scripts": [
+            "protocards-distribution=protocards.distribution:main",
+        ],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",